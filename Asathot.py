@@ -14,10 +14,23 @@ import datetime
 import re
 import json
 import shutil
-from typing import Dict, List, Tuple, Optional, Union, Any
-from collections import defaultdict
+from typing import Dict, List, Tuple, Optional, Union, Any, Iterable, Iterator
+from collections import defaultdict, deque
 import threading
 import math
+import heapq
+import hashlib
+import concurrent.futures
+import multiprocessing
+import itertools
+import bisect
+import shlex
+import cProfile
+import pstats
+import tracemalloc
+import argparse
+import atexit
+import ctypes
 
 try:
     import colorama
@@ -31,26 +44,1981 @@ except ImportError:
     from colorama import Fore, Back, Style
     import pyfiglet
 
-# Initialize colorama
-colorama.init(autoreset=True)
+# Optional modules that are not available on every platform
+try:
+    import curses
+except ImportError:
+    curses = None
+
+try:
+    import readline
+except ImportError:
+    readline = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Colors can be switched off with --no-color or the NO_COLOR environment variable
+COLOR_ENABLED = "--no-color" not in sys.argv[1:] and not os.environ.get("NO_COLOR")
+
+class NoColor:
+    """Stand-in for colorama's Fore/Back/Style that renders every color as an empty string"""
+    def __getattr__(self, name: str) -> str:
+        return ""
+
+if COLOR_ENABLED:
+    # Initialize colorama
+    colorama.init(autoreset=True)
+else:
+    # Bypass colorama entirely: no stream wrapping and no escape codes in the output
+    Fore = Back = Style = NoColor()
+
+# Global constants
+SAVE_FILE = "asathot_data.json"
+VERSION = "1.0.0"
+DEFAULT_BTC_VALUE = 45000  # Starting USD per BTC (the market moves from here)
+DEFAULT_ECOIN_VALUE = 1    # USD peg of the E-Coin
+MIN_TERMINAL_WIDTH = 80
+MIN_TERMINAL_HEIGHT = 24
+
+# Terminal escape sequences
+CLEAR_SCREEN = "\033[2J\033[3J\033[H"
+RESET_ALL = "\033[0m"
+
+# Mr. Robot universe constants
+FSOCIETY_REP_THRESHOLD = 50  # Reputation needed to join fsociety
+DARK_ARMY_REP_THRESHOLD = 75  # Reputation needed to be noticed by Dark Army
+ECORP_SECURITY_LEVEL = 9     # E Corp security level (very high)
+
+# Market simulation
+MARKET_TICK_SECONDS = 60      # In-game seconds per price tick
+MARKET_HISTORY_TICKS = 720    # Raw ticks kept for the 1m chart (12 in-game hours)
+MARKET_CANDLE_RESOLUTIONS = {"15m": 15, "1h": 60, "4h": 240}  # Ticks per candle
+MARKET_CANDLE_HISTORY = 60    # Candles kept per resolution
+MARKET_ASSETS = {
+    # drift and volatility are annualised; pegged coins use volatility as jitter around the peg
+    "BTC": {"start": DEFAULT_BTC_VALUE, "drift": 0.05, "volatility": 0.8},
+    "ETH": {"start": 3000.0, "drift": 0.05, "volatility": 1.0},
+    "ECOIN": {"start": DEFAULT_ECOIN_VALUE, "drift": 0.0, "volatility": 2.0, "peg": DEFAULT_ECOIN_VALUE}
+}
+MARKET_CORRELATIONS = {("BTC", "ETH"): 0.8}
+FIAT_RATES = {"EUR": ("€", 41000 / 45000), "GBP": ("£", 35000 / 45000), "JPY": ("¥", 5200000 / 45000)}
+
+# Order book trading (BTC priced in E-Coin)
+ORDER_EPSILON = 1e-9          # Quantities below this count as filled
+NPC_QUOTE_LEVELS = 5          # Price levels each side quoted by the market makers
+NPC_SPREAD = 0.001            # Relative distance between market maker price levels
+NPC_TAKERS_PER_ROUND = 3      # Most NPC takers crossing the spread per in-game minute
+NPC_MAX_ROUNDS = 60           # Most NPC rounds simulated per update (older flow is skipped)
+MARKET_ORDER_SLIPPAGE = 0.02  # Worst price accepted by an order without a limit
+TRADE_LOG_SIZE = 10           # Recent player fills shown by 'orders'
+
+# Proof-of-work mining
+MINING_SHARE_BITS = 20             # Leading zero bits a double SHA-256 needs to count as a share
+MINING_JOB_NONCES = 200000         # Nonces per pool job (a fraction of a second per worker)
+MINING_SHARE_REWARD = 0.000001     # BTC paid by the pool per share
+WORKER_POOL_SIZE = os.cpu_count() or 1  # Processes in the shared worker pool, one per host core
+
+# Offline progression
+OFFLINE_REPORT_SECONDS = 60      # Shortest break that gets a "while you were away" report
+MISSION_LIFETIME = 3 * 24 * 3600  # In-game seconds before a generated mission expires
+
+# Mission and championship registry
+ARCHIVE_FILE = "asathot_archive.jsonl"  # Cold storage for completed, expired and abandoned entries
+REGISTRY_COMPLETED_KEPT = 20            # Completed entries per registry kept in the hot state
+CONTENT_POOL_MISSIONS = 8               # Ready-made missions the background generator keeps in stock
+CONTENT_POOL_CHAMPIONSHIPS = 2          # Ready-made championships kept in stock
+MISSIONS_OFFERED = 5                    # Generated missions 'mission list' keeps on offer
+CHAMPIONSHIPS_OFFERED = 3               # Open championships champions.onion keeps on offer
+
+# Event history
+HISTORY_BUFFER_SIZE = 500                # Events kept in memory for 'history'
+EVENT_LOG_PREFIX = "asathot_events"      # On-disk log: asathot_events.NNNN.jsonl + asathot_events.idx
+EVENT_LOG_SEGMENT_BYTES = 1024 * 1024    # Start a new log segment past this size
+EVENT_LOG_SEGMENTS = 8                   # Log segments kept on disk
+EVENT_INDEX_STRIDE = 64                  # Log entries between time index points
+COMMAND_HISTORY_FILE = "asathot_commands.history"  # Commands typed at the prompt (readline format)
+COMMAND_HISTORY_SIZE = 100000            # Distinct commands kept in the history file
+
+# Performance diagnostics
+PERF_DUMP_FILE = "asathot_perf.json"     # Default output of 'perf dump'
+PERF_PROFILE_LINES = 15                  # Functions listed by 'perf profile'
+MEMORY_CHECK_OBJECTS = 1000              # References walked after each command for the soft limit checks
+MEMORY_TRACE_FRAMES = 4                  # Stack frames kept per traced allocation
+MEMORY_SNAPSHOTS_KEPT = 8                # tracemalloc snapshots kept for 'debug mem diff'
+MEMORY_TOP_ALLOCATIONS = 10              # Lines listed per snapshot or diff
+# Soft memory budget per GameState subsystem, in bytes ('debug mem limit' overrides them)
+MEMORY_SOFT_LIMITS = {
+    "file_system": 8 * 1024 * 1024,
+    "missions": 1024 * 1024,
+    "championships": 256 * 1024,
+    "network_targets": 2 * 1024 * 1024,
+    "history": 1024 * 1024,
+    "scan_cache": 512 * 1024,
+    "player": 256 * 1024,
+    "market": 4 * 1024 * 1024,
+    "order_book": 4 * 1024 * 1024
+}
+
+# Target recommendations
+RECOMMEND_HACK_TYPES = ("hack", "bruteforce", "exploit")  # Hack types compared by 'recommend'
+RECOMMEND_ROWS = 10                  # Targets listed by default
+
+# Balance simulation
+SIMULATION_HOURS = 2                               # Play time simulated per career
+SIMULATION_CHECKPOINTS = (0.25, 0.5, 1, 2, 5, 10)  # Play hours at which BTC balances are sampled
+SIMULATION_CHUNK = 200                       # Most careers per pool job
+SIMULATION_STALL_CHANCE = 0.25                     # Success chance below which a stuck career is under-equipped
+
+# Scan phases shown while a scan runs, with their artificial delay in seconds
+SCAN_PHASES = [
+    ("Port scanning in progress...", 0.5),
+    ("Service detection running...", 0.5),
+    ("OS fingerprinting...", 0.5),
+    ("Vulnerability scanning...", 1),
+]
+SCAN_CACHE_TTL = 15 * 60  # Seconds a scan result is shown again instead of rescanning
+# Well-known port of each service a target can run; others listen on a hashed high port
+SERVICE_PORTS = {
+    "ftp": 21, "ssh": 22, "smtp": 25, "http": 80, "https": 443, "vpn": 1194,
+    "radius": 1812, "mysql": 3306, "hvac": 8080, "building_management": 9090
+}
+# Banners answered on open ports, one picked per target and port
+SERVICE_BANNERS = {
+    "ftp": ["vsFTPd 3.0.3", "ProFTPD 1.3.5", "Microsoft ftpd"],
+    "ssh": ["OpenSSH 7.4", "OpenSSH 8.2p1 Ubuntu", "dropbear 2019.78"],
+    "smtp": ["Postfix smtpd", "Exim 4.92", "Microsoft ESMTP 10.0"],
+    "http": ["Apache/2.4.29", "nginx/1.14.0", "Microsoft-IIS/8.5"],
+    "https": ["Apache/2.4.29 (mod_ssl)", "nginx/1.14.0 (TLS)", "Microsoft-IIS/10.0"],
+    "mysql": ["MySQL 5.5.62", "MySQL 5.7.31", "MariaDB 10.3.25"],
+    "vpn": ["OpenVPN 2.4", "Cisco AnyConnect"],
+    "hvac": ["Tridium Niagara 3.8", "Johnson Controls Metasys"],
+    "building_management": ["BACnet/IP gateway", "Siemens Desigo CC"],
+}
+GENERIC_BANNERS = ["no banner", "tcpwrapped", "unknown protocol"]
+
+# Port-level scans (scan -p)
+PORT_BLOCK_BITS = 8              # Firewalls filter whole blocks of 2**8 ports
+PORT_FILTER_PER_LEVEL = 0.08     # Chance per security level that a port block is filtered
+PORT_EXTRA_SERVICES = 3          # Most unidentified services listening on high ports
+PORT_PROBE_BYTES = 60            # Bytes on the wire per SYN probe
+PORT_SCAN_RETRIES = 2            # Retransmissions to a port that does not answer
+PORT_SCAN_TIMEOUT_RTTS = 4       # Round trips waited for the last unanswered probes
+PORT_RTT_BASE = 0.02             # Round-trip time to a security level 0 host, in seconds
+PORT_RTT_PER_LEVEL = 0.01        # Extra round-trip time per security level (proxies, IDS)
+PORT_SCAN_MAX_WAIT = 60          # Longest real-time wait for a port scan, in seconds
+PORT_SCAN_RANGES_SHOWN = 6       # Filtered port ranges listed per host
+
+# Network topology
+TOPOLOGY_EXPOSED_LEVEL = 4       # Highest security level a host can have and still face the internet
+TOPOLOGY_ZONE_LEVELS = 2         # Security levels per firewall zone inside a subnet
+TOPOLOGY_UPLINK_MS = (150, 40, 20, 8, 5, 3, 2, 1)  # Player's latency to the internet per network level
+TOPOLOGY_WAN_MS = (20.0, 180.0)  # Latency range between the internet and a subnet
+TOPOLOGY_LAN_MS = (0.2, 3.0)     # Latency range between two hosts in a subnet
+TOPOLOGY_BURN_CHANCE = 0.1       # Chance per pivot that a failed hack through it loses the foothold
+
+# Botnet
+BOTNET_CPU_SHARE = 0.25               # Share of a bot's CPU and link used, so its owner does not notice
+BOTNET_CANDIDATES_PER_GHZ = 2000000   # Password candidates per second per GHz core
+BOTNET_HASHES_PER_GHZ = 250000        # Mining hashes per second per GHz core
+BOTNET_CHUNKS_PER_BOT = 8             # Chunks a job is split into per bot, so stealing can even out their speeds
+BOTNET_MINE_MAX_MINUTES = 10          # Longest botnet mining job, in in-game minutes
+BOTNET_DROPOUTS_PER_HOUR = 0.5        # Chance per hour of work that a bot drops out of a job
+BOTNET_RECLAIM_CHANCE = 0.3           # Chance that a bot dropping out was cleaned up by its owner
+BOTNET_MAX_WAIT = 60                  # Longest real-time wait for a botnet job, in seconds
+
+# Darkweb circuits
+CIRCUIT_HOPS = ("guard", "middle", "rendezvous")  # Relays of a circuit to an onion site, in order
+CIRCUIT_RELAY_MS = (15.0, 120.0)  # Round-trip time range from one relay to the next
+CIRCUIT_CELL_BYTES = 514          # Size of a cell; extending a circuit by a hop sends one and gets one back
+CIRCUIT_DESCRIPTOR_BYTES = 8192   # Onion service descriptor and introduction fetched over a new circuit
+CIRCUIT_IDLE_TIMEOUT = 10 * 60    # Seconds an unused circuit stays open
+CIRCUIT_POOL_SIZE = 6             # Most circuits kept open; the least recently used one is closed first
+
+# Output layer
+class Renderer:
+    """Buffers everything a command prints and writes it to the terminal in one call.
+
+    While a command runs the renderer is installed as sys.stdout. Output is flushed when
+    the command finishes, when input() prompts the player, or when a command explicitly
+    flushes (progress bars and artificial pauses).
+    """
+    def __init__(self, color: bool = True):
+        self.color = color
+        self.stream = None
+        self.chunks = []
+        self.depth = 0
+
+    def __enter__(self):
+        if self.depth == 0:
+            self.stream = sys.stdout
+            sys.stdout = self
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.depth -= 1
+        if self.depth == 0:
+            self.flush()
+            sys.stdout = self.stream
+            self.stream = None
+        return False
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self.stream or sys.__stdout__, "encoding", "utf-8")
+
+    def isatty(self) -> bool:
+        return (self.stream or sys.__stdout__).isatty()
+
+    def write(self, text: str) -> int:
+        """Queue text for the next flush"""
+        if not text:
+            return 0
+        self.chunks.append(text)
+        # Mirror colorama's autoreset: a color never bleeds past the write that set it
+        if self.color and "\033[" in text:
+            self.chunks.append(RESET_ALL)
+        return len(text)
+
+    def flush(self) -> None:
+        """Write all queued output to the terminal in a single call"""
+        stream = self.stream or sys.stdout
+        if self.chunks:
+            data = "".join(self.chunks)
+            self.chunks.clear()
+            stream.write(data)
+        stream.flush()
+
+    def clear_screen(self) -> None:
+        """Clear the terminal with escape sequences instead of spawning a shell"""
+        if dashboard.active:
+            # The dashboard owns the pinned rows and has to redraw them
+            self.flush()
+            dashboard.clear()
+            return
+        if not self.isatty():
+            # A pipe or file would only get the escape sequence as garbage; colors do not matter here
+            self.flush()
+            return
+        self.chunks.clear()
+        self.chunks.append(CLEAR_SCREEN)
+        self.flush()
+
+renderer = Renderer(color=COLOR_ENABLED)
+
+# Artificial delays can be switched off for benchmarks
+delays_enabled = True
+
+def pause(seconds: float) -> None:
+    """Flush pending output so the player sees it, then wait for an artificial delay"""
+    sys.stdout.flush()
+    if not delays_enabled:
+        return
+    perf.delay_total += seconds
+    time.sleep(seconds)
+
+# Performance monitoring
+class LogHistogram:
+    """Histogram with logarithmic buckets.
+
+    Each power of two is split into BUCKETS_PER_DOUBLING buckets, so percentiles are
+    accurate to a few percent at any scale while memory stays bounded by the range of
+    values seen rather than their number.
+    """
+    BUCKETS_PER_DOUBLING = 8
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.floor(math.log2(value) * self.BUCKETS_PER_DOUBLING)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Approximate value below which `fraction` of the samples fall"""
+        rank = fraction * self.count
+        seen = self.zeros
+        if rank <= seen:
+            return 0.0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # Geometric middle of the bucket, never above the largest sample
+                return min(self.max, 2 ** ((bucket + 0.5) / self.BUCKETS_PER_DOUBLING))
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "zeros": self.zeros,
+            "buckets_per_doubling": self.BUCKETS_PER_DOUBLING,
+            "buckets": {str(bucket): count for bucket, count in sorted(self.buckets.items())}
+        }
+
+class PerfMonitor:
+    """Per-command latency statistics, in milliseconds.
+
+    Wall time and the part of it spent in artificial delays (pause()) are recorded
+    per command, and save/load durations separately, so a slow session can be
+    traced to sleeps, disk I/O or real work.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = time.time()
+        self.wall = defaultdict(LogHistogram)   # command -> wall time
+        self.delay = defaultdict(LogHistogram)  # command -> artificial delay
+        self.io = defaultdict(LogHistogram)     # "save"/"load" -> duration
+        self.delay_total = 0.0                  # seconds of pause() so far
+
+    def record_command(self, command: str, wall: float, delay: float) -> None:
+        self.wall[command].add(wall * 1000)
+        self.delay[command].add(delay * 1000)
+
+    def record_io(self, operation: str, seconds: float) -> None:
+        self.io[operation].add(seconds * 1000)
+
+    def to_dict(self) -> Dict:
+        return {
+            "started": self.started,
+            "dumped": time.time(),
+            "unit": "ms",
+            "commands": {command: {"wall": self.wall[command].to_dict(), "delay": self.delay[command].to_dict()}
+                         for command in sorted(self.wall)},
+            "io": {operation: histogram.to_dict() for operation, histogram in sorted(self.io.items())}
+        }
+
+perf = PerfMonitor()
+
+def deep_sizeof(obj: Any) -> int:
+    """Bytes used by an object and everything it references, counting shared objects once"""
+    for _, total in sizeof_slices(obj, math.inf):
+        return total
+
+def sizeof_slices(obj: Any, step: float) -> Iterator[Tuple[int, Optional[int]]]:
+    """deep_sizeof in slices of `step` references, to spread a large walk over several calls.
+
+    Yields (references walked, None) after every full slice and finally (references
+    walked, total bytes). Objects that change between slices are measured as they were reached.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    walked = 0
+    while stack:
+        if walked == step:
+            yield walked, None
+            walked = 0
+        item = stack.pop()
+        walked += 1
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif not isinstance(item, (str, bytes, int, float, type)):
+            if hasattr(item, "__dict__"):
+                stack.append(item.__dict__)
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    yield walked, total
+
+def format_size(size: float) -> str:
+    """Human readable byte count"""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+def parse_size(text: str) -> Optional[int]:
+    """Parse a byte count such as 512K, 8M or 1048576"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([kmg]?)i?b?", text.strip().lower())
+    if not match:
+        return None
+    return int(float(match.group(1)) * 1024 ** " kmg".index(match.group(2) or " "))
+
+class MemoryMonitor:
+    """Memory accounting for the game state.
+
+    Deep sizes are measured per GameState subsystem and compared against soft limits;
+    each subsystem warns once when it goes over budget and again only after it has
+    dropped back below. The checks walk MEMORY_CHECK_OBJECTS references per call and
+    resume where the last call stopped, taking the subsystems in turn, so they cost
+    the same however big the state grows. Allocation hot spots are found with
+    tracemalloc snapshots, which start tracing on first use since tracing slows every
+    allocation down.
+    """
+    def __init__(self):
+        self.limits = dict(MEMORY_SOFT_LIMITS)
+        self.over = set()       # subsystems currently over their limit
+        self.walk = None        # (state, subsystem, sizeof_slices walk) of the check in progress
+        self.next_walk = 0      # turn of the subsystem the next check starts on
+        self.snapshots = []     # (number, taken at, snapshot), oldest first
+        self.taken = 0
+
+    def sizes(self, state) -> Dict[str, int]:
+        """Deep size of every subsystem in bytes"""
+        return {name: deep_sizeof(getattr(state, name)) for name in self.limits}
+
+    def check(self, state) -> List[str]:
+        """Measure the next slice of the state; warnings for subsystems measured over their soft limit"""
+        warnings = []
+        walked = 0
+        for _ in range(len(self.limits)):
+            if self.walk is None or self.walk[0] is not state:
+                name = list(self.limits)[self.next_walk % len(self.limits)]
+                self.next_walk += 1
+                self.walk = (state, name, sizeof_slices(getattr(state, name), MEMORY_CHECK_OBJECTS))
+            _, name, slices = self.walk
+            count, size = next(slices)
+            walked += count
+            if size is not None:
+                self.walk = None
+                if size <= self.limits[name]:
+                    self.over.discard(name)
+                elif name not in self.over:
+                    self.over.add(name)
+                    warnings.append(f"{name} uses {format_size(size)}, over its {format_size(self.limits[name])} budget")
+            if walked >= MEMORY_CHECK_OBJECTS:
+                break
+        return warnings
+
+    def snapshot(self) -> Tuple[int, "tracemalloc.Snapshot"]:
+        """Take a tracemalloc snapshot and return its number"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+        self.taken += 1
+        self.snapshots.append((self.taken, time.time(), snapshot))
+        del self.snapshots[:-MEMORY_SNAPSHOTS_KEPT]
+        return self.taken, snapshot
+
+    def find(self, number: int) -> Optional["tracemalloc.Snapshot"]:
+        for taken, _, snapshot in self.snapshots:
+            if taken == number:
+                return snapshot
+        return None
+
+memory = MemoryMonitor()
+
+# Split-screen dashboard
+class Dashboard:
+    """Optional split-screen mode with a pinned status bar and in-place progress bars.
+
+    curses is only used to look up terminal capabilities. The top rows are pinned with a
+    scroll region and redrawn by cursor addressing, so normal output, input() and the
+    renderer keep working below them. Redraws are diffed row by row and rate-limited,
+    and only a fixed number of progress rows is drawn, so the cost of a redraw does not
+    depend on how many operations are running.
+    """
+    PROGRESS_ROWS = 3
+    REDRAW_INTERVAL = 0.1  # Minimum seconds between two rate-limited redraws
+    BAR_WIDTH = 20
+
+    def __init__(self):
+        self.active = False
+        self.lock = threading.RLock()
+        self.operations = {}      # op_id -> [label, fraction]
+        self.progress_total = 0.0  # Sum of all fractions, kept up to date incrementally
+        self.next_op_id = 1
+        self.drawn_rows = {}      # row -> text currently on screen
+        self.last_redraw = 0.0
+        self.size = None
+        self.caps = {}
+
+    @property
+    def header_rows(self) -> int:
+        return 2 + self.PROGRESS_ROWS
+
+    def start(self) -> bool:
+        """Enter split-screen mode. Returns False when the terminal cannot support it"""
+        if self.active:
+            return True
+        if curses is None or not sys.__stdout__.isatty():
+            return False
+        try:
+            curses.setupterm(fd=sys.__stdout__.fileno())
+        except Exception:
+            return False
+        for name in ("csr", "cup", "sc", "rc", "el", "rev", "sgr0"):
+            cap = curses.tigetstr(name)
+            self.caps[name] = cap
+        if not all(self.caps[name] for name in ("csr", "cup", "sc", "rc", "el")):
+            return False
+        
+        with self.lock:
+            self.active = True
+            self._reset_layout()
+        return True
+
+    def stop(self) -> None:
+        """Leave split-screen mode and give the whole terminal back to normal output"""
+        with self.lock:
+            if not self.active:
+                return
+            columns, lines = self.size
+            out = [self._tparm("csr", 0, lines - 1)]
+            for row in range(self.header_rows):
+                out.append(self._tparm("cup", row, 0) + self._cap("el"))
+            out.append(self._tparm("cup", lines - 1, 0))
+            self._write("".join(out))
+            self.active = False
+            self.drawn_rows.clear()
+
+    def _cap(self, name: str) -> str:
+        cap = self.caps.get(name)
+        return cap.decode("latin-1") if cap else ""
+
+    def _tparm(self, name: str, *params: int) -> str:
+        return curses.tparm(self.caps[name], *params).decode("latin-1")
+
+    def _write(self, data: str) -> None:
+        sys.__stdout__.write(data)
+        sys.__stdout__.flush()
+
+    def _reset_layout(self) -> None:
+        """Pin the header rows above a scroll region sized to the current terminal"""
+        size = shutil.get_terminal_size()
+        self.size = (size.columns, size.lines)
+        self.drawn_rows.clear()
+        self._write(self._tparm("csr", self.header_rows, size.lines - 1) +
+                    self._tparm("cup", size.lines - 1, 0))
+        self._redraw()
+
+    def clear(self) -> None:
+        """Clear the screen, then pin and redraw the header and leave the cursor below it"""
+        with self.lock:
+            self._write(CLEAR_SCREEN)
+            self._reset_layout()
+            self._write(self._tparm("cup", self.header_rows, 0))
+
+    def start_operation(self, label: str) -> int:
+        """Register a running operation and return its id"""
+        with self.lock:
+            op_id = self.next_op_id
+            self.next_op_id += 1
+            self.operations[op_id] = [label, 0.0]
+            self.refresh()
+            return op_id
+
+    def update_operation(self, op_id: int, fraction: float, label: Optional[str] = None) -> None:
+        """Set an operation's progress (0.0 - 1.0) and optionally its label"""
+        with self.lock:
+            operation = self.operations.get(op_id)
+            if operation is None:
+                return
+            fraction = min(1.0, max(0.0, fraction))
+            self.progress_total += fraction - operation[1]
+            operation[1] = fraction
+            if label is not None:
+                operation[0] = label
+            self.refresh()
+
+    def finish_operation(self, op_id: int) -> None:
+        """Remove a finished operation from the progress rows"""
+        with self.lock:
+            operation = self.operations.pop(op_id, None)
+            if operation is not None:
+                self.progress_total -= operation[1]
+                if not self.operations:
+                    self.progress_total = 0.0
+            self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> None:
+        """Redraw the header if something changed, at most once per REDRAW_INTERVAL"""
+        if not self.active:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_redraw < self.REDRAW_INTERVAL:
+                return
+            size = shutil.get_terminal_size()
+            if (size.columns, size.lines) != self.size:
+                self._reset_layout()
+            else:
+                self._redraw()
+            self.last_redraw = now
+
+    def status_text(self) -> str:
+        """Build the status bar: balance, reputation, mission step and darkweb site"""
+        player = game_state.player
+        mission_text = "none"
+        if player["current_mission"]:
+            mission = get_mission_by_id(player["current_mission"])
+            if mission:
+                step = mission["current_step"]
+                total = len(mission["steps"])
+                current = mission["steps"][step] if step < total else "done"
+                mission_text = f"{mission['id']} {min(step + 1, total)}/{total} {current}"
+        site = game_state.current_site if game_state.connected_to_darkweb else "offline"
+        return (f" BTC {format_btc(player['bitcoin'])} | Rep {player['reputation']} | "
+                f"Mission {mission_text} | Site {site}")
+
+    def _progress_row(self, label: str, fraction: float) -> str:
+        filled = int(fraction * self.BAR_WIDTH)
+        return f" [{'█' * filled}{' ' * (self.BAR_WIDTH - filled)}] {fraction * 100:5.1f}% {label}"
+
+    def _redraw(self) -> None:
+        columns = self.size[0]
+        rows = [self.status_text()]
+        shown = 0
+        for label, fraction in self.operations.values():
+            if shown == self.PROGRESS_ROWS:
+                break
+            rows.append(self._progress_row(label, fraction))
+            shown += 1
+        hidden = len(self.operations) - shown
+        if hidden > 0:
+            # Summarise the rest on the last row without walking them
+            average = self.progress_total / len(self.operations)
+            rows[-1] = f" ... {len(self.operations)} operations running, {average * 100:.1f}% overall"
+        while len(rows) < 1 + self.PROGRESS_ROWS:
+            rows.append("")
+        rows.append("─" * (columns - 1))
+        
+        out = []
+        for row, text in enumerate(rows):
+            # Stay clear of the last column so no terminal wraps the row
+            text = text[:columns - 1]
+            if self.drawn_rows.get(row) == text:
+                continue
+            self.drawn_rows[row] = text
+            style = self._cap("rev") if row == 0 and COLOR_ENABLED else ""
+            reset = self._cap("sgr0") if style else ""
+            out.append(self._tparm("cup", row, 0) + style + text.ljust(columns - 1) + reset + self._cap("el"))
+        if out:
+            # Draw between save/restore cursor so the prompt and output are left untouched
+            self._write(self._cap("sc") + "".join(out) + self._cap("rc"))
+
+dashboard = Dashboard()
+# Never leave the terminal with a pinned scroll region behind
+atexit.register(dashboard.stop)
+
+# Market simulation
+class RingBuffer:
+    """Fixed-capacity circular buffer of equally sized float rows.
+
+    Backed by a 2-D NumPy array when NumPy is installed and by a list of lists otherwise.
+    Appending never allocates once the buffer is full; the oldest rows are overwritten.
+    """
+    def __init__(self, capacity: int, width: int):
+        self.capacity = capacity
+        self.width = width
+        self.start = 0
+        self.size = 0
+        if np is not None:
+            self.data = np.zeros((capacity, width))
+        else:
+            self.data = [[0.0] * width for _ in range(capacity)]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, row) -> None:
+        """Add a single row"""
+        self.extend([row])
+
+    def extend(self, rows) -> None:
+        """Add rows oldest first; only the newest `capacity` rows are kept"""
+        count = len(rows)
+        if count == 0:
+            return
+        if count > self.capacity:
+            rows = rows[count - self.capacity:]
+            count = self.capacity
+        end = (self.start + self.size) % self.capacity
+        if np is not None:
+            rows = np.asarray(rows, dtype=float)
+            first = min(count, self.capacity - end)
+            self.data[end:end + first] = rows[:first]
+            self.data[:count - first] = rows[first:]
+        else:
+            for i, row in enumerate(rows):
+                self.data[(end + i) % self.capacity] = [float(value) for value in row]
+        self.size = min(self.capacity, self.size + count)
+        self.start = (end + count - self.size) % self.capacity
+
+    def rows(self):
+        """All rows, oldest first"""
+        if np is not None:
+            return self.data[(self.start + np.arange(self.size)) % self.capacity]
+        return [self.data[(self.start + i) % self.capacity] for i in range(self.size)]
+
+    def last(self):
+        """The newest row"""
+        return self.data[(self.start + self.size - 1) % self.capacity]
+
+    def to_list(self) -> List[List[float]]:
+        """Rows as plain lists for saving"""
+        rows = self.rows()
+        return rows.tolist() if np is not None else [list(row) for row in rows]
+
+class MarketEngine:
+    """Simulates BTC, ETH and E-Coin prices as correlated geometric Brownian motion.
+
+    Prices advance in ticks of in-game time. Raw ticks and OHLC candles at several
+    resolutions are kept in ring buffers. Whole blocks of ticks are generated at once,
+    and anything older than the longest candle history is skipped with a single
+    closed-form draw, so catching up after a long break costs the same as a short one.
+    Candle rows are [start_tick, opens..., highs..., lows..., closes...].
+    """
+    def __init__(self, seed: Optional[int] = None):
+        self.assets = list(MARKET_ASSETS)
+        self.prices = [MARKET_ASSETS[asset]["start"] for asset in self.assets]
+        self.tick = 0
+        self.last_update = time.time()
+        self.history = RingBuffer(MARKET_HISTORY_TICKS, len(self.assets))
+        self.candles = {name: RingBuffer(MARKET_CANDLE_HISTORY, 1 + 4 * len(self.assets))
+                        for name in MARKET_CANDLE_RESOLUTIONS}
+        self.open_candles = {name: None for name in MARKET_CANDLE_RESOLUTIONS}
+        self.history.append(self.prices)
+
+        # Per-tick log drift and volatility, and the Cholesky factor of the correlations
+        tick_years = MARKET_TICK_SECONDS / (365 * 24 * 3600)
+        self.drift = [MARKET_ASSETS[a]["drift"] * tick_years for a in self.assets]
+        self.volatility = [MARKET_ASSETS[a]["volatility"] * math.sqrt(tick_years) for a in self.assets]
+        self.pegs = [MARKET_ASSETS[a].get("peg") for a in self.assets]
+        self.cholesky = cholesky_lower([[MARKET_CORRELATIONS.get((a, b), MARKET_CORRELATIONS.get((b, a), 1.0 if a == b else 0.0))
+                                         for b in self.assets] for a in self.assets])
+        if np is not None:
+            self.rng = np.random.default_rng(seed)
+        else:
+            self.rng = random.Random(seed)
+
+    def price(self, asset: str) -> float:
+        """Current price of an asset in USD"""
+        return self.prices[self.assets.index(asset)]
+
+    def catch_up(self, now: float, acceleration: float) -> int:
+        """Advance the market to a real timestamp and return the number of ticks simulated"""
+        ticks = int((now - self.last_update) * acceleration / MARKET_TICK_SECONDS)
+        if ticks <= 0:
+            return 0
+        self.last_update += ticks * MARKET_TICK_SECONDS / acceleration
+        self.advance(ticks)
+        return ticks
+
+    def advance(self, ticks: int) -> None:
+        """Advance the market by a number of ticks"""
+        window = MARKET_CANDLE_HISTORY * max(MARKET_CANDLE_RESOLUTIONS.values())
+        if ticks > window:
+            # Nothing older than the longest candle history can be displayed, so jump
+            # over it in one draw and only simulate the ticks that will be kept
+            self._jump(ticks - window)
+            ticks = window
+        block = self._generate(ticks)
+        first_tick = self.tick + 1
+        self.tick += ticks
+        self.prices = [float(price) for price in block[-1]]
+        self.history.extend(block)
+        for name, resolution in MARKET_CANDLE_RESOLUTIONS.items():
+            self._aggregate(name, resolution, block, first_tick)
+
+    def _shocks(self, count: int):
+        """Correlated standard normal shocks, one row per tick"""
+        if np is not None:
+            return self.rng.standard_normal((count, len(self.assets))) @ np.asarray(self.cholesky).T
+        rows = []
+        for _ in range(count):
+            z = [self.rng.gauss(0.0, 1.0) for _ in self.assets]
+            rows.append([sum(l * zj for l, zj in zip(row, z)) for row in self.cholesky])
+        return rows
+
+    def _generate(self, ticks: int):
+        """Simulate a block of prices, one row per tick"""
+        shocks = self._shocks(ticks)
+        if np is not None:
+            drift = np.asarray(self.drift)
+            volatility = np.asarray(self.volatility)
+            paths = np.asarray(self.prices) * np.exp(np.cumsum(drift + volatility * shocks, axis=0))
+            for i, peg in enumerate(self.pegs):
+                if peg is not None:
+                    # Pegged coins jitter around their peg instead of wandering off
+                    paths[:, i] = peg * np.exp(volatility[i] * shocks[:, i])
+            return paths
+        paths = []
+        prices = list(self.prices)
+        for row in shocks:
+            for i, shock in enumerate(row):
+                if self.pegs[i] is not None:
+                    prices[i] = self.pegs[i] * math.exp(self.volatility[i] * shock)
+                else:
+                    prices[i] *= math.exp(self.drift[i] + self.volatility[i] * shock)
+            paths.append(list(prices))
+        return paths
+
+    def _jump(self, ticks: int) -> None:
+        """Skip ahead in closed form: the sum of n log-returns is a single normal draw"""
+        shock = self._shocks(1)[0]
+        scale = math.sqrt(ticks)
+        for i in range(len(self.assets)):
+            if self.pegs[i] is None:
+                self.prices[i] *= math.exp(self.drift[i] * ticks + self.volatility[i] * scale * float(shock[i]))
+        self.tick += ticks
+        # Partially built candles no longer line up with the new prices
+        for name in self.open_candles:
+            self.open_candles[name] = None
+
+    def _aggregate(self, name: str, resolution: int, block, first_tick: int) -> None:
+        """Fold a block of ticks into the OHLC candles of one resolution"""
+        count = len(block)
+        assets = len(self.assets)
+        pos = 0
+        while pos < count:
+            tick = first_tick + pos
+            start = tick - tick % resolution
+            take = min(count - pos, start + resolution - tick)
+            if take == resolution and np is not None and count - pos >= resolution:
+                # Whole candles: reshape the block and reduce it in one go
+                full = (count - pos) // resolution
+                part = block[pos:pos + full * resolution].reshape(full, resolution, assets)
+                starts = (start + resolution * np.arange(full)).reshape(full, 1)
+                self.candles[name].extend(np.hstack((starts, part[:, 0, :], part.max(axis=1),
+                                                     part.min(axis=1), part[:, -1, :])))
+                pos += full * resolution
+                continue
+
+            part = block[pos:pos + take]
+            candle = self.open_candles[name]
+            if candle is None or candle[0] != start:
+                candle = [float(start)] + [float(v) for v in part[0]] + [-math.inf] * assets + [math.inf] * assets + [0.0] * assets
+            for i in range(assets):
+                column = [float(row[i]) for row in part]
+                candle[1 + assets + i] = max(candle[1 + assets + i], max(column))
+                candle[1 + 2 * assets + i] = min(candle[1 + 2 * assets + i], min(column))
+                candle[1 + 3 * assets + i] = column[-1]
+            pos += take
+            if (tick + take) % resolution == 0:
+                self.candles[name].append(candle)
+                self.open_candles[name] = None
+            else:
+                self.open_candles[name] = candle
+
+    def closes(self, asset: str, resolution: str) -> List[float]:
+        """Closing prices of an asset at a resolution ('1m' is the raw ticks), oldest first"""
+        index = self.assets.index(asset)
+        if resolution == "1m":
+            return [float(row[index]) for row in self.history.rows()]
+        close_column = 1 + 3 * len(self.assets) + index
+        closes = [float(row[close_column]) for row in self.candles[resolution].rows()]
+        if self.open_candles[resolution] is not None:
+            closes.append(self.open_candles[resolution][close_column])
+        return closes
+
+    def change(self, asset: str, ticks: int) -> Optional[float]:
+        """Relative price change over the last `ticks` ticks, if enough history is kept"""
+        current = self.price(asset)
+        for resolution, per_candle in [("1m", 1)] + sorted(MARKET_CANDLE_RESOLUTIONS.items(), key=lambda item: item[1]):
+            closes = self.closes(asset, resolution)
+            back = max(1, ticks // per_candle)
+            if len(closes) > back:
+                return current / closes[-1 - back] - 1
+        return None
+
+    def to_dict(self) -> Dict:
+        """Serialisable snapshot for the save file"""
+        return {
+            "prices": self.prices,
+            "tick": self.tick,
+            "last_update": self.last_update,
+            "history": self.history.to_list(),
+            "candles": {name: buffer.to_list() for name, buffer in self.candles.items()},
+            "open_candles": self.open_candles
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MarketEngine":
+        """Rebuild a market from a save file snapshot"""
+        market = cls()
+        if data.get("prices") and len(data["prices"]) == len(market.assets):
+            market.prices = [float(price) for price in data["prices"]]
+            market.tick = data.get("tick", 0)
+            market.last_update = data.get("last_update", market.last_update)
+            market.history = RingBuffer(MARKET_HISTORY_TICKS, len(market.assets))
+            market.history.extend(data.get("history") or [market.prices])
+            for name, rows in data.get("candles", {}).items():
+                if name in market.candles:
+                    market.candles[name].extend(rows)
+            for name, candle in data.get("open_candles", {}).items():
+                if name in market.open_candles:
+                    market.open_candles[name] = candle
+        return market
+
+def cholesky_lower(matrix: List[List[float]]) -> List[List[float]]:
+    """Lower-triangular Cholesky factor of a small positive definite matrix"""
+    size = len(matrix)
+    lower = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1):
+            total = sum(lower[i][k] * lower[j][k] for k in range(j))
+            if i == j:
+                lower[i][j] = math.sqrt(max(matrix[i][i] - total, 0.0))
+            else:
+                lower[i][j] = (matrix[i][j] - total) / lower[j][j] if lower[j][j] else 0.0
+    return lower
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values: List[float]) -> str:
+    """Draw a series of numbers as a one-line ASCII sparkline"""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = high - low
+    if span <= 0:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[int((value - low) / span * top)] for value in values)
+
+# Order book trading
+class Order:
+    """A limit order resting in (or passing through) the order book"""
+    __slots__ = ("id", "owner", "side", "price", "quantity", "remaining")
+
+    def __init__(self, order_id: int, owner: str, side: str, price: float, quantity: float):
+        self.id = order_id
+        self.owner = owner
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "owner": self.owner, "side": self.side, "price": self.price,
+                "quantity": self.quantity, "remaining": self.remaining}
+
+class OrderBook:
+    """Limit order book for BTC priced in E-Coin, matched with price-time priority.
+
+    Bids and asks are binary heaps of (price key, order id, order); bids use negated
+    prices so both heaps pop their best order first, and order ids break ties in arrival
+    order. Cancelled and filled orders are dropped lazily when they reach the top of a
+    heap, and the heaps are compacted once stale entries outnumber live ones.
+    """
+    def __init__(self):
+        self.bids = []
+        self.asks = []
+        self.orders = {}  # order id -> live Order
+        self.next_id = 1
+        self.stale = 0
+        self.last_npc_update = time.time()
+        self.npc_quotes = []  # ids of the market makers' current quotes
+        self.rng = random.Random()  # NPC order flow, kept apart from the global generator
+
+    def submit(self, owner: str, side: str, price: float, quantity: float,
+               resting: bool = True) -> Tuple[Order, List[Tuple[Order, Order, float, float]]]:
+        """Match a limit order against the book.
+
+        Returns the order and its fills as (maker, taker, price, quantity) tuples. Any
+        unfilled remainder rests in the book unless resting is False.
+        """
+        order = Order(self.next_id, owner, side, price, quantity)
+        self.next_id += 1
+        fills = []
+
+        if side == "buy":
+            book = self.asks
+            while book:
+                key, _, maker = book[0]
+                if maker.remaining <= ORDER_EPSILON:
+                    heapq.heappop(book)
+                    self.stale -= 1
+                    continue
+                if key > price:
+                    break
+                quantity = min(order.remaining, maker.remaining)
+                maker.remaining -= quantity
+                order.remaining -= quantity
+                fills.append((maker, order, key, quantity))
+                if maker.remaining <= ORDER_EPSILON:
+                    heapq.heappop(book)
+                    del self.orders[maker.id]
+                if order.remaining <= ORDER_EPSILON:
+                    break
+        else:
+            book = self.bids
+            while book:
+                key, _, maker = book[0]
+                if maker.remaining <= ORDER_EPSILON:
+                    heapq.heappop(book)
+                    self.stale -= 1
+                    continue
+                if -key < price:
+                    break
+                quantity = min(order.remaining, maker.remaining)
+                maker.remaining -= quantity
+                order.remaining -= quantity
+                fills.append((maker, order, -key, quantity))
+                if maker.remaining <= ORDER_EPSILON:
+                    heapq.heappop(book)
+                    del self.orders[maker.id]
+                if order.remaining <= ORDER_EPSILON:
+                    break
+
+        if order.remaining > ORDER_EPSILON and resting:
+            self._rest(order)
+        return order, fills
+
+    def _rest(self, order: Order) -> None:
+        """Put an order into its side of the book"""
+        self.orders[order.id] = order
+        if order.side == "buy":
+            heapq.heappush(self.bids, (-order.price, order.id, order))
+        else:
+            heapq.heappush(self.asks, (order.price, order.id, order))
+
+    def cancel(self, order_id: int) -> Optional[Order]:
+        """Cancel a resting order; it is removed from its heap lazily"""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        cancelled = Order(order.id, order.owner, order.side, order.price, order.quantity)
+        cancelled.remaining = order.remaining
+        order.remaining = 0.0
+        self.stale += 1
+        if self.stale > len(self.orders):
+            self.compact()
+        return cancelled
+
+    def compact(self) -> None:
+        """Rebuild both heaps from the live orders only"""
+        self.bids = [(-o.price, o.id, o) for o in self.orders.values() if o.side == "buy"]
+        self.asks = [(o.price, o.id, o) for o in self.orders.values() if o.side == "sell"]
+        heapq.heapify(self.bids)
+        heapq.heapify(self.asks)
+        self.stale = 0
+
+    def best(self, side: str) -> Optional[float]:
+        """Best live bid ('buy') or ask ('sell') price"""
+        book = self.bids if side == "buy" else self.asks
+        while book and book[0][2].remaining <= ORDER_EPSILON:
+            heapq.heappop(book)
+            self.stale -= 1
+        if not book:
+            return None
+        return -book[0][0] if side == "buy" else book[0][0]
+
+    def depth(self, side: str, levels: int = 5) -> List[Tuple[float, float]]:
+        """Aggregated (price, quantity) for the best price levels of one side"""
+        book = self.bids if side == "buy" else self.asks
+        result = []
+        for key, _, order in sorted(heapq.nsmallest(levels * 8, book)):
+            if order.remaining <= ORDER_EPSILON:
+                continue
+            price = -key if side == "buy" else key
+            if result and result[-1][0] == price:
+                result[-1] = (price, result[-1][1] + order.remaining)
+            elif len(result) == levels:
+                break
+            else:
+                result.append((price, order.remaining))
+        return result
+
+    def player_orders(self) -> List[Order]:
+        """The player's resting orders, oldest first"""
+        return sorted((o for o in self.orders.values() if o.owner == "player"), key=lambda o: o.id)
+
+    def restore(self, orders: List[Dict]) -> None:
+        """Put saved orders back into the book without matching them"""
+        for data in orders:
+            order = Order(data["id"], data["owner"], data["side"], data["price"], data["quantity"])
+            order.remaining = data["remaining"]
+            self._rest(order)
+            self.next_id = max(self.next_id, order.id + 1)
+
+def npc_trading_round(book: OrderBook, reference: float, rng: random.Random) -> List[Tuple[Order, Order, float, float]]:
+    """One round of NPC order flow: market makers requote, then takers cross the spread"""
+    for order_id in book.npc_quotes:
+        book.cancel(order_id)
+    book.npc_quotes = []
+
+    fills = []
+    for level in range(1, NPC_QUOTE_LEVELS + 1):
+        offset = NPC_SPREAD * level
+        for side, price in (("buy", reference * (1 - offset)), ("sell", reference * (1 + offset))):
+            order, level_fills = book.submit("npc", side, round(price, 2), round(rng.uniform(0.05, 1.5), 4))
+            fills.extend(level_fills)
+            if order.remaining > ORDER_EPSILON:
+                book.npc_quotes.append(order.id)
+
+    for _ in range(rng.randint(1, NPC_TAKERS_PER_ROUND)):
+        side = rng.choice(("buy", "sell"))
+        slippage = rng.uniform(0, NPC_SPREAD * NPC_QUOTE_LEVELS)
+        price = reference * (1 + slippage) if side == "buy" else reference * (1 - slippage)
+        _, taker_fills = book.submit("npc", side, round(price, 2), round(rng.uniform(0.01, 0.5), 4), resting=False)
+        fills.extend(taker_fills)
+    return fills
+
+# Proof-of-work mining
+def mine_nonces(header: bytes, start: int, count: int, target: bytes) -> Tuple[int, List[int], int, float]:
+    """Process pool worker: double SHA-256 a nonce range and return the shares below the target.
+
+    Returns (worker pid, share nonces, hashes done, seconds spent).
+    """
+    began = time.perf_counter()
+    prefix = hashlib.sha256(header)
+    sha256 = hashlib.sha256
+    shares = []
+    for nonce in range(start, start + count):
+        digest = prefix.copy()
+        digest.update(nonce.to_bytes(8, "little"))
+        # Digests compare like big-endian numbers, so no int conversion is needed
+        if sha256(digest.digest()).digest() < target:
+            shares.append(nonce)
+    return os.getpid(), shares, count, time.perf_counter() - began
+
+def mining_target(bits: int) -> bytes:
+    """Difficulty target as a 32-byte digest: a share needs `bits` leading zero bits"""
+    return (1 << (256 - bits)).to_bytes(32, "big")
+
+def warm_up() -> None:
+    """No-op job used to start pool workers"""
+
+worker_pool = None
+
+def get_worker_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Shared process pool with one worker per host core, started on first use.
+
+    The pool is never resized, so the miner, password cracking and the simulator can use
+    it at the same time; each keeps only as many jobs in flight as it wants workers.
+    Workers are started through a fork server (or spawned where there is none), never
+    forked from this process: by the time a pool is needed the miner, content pool or
+    dashboard threads may be running, and a fork would copy whatever locks they hold.
+    """
+    global worker_pool
+    if worker_pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        worker_pool = concurrent.futures.ProcessPoolExecutor(max_workers=WORKER_POOL_SIZE,
+                                                             mp_context=multiprocessing.get_context(method))
+        concurrent.futures.wait([worker_pool.submit(warm_up) for _ in range(WORKER_POOL_SIZE)])
+    return worker_pool
+
+def run_jobs(calls: Iterable[Tuple], limit: int) -> Iterator[Any]:
+    """Run (function, *args) calls on the shared pool, at most `limit` at once; yields results as they finish"""
+    pool = get_worker_pool()
+    calls = iter(calls)
+    in_flight = set()
+    while True:
+        for function, *args in itertools.islice(calls, limit - len(in_flight)):
+            in_flight.add(pool.submit(function, *args))
+        if not in_flight:
+            return
+        done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+def shutdown_worker_pool() -> None:
+    """Stop the shared process pool"""
+    global worker_pool
+    if worker_pool is not None:
+        worker_pool.shutdown(wait=True)
+        worker_pool = None
+
+atexit.register(shutdown_worker_pool)
+
+def host_worker_count(virtual_cores: int) -> int:
+    """Workers for a virtual CPU: one per virtual core, capped by the host's cores"""
+    return max(1, min(virtual_cores, WORKER_POOL_SIZE))
+
+class Miner:
+    """Runs pool mining jobs on the shared process pool from a background thread.
+
+    The thread keeps one job per worker in flight and only records results; shares are
+    credited to the player by collect() at command boundaries so the game state is
+    never changed behind the prompt's back.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.workers = 0
+        self.started = 0.0
+        self.pending_shares = 0
+        self.total_shares = 0
+        self.total_hashes = 0
+        self.worker_stats = {}  # worker pid -> [hashes, seconds, shares]
+        self.error = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, workers: int) -> None:
+        """Start (or restart) mining with a number of pool workers"""
+        self.stop()
+        pool = get_worker_pool()
+        self.workers = workers
+        self.started = time.time()
+        self.worker_stats = {}
+        self.error = None
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(pool,), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop mining and wait for the jobs in flight"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def _run(self, pool: concurrent.futures.ProcessPoolExecutor) -> None:
+        """Background thread: keep every worker busy until stopped"""
+        target = mining_target(MINING_SHARE_BITS)
+        header = os.urandom(32)
+        next_nonce = 0
+        in_flight = set()
+        try:
+            while not self.stop_event.is_set():
+                while len(in_flight) < self.workers:
+                    in_flight.add(pool.submit(mine_nonces, header, next_nonce, MINING_JOB_NONCES, target))
+                    next_nonce += MINING_JOB_NONCES
+                done, in_flight = concurrent.futures.wait(in_flight, timeout=0.5,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    self._record(*future.result())
+            for future in concurrent.futures.as_completed(in_flight):
+                self._record(*future.result())
+        except Exception as e:
+            self.error = str(e)
+
+    def _record(self, pid: int, shares: List[int], hashes: int, seconds: float) -> None:
+        """Add a finished job to the statistics"""
+        with self.lock:
+            stats = self.worker_stats.setdefault(pid, [0, 0.0, 0])
+            stats[0] += hashes
+            stats[1] += seconds
+            stats[2] += len(shares)
+            self.total_hashes += hashes
+            self.total_shares += len(shares)
+            self.pending_shares += len(shares)
+
+    def collect(self) -> int:
+        """Take the shares found since the last call"""
+        with self.lock:
+            shares, self.pending_shares = self.pending_shares, 0
+        return shares
+
+    def hash_rates(self) -> List[Tuple[int, float, int]]:
+        """(pid, hashes per second, shares) for every worker that has finished a job"""
+        with self.lock:
+            return [(pid, hashes / seconds if seconds else 0.0, shares)
+                    for pid, (hashes, seconds, shares) in sorted(self.worker_stats.items())]
+
+miner = Miner()
+atexit.register(miner.stop)
+
+# Password cracking
+# Base words for the default wordlist installed in ~/tools/wordlists
+CRACK_WORDLIST = """
+password 123456 12345678 qwerty abc123 monkey letmein dragon 111111 baseball
+iloveyou trustno1 1234567 sunshine master 123123 welcome shadow ashley football
+jesus michael ninja mustang password1 admin administrator root toor changeme
+default guest user login secret access passw0rd pass test test123 demo
+hello charlie donald freedom whatever qazwsx batman superman princess starwars
+solo flower hottie loveme zaq1zaq1 696969 654321 computer internet server
+network system database oracle mysql cisco router linux windows backup
+hunter ranger buster soccer hockey killer george harley jordan thomas
+summer winter spring autumn january february october november december monday
+tigger robert daniel jessica jennifer joshua andrew matthew pepper ginger
+cookie cheese banana orange purple silver golden diamond thunder matrix
+hacker hacking security firewall exploit payload rootkit malware virus trojan
+fsociety mrrobot elliot alderson darlene angela moss tyrell wellick whiterose
+darkarmy ecorp evilcorp allsafe steelmountain coney island arcade robot
+revolution anonymous legion freedom1 rebel chaos anarchy control society
+mask hoodie friend hellofriend morphine qwerty123 letmein1 1q2w3e4r 1qaz2wsx
+zxcvbnm asdfgh asdfghjkl qwertyuiop 987654321 000000 121212 112233 7777777
+samsung apple google facebook twitter linkedin amazon microsoft nvidia intel
+corporate company office manager finance payroll accounting marketing sales
+support helpdesk service operator private public secure access1 master1
+welcome1 summer2015 winter2015 spring2015 banking bitcoin ecoin crypto
+blockchain wallet money dollar cash credit debit invest profit gold
+""".split()
+
+LEET_TABLE = str.maketrans({"a": "4", "e": "3", "i": "1", "o": "0", "s": "5", "t": "7"})
+
+def leet(word: str) -> str:
+    """Leetspeak substitution"""
+    return word.translate(LEET_TABLE)
+
+def reverse(word: str) -> str:
+    """The word spelled backwards"""
+    return word[::-1]
+
+# Mangling rules as (word transform, suffixes); tier N is unlocked at crypto level N
+CRACK_RULE_TIERS = [
+    [(str, ["", "1"]), (str.capitalize, ["", "1"]), (str.upper, [""])],
+    [(str, ["12", "123", "1234", "!", "?", "01", "69", "007", "2015", "2016"]),
+     (str.capitalize, ["12", "123", "!", "2015"]), (leet, ["", "1", "!"])],
+    [(transform, [f"{n:02d}" for n in range(100)] + [str(year) for year in range(1970, 2026)] + ["!!", "!@#"])
+     for transform in (str, str.capitalize, leet)] + [(reverse, ["", "1"])]
+]
+CRACK_MIDSTATE_LEVEL = 3       # Crypto level that hashes each word's salted prefix only once
+CRACK_CHUNK_WORDS = 32         # Words per worker job
+DEFAULT_WORDLIST = "~/tools/wordlists/common.txt"
+# Vulnerabilities that leave a crackable password behind, with the account they expose
+CREDENTIAL_VULNERABILITIES = {"weak_password": "admin", "weak_admin_password": "administrator",
+                              "default_credentials": "support"}
+
+def rule_candidates(tiers: int) -> int:
+    """Candidates generated per word with the first `tiers` rule tiers"""
+    return sum(len(suffixes) for tier in CRACK_RULE_TIERS[:tiers] for _, suffixes in tier)
+
+def crack_chunk(words: List[str], tiers: int, salt: bytes, target: bytes, midstate: bool) -> Tuple[Optional[str], int, float]:
+    """Process pool worker: try every mangled candidate of a chunk of words.
+
+    Returns (password or None, candidates tried, seconds spent).
+    """
+    began = time.perf_counter()
+    rules = [rule for tier in CRACK_RULE_TIERS[:tiers] for rule in tier]
+    tried = 0
+    if midstate:
+        # Hash salt + transformed word once and extend a copy of that state per suffix
+        salted = hashlib.sha256(salt)
+        rules = [(transform, [suffix.encode() for suffix in suffixes]) for transform, suffixes in rules]
+        for word in words:
+            for transform, suffixes in rules:
+                base = transform(word)
+                state = salted.copy()
+                state.update(base.encode())
+                for suffix in suffixes:
+                    digest = state.copy()
+                    digest.update(suffix)
+                    if digest.digest() == target:
+                        return base + suffix.decode(), tried + 1, time.perf_counter() - began
+                tried += len(suffixes)
+    else:
+        sha256 = hashlib.sha256
+        for word in words:
+            for transform, suffixes in rules:
+                for suffix in suffixes:
+                    candidate = transform(word) + suffix
+                    if sha256(salt + candidate.encode()).digest() == target:
+                        return candidate, tried + 1, time.perf_counter() - began
+                tried += len(suffixes)
+    return None, tried, time.perf_counter() - began
+
+def add_credentials(target: Dict, rng: random.Random = random) -> None:
+    """Give a target with a password weakness a salted SHA-256 credential"""
+    if "credentials" in target:
+        return
+    users = [CREDENTIAL_VULNERABILITIES[v] for v in target.get("vulnerabilities", []) if v in CREDENTIAL_VULNERABILITIES]
+    if not users:
+        return
+    # Default credentials are always plain; otherwise better secured hosts need more rules
+    if "default_credentials" in target["vulnerabilities"]:
+        tier = 1
+    else:
+        tier = min(len(CRACK_RULE_TIERS), 1 + target.get("security_level", 1) // 3)
+    transform, suffixes = rng.choice(CRACK_RULE_TIERS[tier - 1])
+    password = transform(rng.choice(CRACK_WORDLIST)) + rng.choice(suffixes)
+    salt = os.urandom(16)
+    target["credentials"] = {
+        "user": users[0],
+        "salt": salt.hex(),
+        "hash": hashlib.sha256(salt + password.encode()).hexdigest(),
+        "tier": tier
+    }
+
+def stream_words(content: str):
+    """Yield the words of a wordlist one line at a time without splitting the whole file"""
+    start = 0
+    while start < len(content):
+        end = content.find("\n", start)
+        if end == -1:
+            end = len(content)
+        word = content[start:end].strip()
+        if word and not word.startswith("#"):
+            yield word
+        start = end + 1
+
+# Darkweb circuits
+class Circuit:
+    """An open circuit to a darkweb site: its relays as (role, IP, round-trip ms) in order"""
+    __slots__ = ("site", "relays", "build_seconds", "opened", "last_used", "uses")
+
+    def __init__(self, site: str, relays: List[Tuple[str, str, float]], build_seconds: float, now: float):
+        self.site = site
+        self.relays = relays
+        self.build_seconds = build_seconds
+        self.opened = now
+        self.last_used = now
+        self.uses = 0
+
+    def rtt(self) -> float:
+        """Round trip through every relay of the circuit, in seconds"""
+        return sum(rtt for _, _, rtt in self.relays) / 1000
+
+class CircuitPool:
+    """Darkweb circuits kept open for reuse, one per site, in least recently used order.
+
+    Building a circuit extends it one relay at a time. Every extension is a round trip
+    through the relays so far plus a cell each way over the player's link, and the
+    site's descriptor is then fetched over the new circuit, so a slow link makes cold
+    connects slow. A warm circuit only costs the round trip that opens a stream on it.
+    Circuits unused for CIRCUIT_IDLE_TIMEOUT are closed the next time the pool is used.
+    """
+    def __init__(self):
+        self.circuits = {}          # site -> Circuit, least recently used first
+        self.cold = LogHistogram()  # connect latency when a circuit had to be built, in seconds
+        self.warm = LogHistogram()  # connect latency over a pooled circuit, in seconds
+        self.built = 0
+        self.closed = 0
+
+    def expire(self, now: float, keep: Optional[str] = None) -> None:
+        """Close the circuits that sat idle for too long, except the one to the site in use"""
+        for site, circuit in list(self.circuits.items()):
+            if site != keep and now - circuit.last_used > CIRCUIT_IDLE_TIMEOUT:
+                del self.circuits[site]
+                self.closed += 1
+
+    def connect(self, site: str, uplink_ms: float, mbps: float, keep: Optional[str] = None,
+                rng=random) -> Tuple[Circuit, float, bool]:
+        """Open a stream to a site, building a circuit unless a warm one is pooled.
+
+        Returns the circuit, the connect latency in seconds and whether the circuit was reused.
+        """
+        now = time.time()
+        self.expire(now, keep)
+        uplink = uplink_ms / 1000
+        circuit = self.circuits.pop(site, None)
+        reused = circuit is not None
+        if reused:
+            latency = uplink + circuit.rtt()
+            self.warm.add(latency)
+        else:
+            relays = [(role, f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                       rng.uniform(*CIRCUIT_RELAY_MS)) for role in CIRCUIT_HOPS]
+            cell = 2 * CIRCUIT_CELL_BYTES * 8 / (mbps * 1e6)
+            build = 0.0
+            for hop in range(1, len(relays) + 1):
+                build += uplink + sum(rtt for _, _, rtt in relays[:hop]) / 1000 + cell
+            # The site's descriptor comes back over the finished circuit
+            build += uplink + sum(rtt for _, _, rtt in relays) / 1000 + CIRCUIT_DESCRIPTOR_BYTES * 8 / (mbps * 1e6)
+            circuit = Circuit(site, relays, build, now)
+            latency = build + uplink + circuit.rtt()
+            self.cold.add(latency)
+            self.built += 1
+            if len(self.circuits) >= CIRCUIT_POOL_SIZE:
+                del self.circuits[next(iter(self.circuits))]
+                self.closed += 1
+        circuit.last_used = now
+        circuit.uses += 1
+        self.circuits[site] = circuit
+        return circuit, latency, reused
+
+    def release(self, site: str) -> None:
+        """The player left a site; its circuit's idle time starts now"""
+        circuit = self.circuits.get(site)
+        if circuit is not None:
+            circuit.last_used = time.time()
+
+# Event log
+class EventLog:
+    """Append-only JSONL log of game events, split into rotating segments.
+
+    Segments are numbered files (prefix.0001.jsonl, prefix.0002.jsonl, ...); a new one is
+    started when the current segment passes EVENT_LOG_SEGMENT_BYTES and only the newest
+    EVENT_LOG_SEGMENTS are kept. Every EVENT_INDEX_STRIDE entries a sparse index point
+    (time, segment, byte offset) is appended to prefix.idx, so time-based queries seek
+    straight to the right place instead of reading the whole log.
+    """
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.index = None      # [(time, segment, offset)], loaded on first use
+        self.segment = None
+        self.handle = None
+        self.since_index = 0   # entries written since the last index point
+        self.enabled = True    # False for headless runs that must not touch the disk
+
+    def segment_path(self, segment: int) -> str:
+        return f"{self.prefix}.{segment:04d}.jsonl"
+
+    def segments(self) -> List[int]:
+        """Segment numbers on disk, oldest first"""
+        directory = os.path.dirname(self.prefix) or "."
+        name = os.path.basename(self.prefix)
+        pattern = re.compile(re.escape(name) + r"\.(\d+)\.jsonl$")
+        try:
+            return sorted(int(m.group(1)) for m in map(pattern.match, os.listdir(directory)) if m)
+        except OSError:
+            return []
+
+    def load_index(self) -> List[Tuple[float, int, int]]:
+        """The sparse time index, read from disk the first time it is needed"""
+        if self.index is None:
+            self.index = []
+            try:
+                with open(f"{self.prefix}.idx") as f:
+                    for line in f:
+                        try:
+                            when, segment, offset = json.loads(line)
+                        except ValueError:
+                            continue  # Torn write from a crash
+                        self.index.append((when, segment, offset))
+            except OSError:
+                pass
+        return self.index
+
+    def append(self, entry: Dict) -> None:
+        """Write one entry, rotating segments and extending the index as needed"""
+        if not self.enabled:
+            return
+        if self.handle is None:
+            existing = self.segments()
+            self.segment = existing[-1] if existing else 1
+            self.handle = open(self.segment_path(self.segment), "a", encoding="utf-8")
+            self.since_index = EVENT_INDEX_STRIDE  # Resume with a fresh index point
+        offset = self.handle.tell()
+        if offset >= EVENT_LOG_SEGMENT_BYTES:
+            self.rotate()
+            offset = 0
+        if self.since_index >= EVENT_INDEX_STRIDE or offset == 0:
+            self.load_index().append((entry["time"], self.segment, offset))
+            with open(f"{self.prefix}.idx", "a") as f:
+                f.write(json.dumps([entry["time"], self.segment, offset]) + "\n")
+            self.since_index = 0
+        self.handle.write(json.dumps(entry) + "\n")
+        self.handle.flush()
+        self.since_index += 1
+
+    def rotate(self) -> None:
+        """Start a new segment and delete the ones beyond the retention limit"""
+        self.handle.close()
+        self.segment += 1
+        self.handle = open(self.segment_path(self.segment), "a", encoding="utf-8")
+        existing = self.segments()
+        expired = existing[:-EVENT_LOG_SEGMENTS]
+        for segment in expired:
+            try:
+                os.remove(self.segment_path(segment))
+            except OSError:
+                pass
+        if expired:
+            # Rewrite the index without the deleted segments
+            self.index = [point for point in self.load_index() if point[1] > expired[-1]]
+            with open(f"{self.prefix}.idx", "w") as f:
+                for point in self.index:
+                    f.write(json.dumps(list(point)) + "\n")
+
+    def read_from(self, segment: int, offset: int):
+        """Yield entries from a position to the end of the log"""
+        for number in self.segments():
+            if number < segment:
+                continue
+            try:
+                with open(self.segment_path(number), encoding="utf-8") as f:
+                    if number == segment:
+                        f.seek(offset)
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue
+            except OSError:
+                continue
+
+    def since(self, when: float):
+        """Yield entries logged at or after a timestamp"""
+        index = self.load_index()
+        position = bisect.bisect_left(index, (when,)) - 1
+        if position >= 0:
+            _, segment, offset = index[position]
+        else:
+            segment, offset = 0, 0
+        for entry in self.read_from(segment, offset):
+            if entry.get("time", 0) >= when:
+                yield entry
+
+    def tail(self, count: int) -> List[Dict]:
+        """The newest `count` entries"""
+        index = self.load_index()
+        # Index points are at most EVENT_INDEX_STRIDE entries apart (closer after a
+        # restart), so step back that far and widen the window until it is enough
+        back = -(-count // EVENT_INDEX_STRIDE) + 1
+        while True:
+            position = max(0, len(index) - back)
+            start = index[position][1:] if index else (0, 0)
+            entries = deque(self.read_from(*start), maxlen=count)
+            if len(entries) >= count or position == 0:
+                return list(entries)
+            back *= 2
+
+    def close(self) -> None:
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+event_log = EventLog(EVENT_LOG_PREFIX)
+atexit.register(event_log.close)
+
+# colorama escape -> color name, so history entries store names instead of escapes
+HISTORY_COLORS = {getattr(colorama.Fore, name): name for name in
+                  ("BLACK", "RED", "GREEN", "YELLOW", "BLUE", "MAGENTA", "CYAN", "WHITE")}
+
+# Typed command history
+class CommandHistory:
+    """Commands typed at the prompt, kept across sessions in a readline history file.
+
+    The file is read by readline's pre-input hook once the first prompt is on screen
+    rather than at startup, and each new command is appended rather than the whole
+    file rewritten. Readline already skips repeats of the previous command; older
+    duplicates are removed when the file outgrows its cap and is compacted. Searching
+    (Ctrl-R) is readline's own, which stays instant at the cap.
+    """
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.installed = False
+        self.loaded = False
+        self.rewind = None   # the readline library's using_history(), if it can be reached
+        self.length = 0      # readline history length after the last recorded command
+        self.disk_lines = 0
+
+    def install(self) -> None:
+        """Enable history for the main prompt when readline and a terminal are available"""
+        if readline is None or not sys.stdin.isatty():
+            return
+        libedit = "libedit" in (readline.__doc__ or "")
+        if libedit:
+            readline.parse_and_bind("bind ^R em-inc-search-prev")
+        self.installed = True
+        # History read in the hook is only reachable with the up arrow once readline's
+        # position is moved past it, which the Python module offers no call for. Only
+        # GNU readline linked into a shared module exports using_history() for that.
+        self.rewind = None
+        if not libedit and getattr(readline, "backend", "readline") == "readline":
+            try:
+                self.rewind = ctypes.CDLL(readline.__file__).using_history
+                readline.set_pre_input_hook(self.load)
+            except Exception:
+                self.rewind = None
+        if self.rewind is None:
+            # Elsewhere load before the first prompt with the standard calls only
+            self.load()
+
+    def load(self) -> None:
+        """Read the history file once, compacting it first if it grew too big"""
+        if not self.installed or self.loaded:
+            return
+        self.loaded = True
+        if self.rewind is not None:
+            readline.set_pre_input_hook(None)
+        try:
+            if not os.path.exists(self.path):
+                open(self.path, "a").close()
+            with open(self.path, "rb") as f:
+                self.disk_lines = f.read().count(b"\n")
+            if self.disk_lines > self.size:
+                self.compact()
+            readline.read_history_file(self.path)
+            if self.rewind is not None:
+                self.rewind()
+        except OSError:
+            self.installed = False
+        self.length = readline.get_current_history_length()
+
+    def record(self, command: str) -> None:
+        """Persist the command readline just added to its history"""
+        if not self.installed:
+            return
+        # Blank lines and repeats of the previous command are not added by readline
+        length = readline.get_current_history_length()
+        if length == self.length:
+            return
+        self.length = length
+        try:
+            readline.append_history_file(1, self.path)
+            self.disk_lines += 1
+            if self.disk_lines > self.size * 1.1:
+                self.compact()
+                readline.clear_history()
+                readline.read_history_file(self.path)
+                self.length = readline.get_current_history_length()
+        except OSError:
+            pass
+
+    def compact(self) -> None:
+        """Rewrite the file with the newest occurrence of each command, at most `size` of them"""
+        with open(self.path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+        seen = set()
+        kept = []
+        for line in reversed(lines):
+            if line not in seen:
+                seen.add(line)
+                kept.append(line)
+                if len(kept) == self.size:
+                    break
+        kept.reverse()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in kept))
+        os.replace(temp_path, self.path)
+        self.disk_lines = len(kept)
+
+command_history = CommandHistory(COMMAND_HISTORY_FILE, COMMAND_HISTORY_SIZE)
+
+def readline_prompt(prompt: str) -> str:
+    """Mark escape sequences in a prompt as zero-width so readline measures it correctly"""
+    if not command_history.installed:
+        return prompt
+    return re.sub(r"(\x1b\[[0-9;]*m)", "\001\\1\002", prompt)
+
+# Mission and championship registry
+class ColdArchive:
+    """Append-only JSONL store for missions and championships that left the hot state.
+
+    Each line is {"kind", "status", "archived_at", "entry"}. Lookups by ID seek to the
+    entry through an offset index, which is built with one pass over the file the first
+    time it is needed and then kept up to date as entries are appended.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.index = None     # (kind, id) -> byte offset, loaded on first use
+        self.enabled = True   # False for headless runs that must not touch the disk
+
+    def load_index(self) -> Dict[Tuple[str, str], int]:
+        """The offset index, read from disk the first time it is needed"""
+        if self.index is None:
+            self.index = {}
+            try:
+                with open(self.path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                            self.index[(record["kind"], record["entry"]["id"])] = offset
+                        except (ValueError, KeyError, TypeError):
+                            pass  # Torn write from a crash
+                        offset += len(line)
+            except OSError:
+                pass
+        return self.index
+
+    def store(self, kind: str, status: str, entry: Dict) -> None:
+        """Append an entry that left the hot state"""
+        if not self.enabled:
+            return
+        index = self.load_index()
+        record = {"kind": kind, "status": status, "archived_at": time.time(), "entry": entry}
+        try:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write((json.dumps(record) + "\n").encode("utf-8"))
+        except OSError as e:
+            print(Fore.RED + f"Error archiving {kind} {entry['id']}: {e}")
+            return
+        index[(kind, entry["id"])] = offset
+
+    def fetch(self, kind: str, entry_id: str) -> Optional[Dict]:
+        """The archived record of an entry, or None if it was never archived"""
+        offset = self.load_index().get((kind, entry_id))
+        if offset is None:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def clear(self) -> None:
+        """Delete the archive, e.g. when a new game starts"""
+        self.index = {}
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+archive = ColdArchive(ARCHIVE_FILE)
+
+class Registry:
+    """Missions or championships indexed by ID and partitioned by status.
+
+    Every hot entry is in `entries` (ID -> entry) and in exactly one of the available,
+    active and completed partitions, so lookups and status changes are O(1) and listing
+    the open entries only walks the available and active partitions. Expired and
+    abandoned entries, and completed ones beyond the newest REGISTRY_COMPLETED_KEPT,
+    move to the cold archive. IDs come from a counter and are never reused.
+    """
+    def __init__(self, kind: str, prefix: str, entries: List[Dict] = ()):
+        self.kind = kind
+        self.prefix = prefix
+        self.entries = {}
+        self.available = {}
+        self.active = {}
+        self.completed = {}
+        self.next_id = 1
+        self.archived = 0  # entries moved to the cold archive so far
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def new_id(self) -> str:
+        """Reserve the next unused ID"""
+        entry_id = f"{self.prefix}{self.next_id:03d}"
+        self.next_id += 1
+        return entry_id
+
+    def add(self, entry: Dict) -> None:
+        """Insert an entry into the partition its completed flag calls for"""
+        entry_id = entry["id"]
+        self.entries[entry_id] = entry
+        (self.completed if entry.get("completed") else self.available)[entry_id] = entry
+        number = entry_id[len(self.prefix):]
+        if number.isdigit():
+            self.next_id = max(self.next_id, int(number) + 1)
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        return self.entries.get(entry_id)
+
+    def open(self) -> List[Dict]:
+        """Entries that are not completed, offered ones first"""
+        return list(self.available.values()) + list(self.active.values())
+
+    def _move(self, entry_id: str, partition: Dict) -> Optional[Dict]:
+        entry = self.entries.get(entry_id)
+        if entry is not None:
+            self.available.pop(entry_id, None)
+            self.active.pop(entry_id, None)
+            self.completed.pop(entry_id, None)
+            partition[entry_id] = entry
+        return entry
+
+    def activate(self, entry_id: str) -> Optional[Dict]:
+        """Mark an entry as taken on by the player"""
+        return self._move(entry_id, self.active)
 
-# Global constants
-SAVE_FILE = "asathot_data.json"
-VERSION = "1.0.0"
-DEFAULT_BTC_VALUE = 45000  # USD per BTC
-DEFAULT_ECOIN_VALUE = 1    # USD per E-Coin
-MIN_TERMINAL_WIDTH = 80
-MIN_TERMINAL_HEIGHT = 24
+    def release(self, entry_id: str) -> Optional[Dict]:
+        """Offer an active entry again"""
+        if entry_id in self.active:
+            return self._move(entry_id, self.available)
+        return None
 
-# Mr. Robot universe constants
-FSOCIETY_REP_THRESHOLD = 50  # Reputation needed to join fsociety
-DARK_ARMY_REP_THRESHOLD = 75  # Reputation needed to be noticed by Dark Army
-ECORP_SECURITY_LEVEL = 9     # E Corp security level (very high)
+    def complete(self, entry_id: str) -> Optional[Dict]:
+        """Mark an entry as completed, archiving the oldest completed ones past the cap"""
+        entry = self._move(entry_id, self.completed)
+        if entry is not None:
+            entry["completed"] = True
+            while len(self.completed) > REGISTRY_COMPLETED_KEPT:
+                self.archive(next(iter(self.completed)), "completed")
+        return entry
+
+    def archive(self, entry_id: str, status: str) -> Optional[Dict]:
+        """Move an entry out of the hot state into the cold archive"""
+        entry = self.entries.pop(entry_id, None)
+        if entry is not None:
+            self.available.pop(entry_id, None)
+            self.active.pop(entry_id, None)
+            self.completed.pop(entry_id, None)
+            archive.store(self.kind, status, entry)
+            self.archived += 1
+        return entry
+
+    def lookup(self, entry_id: str) -> Optional[Dict]:
+        """An entry from the hot state or, marked with its "archived" status, from the archive"""
+        entry = self.entries.get(entry_id)
+        if entry is None:
+            record = archive.fetch(self.kind, entry_id)
+            if record is not None:
+                entry = dict(record["entry"], archived=record["status"])
+        return entry
+
+    def to_dict(self) -> Dict:
+        """Serialisable snapshot of the hot state for the save file"""
+        return {"entries": list(self.entries.values()), "next_id": self.next_id, "archived": self.archived}
+
+    @classmethod
+    def from_dict(cls, kind: str, prefix: str, data, active: List[str] = ()) -> "Registry":
+        """Rebuild a registry from a save file snapshot; older saves store a plain list"""
+        if isinstance(data, list):
+            data = {"entries": data}
+        registry = cls(kind, prefix, data.get("entries", []))
+        registry.next_id = max(registry.next_id, data.get("next_id", 1))
+        registry.archived = data.get("archived", 0)
+        for entry_id in active:
+            if entry_id in registry.available:
+                registry.activate(entry_id)
+        return registry
+
+# Derived stats
+class DerivedStats:
+    """Values derived from the game state, cached until one of their inputs changes.
+
+    Inputs are "pc", "skills", ("target", ip) and "targets" (the target list as a whole,
+    bumped when targets are added or the list is replaced), each with a version counter
+    that the code changing the input bumps through invalidate(); every edit of a target,
+    discovering it included, goes through target_changed(). A cached value remembers the
+    versions it was computed from and is only recomputed once one of them moved on, so
+    planners can query thousands of targets without redoing the same math.
+    """
+    def __init__(self):
+        self.versions = defaultdict(int)
+        self.values = {}  # key -> (input versions, value)
+
+    def reset(self) -> None:
+        """Forget every cached value, e.g. after the state was loaded from a save file.
+
+        Versions move on rather than start over, so stamps taken before the reset go stale.
+        """
+        self.invalidate(*self.versions)
+        self.values = {}
+
+    def invalidate(self, *inputs) -> None:
+        for name in inputs:
+            self.versions[name] += 1
+
+    def peek(self, key) -> Any:
+        """The value cached for key, current or not, or None; for values updated in place"""
+        cached = self.values.get(key)
+        return cached[1] if cached is not None else None
+
+    def get(self, key, inputs: Tuple, compute) -> Any:
+        """Cached value for key, recomputed with compute() if any input changed"""
+        stamp = tuple(self.versions[name] for name in inputs)
+        cached = self.values.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        value = compute()
+        self.values[key] = (stamp, value)
+        return value
 
 # Game state
 class GameState:
     def __init__(self):
         self.current_dir = "~"
+        self.derived = DerivedStats()
         self.file_system = {
             "~": {
                 "type": "dir",
@@ -94,6 +2062,15 @@ class GameState:
                             "data_exfiltrator.py": {
                                 "type": "file",
                                 "content": "# Advanced data exfiltration tool\n# Usage: run data_exfiltrator.py <target_ip> <path>\n\n# Extracts specified files or databases securely\n# Uses encrypted channels to avoid detection\n# Required for fsociety operations"
+                            },
+                            "wordlists": {
+                                "type": "dir",
+                                "content": {
+                                    "common.txt": {
+                                        "type": "file",
+                                        "content": "\n".join(CRACK_WORDLIST)
+                                    }
+                                }
                             }
                         }
                     },
@@ -158,7 +2135,7 @@ class GameState:
         }
         
         # Available missions
-        self.missions = [
+        self.missions = Registry("mission", "m", [
             {
                 "id": "m001",
                 "title": "First Steps",
@@ -224,10 +2201,10 @@ class GameState:
                 "fsociety_required": True,
                 "requires_rep": 45
             }
-        ]
+        ])
         
         # Championship tasks
-        self.championships = [
+        self.championships = Registry("championship", "c", [
             {
                 "id": "c001",
                 "title": "Newbie Challenge",
@@ -269,7 +2246,7 @@ class GameState:
                 "current_task": 0,
                 "dark_army_required": True
             }
-        ]
+        ])
 
         # Network targets
         self.network_targets = [
@@ -313,6 +2290,7 @@ class GameState:
                 "services": ["https", "sql", "radius", "proprietary"],
                 "vulnerabilities": ["custom_vulnerability", "outdated_middleware"],
                 "discovered": False,
+                "subnet": "ecorp-dc",
                 "description": "High-security E Corp banking infrastructure"
             },
             {
@@ -322,6 +2300,7 @@ class GameState:
                 "services": ["https", "hvac", "proprietary_scada", "building_management"],
                 "vulnerabilities": ["hvac_exploitable", "physical_access_controls"],
                 "discovered": False,
+                "subnet": "ecorp-dc",
                 "description": "Corporate data storage facility with HVAC systems"
             },
             {
@@ -334,6 +2313,8 @@ class GameState:
                 "description": "Encrypted server with potential Dark Army connections"
             }
         ]
+        for target in self.network_targets:
+            add_credentials(target)
 
         # Available upgrades
         self.upgrades = {
@@ -401,18 +2382,29 @@ class GameState:
             "commands_executed": 0
         }
         
-        # Command history
-        self.history = []
+        # Recent events (the full history is in the on-disk event log)
+        self.history = deque(maxlen=HISTORY_BUFFER_SIZE)
         
-        # Darkweb connection status
+        # Last scan result per target IP (see record_scan)
+        self.scan_cache = {}
+        
+        # Darkweb connection status and the circuits kept open for reconnecting
         self.connected_to_darkweb = False
         self.current_site = None
+        self.circuits = CircuitPool()
         
         # In-game time acceleration factor (1 = real time, >1 = faster)
         self.time_acceleration = 5
         
         # Game directory and file path tracking
         self.previous_dir = "~"
+        
+        # Simulated cryptocurrency market
+        self.market = MarketEngine()
+        
+        # BTC/E-Coin order book and the player's recent fills
+        self.order_book = OrderBook()
+        self.trades = []
 
 # Initialize the global game state
 game_state = GameState()
@@ -429,9 +2421,22 @@ def format_btc(amount: float) -> str:
     else:
         return f"{int(amount * 100000000)} satoshi"
 
+def update_market() -> MarketEngine:
+    """Bring the market up to the current in-game time"""
+    game_state.market.catch_up(time.time(), game_state.time_acceleration)
+    return game_state.market
+
 def get_btc_usd_value(btc_amount: float) -> float:
-    """Get the USD value of a Bitcoin amount"""
-    return btc_amount * DEFAULT_BTC_VALUE
+    """Get the USD value of a Bitcoin amount at the live market price"""
+    return btc_amount * update_market().price("BTC")
+
+def format_change(change: Optional[float]) -> str:
+    """Format a relative price change with a trend arrow"""
+    if change is None:
+        return "→ n/a"
+    if abs(change) < 0.0005:
+        return f"→ {change * 100:+.1f}%"
+    return f"{'↑' if change > 0 else '↓'} {change * 100:+.1f}%"
 
 def print_header():
     """Print the game header/banner"""
@@ -444,6 +2449,7 @@ def print_header():
 
 def save_game():
     """Save the game state to a file"""
+    began = time.perf_counter()
     try:
         with open(SAVE_FILE, 'w') as f:
             json.dump({
@@ -451,21 +2457,32 @@ def save_game():
                 "pc": game_state.pc,
                 "file_system": game_state.file_system,
                 "stats": game_state.stats,
-                "missions": game_state.missions,
-                "championships": game_state.championships,
+                "missions": game_state.missions.to_dict(),
+                "championships": game_state.championships.to_dict(),
                 "network_targets": game_state.network_targets,
-                "current_dir": game_state.current_dir
+                "scan_cache": {ip: {key: value for key, value in result.items() if key != "version"}
+                               for ip, result in game_state.scan_cache.items()
+                               if get_cached_scan(get_target_by_ip(ip), ttl=math.inf)},
+                "current_dir": game_state.current_dir,
+                "market": game_state.market.to_dict(),
+                "orders": [order.to_dict() for order in game_state.order_book.player_orders()],
+                "memory_limits": memory.limits,
+                "mining": {"running": miner.running, "hash_rate": sum(rate for _, rate, _ in miner.hash_rates())},
+                "saved_at": time.time()
             }, f)
         return True
     except Exception as e:
         print(Fore.RED + f"Error saving game: {e}")
         return False
+    finally:
+        perf.record_io("save", time.perf_counter() - began)
 
 def load_game() -> bool:
     """Load the game state from a file"""
     if not os.path.exists(SAVE_FILE):
         return False
         
+    began = time.perf_counter()
     try:
         with open(SAVE_FILE, 'r') as f:
             data = json.load(f)
@@ -473,48 +2490,271 @@ def load_game() -> bool:
             game_state.pc = data.get("pc", game_state.pc)
             game_state.file_system = data.get("file_system", game_state.file_system)
             game_state.stats = data.get("stats", game_state.stats)
-            game_state.missions = data.get("missions", game_state.missions)
-            game_state.championships = data.get("championships", game_state.championships)
+            if "missions" in data:
+                current = game_state.player.get("current_mission")
+                game_state.missions = Registry.from_dict("mission", "m", data["missions"], [current] if current else [])
+            if "championships" in data:
+                game_state.championships = Registry.from_dict("championship", "c", data["championships"])
             game_state.network_targets = data.get("network_targets", game_state.network_targets)
+            game_state.derived.reset()
+            game_state.scan_cache = data.get("scan_cache", {})
+            # Saved scans match their targets as loaded; stamp them before anything edits a target
+            for ip, result in game_state.scan_cache.items():
+                result["version"] = game_state.derived.versions[("target", ip)]
+            for target in game_state.network_targets:
+                if "credentials" not in target:
+                    add_credentials(target)
+                    target_changed(target)
             game_state.current_dir = data.get("current_dir", "~")
+            game_state.market = MarketEngine.from_dict(data.get("market", {}))
+            game_state.order_book = OrderBook()
+            game_state.order_book.restore(data.get("orders", []))
+            memory.limits.update({name: limit for name, limit in data.get("memory_limits", {}).items()
+                                  if name in memory.limits})
+            if "saved_at" in data:
+                apply_offline_progress(data, time.time())
         return True
     except Exception as e:
         print(Fore.RED + f"Error loading game: {e}")
         return False
+    finally:
+        perf.record_io("load", time.perf_counter() - began)
+
+# Offline progression
+def apply_offline_progress(data: Dict, now: float) -> None:
+    """Catch every time-based system up with the real time since the save.
+
+    Each system is advanced in closed form (or one vectorised batch) rather than
+    tick by tick, so the cost does not depend on how long the player was away.
+    """
+    elapsed = max(0.0, now - data["saved_at"])
+    report = []
+    
+    # Market: one bulk catch-up, remembering where the price started
+    market = game_state.market
+    start_btc = market.price("BTC")
+    start_reference = start_btc / market.price("ECOIN")
+    ticks = market.catch_up(now, game_state.time_acceleration)
+    if ticks:
+        report.append(f"BTC moved from ${start_btc:,.2f} to ${market.price('BTC'):,.2f} "
+                      f"({format_change(market.price('BTC') / start_btc - 1)})")
+    
+    # Resting orders: fill each one with the chance that the price crossed its limit
+    end_reference = market.price("BTC") / market.price("ECOIN")
+    book = game_state.order_book
+    volatility = market.volatility[market.assets.index("BTC")]
+    for order in book.player_orders():
+        if ticks and random.random() < barrier_hit_probability(start_reference, end_reference, order.price,
+                                                                 volatility * math.sqrt(ticks), order.side == "buy"):
+            quantity = order.remaining
+            book.cancel(order.id)
+            credit_fill(order, order.price, quantity)
+            report.append(f"Order #{order.id} filled: {order.side} {format_btc(quantity)} at {order.price:,.2f} E-Coin")
+    del game_state.trades[:-TRADE_LOG_SIZE]
+    
+    # Mining: the shares found at the saved hash rate follow a Poisson distribution
+    mining = data.get("mining", {})
+    if mining.get("running"):
+        shares = poisson(mining.get("hash_rate", 0.0) * elapsed / 2 ** MINING_SHARE_BITS)
+        if shares:
+            reward = shares * MINING_SHARE_REWARD
+            game_state.player["bitcoin"] += reward
+            game_state.stats["bitcoins_earned"] += reward
+            report.append(f"Your miner found {shares:,} shares worth {format_btc(reward)}")
+        miner.start(host_worker_count(game_state.pc["cpu"]["cores"]))
+    
+    # Missions: contracts that ran out while the player was away
+    for mission in expire_missions(now):
+        report.append(f"Mission {mission['id']} ({mission['title']}) expired")
+    
+    if elapsed >= OFFLINE_REPORT_SECONDS and report:
+        print(Fore.CYAN + f"\nWhile you were away ({format_time(int(elapsed))}):")
+        for line in report:
+            print(Fore.WHITE + f"  - {line}")
+        print()
+
+def barrier_hit_probability(start: float, end: float, barrier: float, spread: float, below: bool) -> float:
+    """Chance that a log-normal price path from start to end touched a barrier.
+
+    Uses the Brownian bridge form of the reflection principle, with `spread` the
+    standard deviation of the log price over the whole interval.
+    """
+    if (start <= barrier or end <= barrier) if below else (start >= barrier or end >= barrier):
+        return 1.0
+    if spread <= 0:
+        return 0.0
+    distance = math.log(start / barrier) * math.log(end / barrier)
+    return math.exp(-2 * distance / spread ** 2)
+
+def poisson(mean: float) -> int:
+    """Draw a Poisson distributed count"""
+    if mean <= 0:
+        return 0
+    if np is not None:
+        return int(np.random.poisson(mean))
+    if mean > 50:
+        # Normal approximation; Knuth's method would take O(mean) steps
+        return max(0, round(random.gauss(mean, math.sqrt(mean))))
+    limit, count, product = math.exp(-mean), 0, random.random()
+    while product > limit:
+        count += 1
+        product *= random.random()
+    return count
+
+def expire_missions(now: float) -> List[Dict]:
+    """Archive generated missions whose deadline has passed and return them"""
+    expired = [m for m in game_state.missions.open()
+               if m.get("expires_at") is not None and m["expires_at"] <= now]
+    for mission in expired:
+        game_state.missions.archive(mission["id"], "expired")
+        if game_state.player["current_mission"] == mission["id"]:
+            game_state.player["current_mission"] = None
+            game_state.derived.invalidate("objectives")
+        add_to_history(f"Mission '{mission['title']}' expired", Fore.RED)
+    return expired
 
 def add_to_history(message: str, color: str = Fore.WHITE):
-    """Add a message to the command history"""
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-    game_state.history.append({
-        "timestamp": timestamp,
+    """Add a message to the event history and the on-disk event log"""
+    entry = {
+        "time": time.time(),
         "message": message,
-        "color": color
-    })
+        "color": HISTORY_COLORS.get(color, "WHITE")
+    }
+    game_state.history.append(entry)
+    try:
+        event_log.append(entry)
+    except OSError:
+        pass  # The in-memory history still works without a writable disk
+
+def format_event_time(when: float) -> str:
+    """Clock time of an event, with the date when it is not from today"""
+    moment = datetime.datetime.fromtimestamp(when)
+    if moment.date() == datetime.date.today():
+        return moment.strftime("%H:%M:%S")
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
 
-def display_history(count: int = 10):
-    """Display the recent command history"""
-    if not game_state.history:
-        print("No command history available.")
+def parse_clock(text: str) -> Optional[float]:
+    """Timestamp of the latest past occurrence of a HH:MM or HH:MM:SS clock time"""
+    for pattern in ("%H:%M", "%H:%M:%S"):
+        try:
+            clock = datetime.datetime.strptime(text, pattern).time()
+            break
+        except ValueError:
+            continue
+    else:
+        return None
+    now = datetime.datetime.now()
+    moment = datetime.datetime.combine(now.date(), clock)
+    if moment > now:
+        moment -= datetime.timedelta(days=1)
+    return moment.timestamp()
+
+def display_history(args: str = "") -> None:
+    """Display recent events, or search the full event log"""
+    usage = "Usage: history [count] | history [-n N] [--since HH:MM] [grep <regex>]"
+    try:
+        tokens = shlex.split(args)
+    except ValueError as e:
+        print(Fore.RED + f"Error: {e}")
         return
-        
-    print("\nRecent command history:")
-    for entry in game_state.history[-count:]:
-        timestamp = entry["timestamp"]
-        message = entry["message"]
-        color = entry["color"]
-        print(f"{Fore.YELLOW}[{timestamp}]{color} {message}")
+    
+    count = since = pattern = None
+    recent = 10
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token.isdigit() and len(tokens) == 1:
+            recent = int(token)
+            i += 1
+            continue
+        if value is None or token not in ("-n", "--since", "grep"):
+            print(Fore.RED + f"Error: invalid history option: {token}")
+            print(usage)
+            return
+        if token == "-n":
+            if not value.isdigit():
+                print(Fore.RED + "Error: -n needs a number")
+                return
+            count = int(value)
+        elif token == "--since":
+            since = parse_clock(value)
+            if since is None:
+                print(Fore.RED + f"Error: invalid time '{value}', use HH:MM")
+                return
+        else:
+            try:
+                pattern = re.compile(value, re.IGNORECASE)
+            except re.error as e:
+                print(Fore.RED + f"Error: invalid regular expression: {e}")
+                return
+        i += 2
+    
+    if count is None and since is None and pattern is None:
+        # Plain 'history': the in-memory ring buffer
+        if not game_state.history:
+            print("No command history available.")
+            return
+        print("\nRecent command history:")
+        entries = list(game_state.history)[-recent:]
+    else:
+        # Options search the full on-disk log
+        if since is not None:
+            entries = event_log.since(since)
+        elif pattern is None:
+            entries = event_log.tail(count)
+        else:
+            entries = event_log.read_from(0, 0)
+        if pattern is not None:
+            entries = (entry for entry in entries if pattern.search(entry.get("message", "")))
+        entries = list(deque(entries, maxlen=count) if count is not None else entries)
+        if not entries:
+            print("No matching events.")
+            return
+        print(f"\n{len(entries)} event{'s' if len(entries) != 1 else ''}:")
+    
+    for entry in entries:
+        color = getattr(Fore, entry.get("color", "WHITE"), "")
+        print(f"{Fore.YELLOW}[{format_event_time(entry['time'])}]{color} {entry['message']}")
 
 def get_pc_power_level() -> float:
-    """Calculate the current PC's power level"""
-    cpu_power = game_state.pc["cpu"]["cores"] * game_state.pc["cpu"]["speed"]
-    ram_power = math.log2(game_state.pc["ram"]["size"]) / 2
-    storage_power = math.log2(game_state.pc["storage"]["size"]) / 3
-    network_power = math.log10(game_state.pc["network"]["speed"] + 1) * 2
-    security_level = game_state.pc["security"]["level"]
-    
-    return (cpu_power + ram_power + storage_power + network_power) * (1 + security_level / 10)
+    """The current PC's power level, cached until the PC changes"""
+    return game_state.derived.get("pc_power", ("pc",), compute_pc_power_level)
+
+def compute_pc_power_level(pc: Optional[Dict] = None) -> float:
+    """Calculate the power level of a PC (the player's by default)"""
+    pc = pc or game_state.pc
+    power = sum(component_power(category, pc[category]) for category in ("cpu", "ram", "storage", "network"))
+    return power * (1 + pc["security"]["level"] / 10)
+
+def component_power(category: str, spec: Dict) -> float:
+    """A component's share of the power level; security multiplies the total instead"""
+    if category == "cpu":
+        return spec["cores"] * spec["speed"]
+    if category == "ram":
+        return math.log2(spec["size"]) / 2
+    if category == "storage":
+        return math.log2(spec["size"]) / 3
+    if category == "network":
+        return math.log10(spec["speed"] + 1) * 2
+    return 0.0
+
+def get_skill_multiplier() -> float:
+    """Success chance multiplier from the player's combined skills, cached until a skill changes"""
+    return game_state.derived.get("skill_multiplier", ("skills",),
+                                  lambda: 1 + sum(game_state.player["skills"].values()) / 20)
 
 def get_difficulty_level(target: Dict) -> float:
+    """The difficulty level of a target, cached until the target changes"""
+    return game_state.derived.get(("difficulty", target["ip"]), (("target", target["ip"]),),
+                                  lambda: compute_difficulty_level(target))
+
+def get_success_chance(target: Dict) -> float:
+    """Chance of hacking a target, cached until the PC, the skills or the target change"""
+    return game_state.derived.get(("success", target["ip"]), ("pc", "skills", ("target", target["ip"])),
+                                  lambda: calculate_hack_success_chance(get_difficulty_level(target)))
+
+def compute_difficulty_level(target: Dict) -> float:
     """Calculate the difficulty level of a target"""
     security_level = target["security_level"]
     service_count = len(target["services"])
@@ -531,15 +2771,19 @@ def get_difficulty_level(target: Dict) -> float:
         
     return difficulty
 
-def calculate_hack_success_chance(difficulty: float) -> float:
-    """Calculate the chance of successful hacking based on PC power and target difficulty"""
-    pc_power = get_pc_power_level()
-    skill_multiplier = 1 + sum(game_state.player["skills"].values()) / 20
-    
-    success_chance = min(0.95, (pc_power * skill_multiplier) / (difficulty * 2))
+def calculate_hack_success_chance(difficulty, pc_power: Optional[float] = None):
+    """Calculate the chance of successful hacking based on PC power and target difficulty.
+
+    difficulty may also be a NumPy array, which gives an array of chances.
+    """
+    if pc_power is None:
+        pc_power = get_pc_power_level()
+    success_chance = (pc_power * get_skill_multiplier()) / (difficulty * 2)
     
     # Minimum chance is 5%, maximum is 95%
-    return max(0.05, success_chance)
+    if np is not None and isinstance(success_chance, np.ndarray):
+        return np.clip(success_chance, 0.05, 0.95)
+    return max(0.05, min(0.95, success_chance))
 
 def generate_random_ip() -> str:
     """Generate a random IP address"""
@@ -553,11 +2797,19 @@ def get_target_by_ip(ip: str) -> Optional[Dict]:
             return target
     return None
 
+def target_changed(target: Dict) -> None:
+    """Invalidate what was derived from a target after editing it"""
+    game_state.derived.invalidate(("target", target["ip"]))
+
 def discover_ip(ip: str) -> bool:
     """Mark an IP as discovered and return True if it's new"""
     target = get_target_by_ip(ip)
     if target and not target["discovered"]:
         target["discovered"] = True
+        target_changed(target)
+        table = game_state.derived.peek("target_table")
+        if table is not None:
+            table.add(target)
         if ip not in game_state.player["discovered_ips"]:
             game_state.player["discovered_ips"].append(ip)
             game_state.stats["targets_discovered"] += 1
@@ -566,17 +2818,21 @@ def discover_ip(ip: str) -> bool:
 
 def get_mission_by_id(mission_id: str) -> Optional[Dict]:
     """Get a mission by its ID"""
-    for mission in game_state.missions:
-        if mission["id"] == mission_id:
-            return mission
-    return None
+    return game_state.missions.get(mission_id)
+
+def set_current_mission(mission_id: Optional[str]) -> None:
+    """Make a mission the player's current one, offering the previous one again"""
+    previous = game_state.player["current_mission"]
+    if previous and previous != mission_id:
+        game_state.missions.release(previous)
+    game_state.player["current_mission"] = mission_id
+    if mission_id:
+        game_state.missions.activate(mission_id)
+    game_state.derived.invalidate("objectives")
 
 def get_championship_by_id(championship_id: str) -> Optional[Dict]:
     """Get a championship by its ID"""
-    for championship in game_state.championships:
-        if championship["id"] == championship_id:
-            return championship
-    return None
+    return game_state.championships.get(championship_id)
 
 def upgrade_component(component: str, level: int) -> bool:
     """Upgrade a PC component to the specified level"""
@@ -598,6 +2854,7 @@ def upgrade_component(component: str, level: int) -> bool:
             # Apply the upgrade
             game_state.player["bitcoin"] -= upgrade["cost"]
             game_state.pc[component].update(upgrade)
+            game_state.derived.invalidate("pc")
             game_state.stats["upgrades_purchased"] += 1
             
             return True
@@ -612,12 +2869,17 @@ def format_time(seconds: int) -> str:
         minutes = seconds // 60
         remainder = seconds % 60
         return f"{minutes}m {remainder}s"
-    else:
+    elif seconds < 86400:
         hours = seconds // 3600
         remainder = seconds % 3600
         minutes = remainder // 60
         seconds = remainder % 60
         return f"{hours}h {minutes}m {seconds}s"
+    else:
+        days = seconds // 86400
+        hours = seconds % 86400 // 3600
+        minutes = seconds % 3600 // 60
+        return f"{days}d {hours}h {minutes}m"
 
 def display_skills():
     """Display player skills"""
@@ -682,6 +2944,7 @@ def skill_level_up_check(skill: str, increment: float = 0.1) -> bool:
     if chance > 0.5:
         # We apply a partial increment, simulating skill experience
         game_state.player["skills"][skill] = min(10, current_level + increment)
+        game_state.derived.invalidate("skills")
         
         # Check if we've reached a new integer level
         new_level = int(game_state.player["skills"][skill])
@@ -690,10 +2953,16 @@ def skill_level_up_check(skill: str, increment: float = 0.1) -> bool:
             
     return False
 
-def get_time_for_hack(target_difficulty: float) -> float:
-    """Calculate the time needed for a hack based on PC specs and difficulty"""
-    pc_power = get_pc_power_level()
-    network_speed = game_state.pc["network"]["speed"]
+def get_time_for_hack(target_difficulty, pc_power: Optional[float] = None,
+                      network_speed: Optional[float] = None):
+    """Calculate the time needed for a hack based on PC specs (the player's by default) and difficulty.
+
+    target_difficulty may also be a NumPy array, which gives an array of times.
+    """
+    if pc_power is None:
+        pc_power = get_pc_power_level()
+    if network_speed is None:
+        network_speed = game_state.pc["network"]["speed"]
     
     # Base time in seconds
     base_time = target_difficulty * 5
@@ -702,8 +2971,251 @@ def get_time_for_hack(target_difficulty: float) -> float:
     time_factor = base_time / (pc_power * math.log10(network_speed + 1))
     
     # Apply time acceleration
+    if np is not None and isinstance(time_factor, np.ndarray):
+        return np.maximum(2, time_factor / game_state.time_acceleration)
     return max(2, time_factor / game_state.time_acceleration)
 
+def upgrade_paths(category: str) -> List[Tuple[float, int, Dict]]:
+    """Levels reachable one at a time from the installed one as (total cost, level, spec), installed first"""
+    installed = game_state.pc[category]
+    paths = [(0.0, installed["level"], installed)]
+    for upgrade in sorted(game_state.upgrades[category], key=lambda u: u["level"]):
+        if upgrade["level"] <= installed["level"]:
+            continue
+        if upgrade["level"] != paths[-1][1] + 1:
+            break  # A missing level cannot be skipped
+        paths.append((paths[-1][0] + upgrade["cost"], upgrade["level"], upgrade))
+    return paths
+
+def get_upgrade_frontier() -> List[Tuple[float, float, Tuple[int, ...]]]:
+    """Pareto frontier of CPU, RAM and storage levels as (cost, power share, levels).
+
+    Categories are folded in one at a time and every combination that costs more than
+    another without adding power is dropped, so the frontier stays small even for
+    large catalogs. Sorted by cost, power rises along it. Cached until the PC changes.
+    """
+    def build():
+        frontier = [(0.0, 0.0, ())]
+        for category in ("cpu", "ram", "storage"):
+            options = [(cost, component_power(category, spec), level) for cost, level, spec in upgrade_paths(category)]
+            combined = sorted(((cost + extra, power + share, levels + (level,))
+                               for cost, power, levels in frontier for extra, share, level in options),
+                              key=lambda entry: (entry[0], -entry[1]))
+            frontier = []
+            for entry in combined:
+                if not frontier or entry[1] > frontier[-1][1] + 1e-12:
+                    frontier.append(entry)
+        return frontier
+    return game_state.derived.get("upgrade_frontier", ("pc",), build)
+
+def plan_upgrades(budget: float, target: Optional[Dict] = None) -> Optional[Dict]:
+    """Best upgrade levels within a budget, memoized per budget and installed PC.
+
+    Without a target the resulting power level is maximised; with one, the expected
+    time to hack it (hack time divided by success chance). Network and security enter
+    the hack time and the power level differently from the other parts, so each of
+    their levels is tried against the best affordable point of the frontier.
+    """
+    if target is None:
+        return game_state.derived.get(("upgrade_plan", budget, None), ("pc",),
+                                      lambda: search_upgrades(budget, None))
+    return game_state.derived.get(("upgrade_plan", budget, target["ip"]), ("pc", "skills", ("target", target["ip"])),
+                                  lambda: search_upgrades(budget, target))
+
+def search_upgrades(budget: float, target: Optional[Dict]) -> Optional[Dict]:
+    frontier = get_upgrade_frontier()
+    costs = [entry[0] for entry in frontier]
+    difficulty = get_difficulty_level(target) if target else None
+    best = None
+    for network_cost, network_level, network in upgrade_paths("network"):
+        for security_cost, security_level, security in upgrade_paths("security"):
+            def evaluate(index: int) -> Dict:
+                cost, share, levels = frontier[index]
+                power = (share + component_power("network", network)) * (1 + security["level"] / 10)
+                if target is None:
+                    score = -power
+                else:
+                    score = (get_time_for_hack(difficulty, power, network["speed"])
+                             / calculate_hack_success_chance(difficulty, power))
+                return {"score": score, "cost": cost + network_cost + security_cost, "power": power,
+                        "levels": dict(zip(("cpu", "ram", "storage", "network", "security"),
+                                           levels + (network_level, security_level)))}
+            
+            top = bisect.bisect_right(costs, budget - network_cost - security_cost + 1e-12) - 1
+            if top < 0:
+                continue
+            # The score never gets worse along the frontier, but the hack time and success
+            # chance are clamped, so a cheaper point may already reach the same score
+            candidate = evaluate(top)
+            low, high = 0, top
+            while low < high:
+                middle = (low + high) // 2
+                if evaluate(middle)["score"] <= candidate["score"] + 1e-12:
+                    high = middle
+                else:
+                    low = middle + 1
+            candidate = evaluate(low)
+            if best is None or (candidate["score"], candidate["cost"]) < (best["score"], best["cost"]):
+                best = candidate
+    return best
+
+class TargetTable:
+    """Discovered targets with their security levels and difficulties as columns.
+
+    The columns are NumPy arrays when NumPy is installed, with spare room that doubles
+    when it runs out, so discovering a host appends a row instead of rebuilding the
+    table and ranking a million hosts does not walk their dicts.
+    """
+    def __init__(self, targets: List[Dict]):
+        self.targets = list(targets)
+        self.rows = {target["ip"]: row for row, target in enumerate(self.targets)}  # IP -> row
+        security = [float(t["security_level"]) for t in self.targets]
+        difficulty = [compute_difficulty_level(t) for t in self.targets]
+        if np is not None:
+            capacity = max(16, 2 * len(self.targets))
+            self.security = np.zeros(capacity)
+            self.difficulty = np.zeros(capacity)
+            self.security[:len(security)] = security
+            self.difficulty[:len(difficulty)] = difficulty
+        else:
+            self.security = security
+            self.difficulty = difficulty
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def add(self, target: Dict) -> None:
+        """Append a newly discovered target"""
+        if target["ip"] in self.rows:
+            return
+        row = len(self.targets)
+        self.rows[target["ip"]] = row
+        self.targets.append(target)
+        if np is None:
+            self.security.append(float(target["security_level"]))
+            self.difficulty.append(compute_difficulty_level(target))
+            return
+        if row == len(self.security):
+            self.security = np.concatenate((self.security, np.zeros(row)))
+            self.difficulty = np.concatenate((self.difficulty, np.zeros(row)))
+        self.security[row] = target["security_level"]
+        self.difficulty[row] = compute_difficulty_level(target)
+
+    def columns(self) -> Tuple[List[Dict], Any, Any]:
+        """The targets and their security level and difficulty columns"""
+        size = len(self.targets)
+        return self.targets, self.security[:size], self.difficulty[:size]
+
+def get_target_table() -> TargetTable:
+    """The table of discovered targets, built once and then extended by discover_ip"""
+    return game_state.derived.get("target_table", ("targets",),
+                                  lambda: TargetTable([t for t in game_state.network_targets if t["discovered"]]))
+
+def can_compete(championship: Dict) -> bool:
+    """Whether the player meets a championship's requirements"""
+    player = game_state.player
+    return not (championship["required_rep"] > player["reputation"]
+                or championship.get("fsociety_required") and not player["fsociety_member"]
+                or championship.get("dark_army_required") and not player["dark_army_contact"])
+
+def objective_rewards() -> Dict[str, Tuple[Dict[str, float], List[str]]]:
+    """BTC a hack of each type earns on each target through the objectives armed on it.
+
+    Returns {IP: ({hack type: BTC}, [mission and/or championship])}. A step or task is
+    worth its mission's or championship's reward split over the steps or tasks left.
+    """
+    index = game_state.derived.get("objectives", ("objectives",), build_objective_index)
+    rewards = {}
+    for (event, ip), objectives in index.items():
+        if event not in RECOMMEND_HACK_TYPES:
+            continue
+        for objective in objectives:
+            if objective.owner == "mission":
+                entry = get_mission_by_id(objective.entry_id)
+                left = len(entry["steps"]) - objective.position
+            else:
+                entry = get_championship_by_id(objective.entry_id)
+                if not can_compete(entry):
+                    continue
+                left = len(entry["tasks"]) - objective.position
+            by_type, owners = rewards.setdefault(ip, ({}, []))
+            by_type[event] = by_type.get(event, 0.0) + entry["reward"] / left
+            if objective.owner not in owners:
+                owners.append(objective.owner)
+    return rewards
+
+def top_rows(scores, wanted: int, accept) -> List[int]:
+    """Rows with the highest scores, best first, that pass accept(row); at most `wanted` of them.
+
+    Only a few more rows than wanted are sorted, and more only if too many are rejected.
+    """
+    count = len(scores)
+    if wanted <= 0 or count == 0:
+        return []
+    k = min(count, 2 * wanted + 16)
+    while True:
+        if np is not None:
+            top = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+            order = top[np.argsort(-scores[top], kind="stable")].tolist()
+        else:
+            order = heapq.nlargest(k, range(count), key=scores.__getitem__)
+        picked = [row for row in order if accept(row)][:wanted]
+        if len(picked) == wanted or k == count:
+            return picked
+        k = min(count, k * 4)
+
+def recommend_targets(limit: int) -> List[Tuple[Dict, float, float, Dict[str, float], List[str]]]:
+    """Best discovered targets to hack next, as (target, chance, seconds, BTC per minute by hack type, gains).
+
+    A hack pays nothing by itself. It earns BTC where it completes the current step of
+    the mission or a championship task armed on its target, and otherwise leaves a
+    foothold to pivot through and recruit into the botnet. Targets with objectives come
+    first, by expected BTC per minute of their best hack type; then reachable hosts not
+    yet compromised, by footholds gained per minute. gains lists what a successful hack
+    brings: "mission", "championship" and/or "foothold".
+    """
+    table = get_target_table()
+    targets, _, difficulty = table.columns()
+    if np is not None:
+        chance = calculate_hack_success_chance(difficulty)
+        seconds = get_time_for_hack(difficulty)
+    else:
+        chance = [calculate_hack_success_chance(value) for value in difficulty]
+        seconds = [get_time_for_hack(value) for value in difficulty]
+    topology = get_topology()
+
+    ranked = []
+    for ip, (rewards, owners) in objective_rewards().items():
+        row = table.rows.get(ip)
+        if row is None:
+            continue
+        per_minute = 60 * chance[row] / seconds[row]
+        gains = owners + ([] if ip in topology.compromised else ["foothold"])
+        ranked.append((targets[row], float(chance[row]), float(seconds[row]),
+                       {hack_type: btc * per_minute for hack_type, btc in rewards.items()}, gains))
+    ranked.sort(key=lambda entry: max(entry[3].values()), reverse=True)
+    ranked = ranked[:limit]
+
+    listed = {entry[0]["ip"] for entry in ranked}
+    if np is not None:
+        footholds = chance / seconds
+    else:
+        footholds = [c / t for c, t in zip(chance, seconds)]
+    def accept(row: int) -> bool:
+        ip = targets[row]["ip"]
+        return ip not in listed and ip not in topology.compromised and topology.route(ip) is not None
+    for row in top_rows(footholds, limit - len(ranked), accept):
+        ranked.append((targets[row], float(chance[row]), float(seconds[row]), {}, ["foothold"]))
+    return ranked
+
+# Skill trained by each type of hack
+HACK_SKILLS = {
+    "scan": "network",
+    "bruteforce": "crypto",
+    "exploit": "malware",
+    "social": "social"
+}
+
 def perform_hack(target_ip: str, hack_type: str) -> bool:
     """Perform a hacking attempt on a target"""
     target = get_target_by_ip(target_ip)
@@ -711,23 +3223,20 @@ def perform_hack(target_ip: str, hack_type: str) -> bool:
         print(Fore.RED + f"Error: IP {target_ip} not found in database.")
         return False
         
+    # Firewalled hosts can only be reached by pivoting through compromised ones
+    hops = route_to(target_ip)
+    if hops is None:
+        print(Fore.RED + f"Error: no route to {target_ip}. It sits behind the {subnet_of(target)} firewall.")
+        print(f"Use 'route {target_ip}' to see which hosts to compromise first.")
+        return False
+    
     # Make sure the target has been discovered
     if not target["discovered"]:
         discover_ip(target_ip)
     
     # Calculate difficulty and success chance
     difficulty = get_difficulty_level(target)
-    success_chance = calculate_hack_success_chance(difficulty)
-    
-    # Determine which skill to use for this hack type
-    skill_map = {
-        "scan": "network",
-        "bruteforce": "crypto",
-        "exploit": "malware",
-        "social": "social"
-    }
-    
-    skill_used = skill_map.get(hack_type.lower(), "network")
+    success_chance = get_success_chance(target)
     
     # Get the time required for this hack
     hack_time = get_time_for_hack(difficulty)
@@ -740,29 +3249,49 @@ def perform_hack(target_ip: str, hack_type: str) -> bool:
     print(f"Estimated time: {format_time(int(hack_time))}")
     print(f"Success probability: {success_chance*100:.1f}%")
     
-    # Progress bar
+    # Progress bar (drawn in place on the dashboard when split-screen mode is on)
     steps = min(20, int(hack_time))
+    op_id = dashboard.start_operation(f"{hack_type} {target_ip}") if dashboard.active else None
     for i in range(steps):
-        time.sleep(hack_time / steps)
+        pause(hack_time / steps)
+        if op_id is not None:
+            dashboard.update_operation(op_id, (i + 1) / steps)
+            continue
         progress = int((i + 1) / steps * 20)
         print(f"\r[{'█' * progress}{' ' * (20 - progress)}] {(i+1)/steps*100:.1f}%", end="")
-    print()
+    if op_id is not None:
+        dashboard.finish_operation(op_id)
+    else:
+        print()
     
-    # Determine success
-    success = random.random() < success_chance
+    # Determine success; a failure may expose the footholds the attack came through
+    success = finish_hack(target, hack_type, random.random() < success_chance)
+    if not success:
+        burn_footholds(hops[:-1])
+    return success
+
+def finish_hack(target: Dict, hack_type: str, success: bool) -> bool:
+    """Report the outcome of a hacking attempt and apply its rewards"""
+    target_ip = target["ip"]
+    skill_used = HACK_SKILLS.get(hack_type.lower(), "network")
     
     if success:
         print(Fore.GREEN + f"\nSuccess! {hack_type.title()} operation completed on {target['name']}.")
         add_to_history(f"Successful {hack_type} on {target_ip}", Fore.GREEN)
         game_state.stats["hacks_successful"] += 1
         
+        # The host becomes a foothold to pivot through, and a bot
+        if not target.get("compromised"):
+            print(Fore.CYAN + f"{target['name']} joined your botnet.")
+        compromise_host(target)
+        
         # Check for skill improvement
         if skill_level_up_check(skill_used):
             new_level = int(game_state.player["skills"][skill_used])
             print(Fore.CYAN + f"\nSkill level up! Your {skill_used} skills improved to level {new_level}!")
             
-        # Update mission progress if applicable
-        update_mission_progress(target_ip, hack_type)
+        # Advance the missions and championships waiting for this hack
+        emit_event(hack_type.lower(), target_ip)
         
         return True
     else:
@@ -775,36 +3304,131 @@ def perform_hack(target_ip: str, hack_type: str) -> bool:
             
         return False
 
-def update_mission_progress(target_ip: str, hack_type: str) -> None:
-    """Update the progress of the current mission if applicable"""
-    if not game_state.player["current_mission"]:
-        return
-        
-    mission_id = game_state.player["current_mission"]
-    mission = get_mission_by_id(mission_id)
-    
-    if not mission:
-        return
-        
-    # Check if this hack is for the mission target
-    if mission["target"] != target_ip:
+# Objectives
+# Mission steps and championship tasks compile to the game event that completes them.
+# Rules are tried in order as (keywords in the text, event type, file operation); text
+# that matches no rule is a generic intrusion that a hack or an exploit completes.
+OBJECTIVE_RULES = [
+    (("bruteforce", "password", "credential", "encryption breaking"), "bruteforce", None),
+    (("download", "extract", "exfiltrat", "retrieve", "obtain", "access client list",
+      "access loan database"), "exfiltrate", None),
+    (("erase", "cover tracks", "delete", "log manipulation", "without trace", "avoid detection"), "file", "delete"),
+    (("document",), "file", "create"),
+    (("communication", "covert channel"), "connect", None),
+    (("backdoor", "persistence", "plant", "rootkit", "exploit"), "exploit", None),
+    (("scan", "map network", "identify", "analysis", "entry point"), "scan", None),
+]
+INTRUSION_EVENTS = ("hack", "exploit")
+LOCAL_EVENTS = ("file", "connect")  # Events on the player's own machine, not on a target
+
+# Command that produces each event, shown next to steps and tasks
+OBJECTIVE_HINTS = {
+    "scan": "scan {ip}",
+    "hack": "hack {ip}",
+    "exploit": "run rootkit_gen.py {ip}",
+    "bruteforce": "bruteforce {ip}",
+    "exfiltrate": "run data_exfiltrator.py {ip}",
+    "connect": "connect <site>",
+    ("file", "create"): "touch <file> or mkdir <dir>",
+    ("file", "delete"): "rm <file> or rmdir <dir>",
+}
+
+# Compiled step texts: lowercased text -> (event types, file operation)
+compiled_objectives = {}
+
+class Objective:
+    """A compiled mission step or championship task waiting for the event that completes it"""
+    __slots__ = ("owner", "entry_id", "position", "events", "target", "op")
+
+    def __init__(self, owner: str, entry_id: str, position: int, events: Tuple[str, ...],
+                 target: Optional[str], op: Optional[str]):
+        self.owner = owner
+        self.entry_id = entry_id
+        self.position = position
+        self.events = events
+        self.target = target
+        self.op = op
+
+    def matches(self, details: Dict) -> bool:
+        return self.op is None or details.get("op") == self.op
+
+def compile_objective(text: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """Event types that complete a step or task, and the file operation it needs"""
+    text = text.lower()
+    compiled = compiled_objectives.get(text)
+    if compiled is None:
+        compiled = next((((event,), op) for keywords, event, op in OBJECTIVE_RULES
+                         if any(keyword in text for keyword in keywords)), (INTRUSION_EVENTS, None))
+        compiled_objectives[text] = compiled
+    return compiled
+
+def objective_hint(text: str, target_ip: str) -> str:
+    """Commands that complete a step or task"""
+    events, op = compile_objective(text)
+    return " or ".join(OBJECTIVE_HINTS[(event, op) if event == "file" else event].format(ip=target_ip)
+                       for event in events)
+
+def build_objective_index() -> Dict[Tuple[str, Optional[str]], List[Objective]]:
+    """(event type, target IP) -> objectives that event can complete.
+
+    Only the current step of the current mission and the current task of every open
+    championship are armed; local events are indexed with no target.
+    """
+    armed = []
+    mission = get_mission_by_id(game_state.player["current_mission"]) if game_state.player["current_mission"] else None
+    if mission and not mission["completed"]:
+        armed.append(("mission", mission, mission["steps"], mission["current_step"]))
+    for championship in game_state.championships.open():
+        armed.append(("championship", championship, championship["tasks"], championship["current_task"]))
+    
+    index = defaultdict(list)
+    for owner, entry, texts, position in armed:
+        if position >= len(texts):
+            continue
+        events, op = compile_objective(texts[position])
+        for event in events:
+            target = None if event in LOCAL_EVENTS else entry["target"]
+            index[(event, target)].append(Objective(owner, entry["id"], position, events, target, op))
+    return index
+
+def emit_event(event: str, target_ip: Optional[str] = None, **details) -> None:
+    """Report a game event and advance every mission step or championship task it completes"""
+    index = game_state.derived.get("objectives", ("objectives",), build_objective_index)
+    candidates = index.get((event, target_ip), [])
+    if not candidates:
         return
-        
-    # Check if this hack type matches the current mission step
-    current_step = mission["current_step"]
-    if current_step >= len(mission["steps"]):
-        return  # Mission already completed all steps
-        
-    current_step_type = mission["steps"][current_step].lower()
-    
-    # Check if the hack type matches (partial match is fine)
-    if hack_type.lower() in current_step_type or current_step_type in hack_type.lower():
+    advanced = False
+    for objective in list(candidates):
+        if objective.matches(details):
+            advanced = advance_objective(objective) or advanced
+    if advanced:
+        game_state.derived.invalidate("objectives")
+
+def advance_objective(objective: Objective) -> bool:
+    """Complete the step or task an objective stands for, if it is still the current one"""
+    if objective.owner == "mission":
+        mission = get_mission_by_id(objective.entry_id)
+        if (not mission or mission["completed"] or mission["current_step"] != objective.position
+                or game_state.player["current_mission"] != mission["id"]):
+            return False
         mission["current_step"] += 1
         print(Fore.CYAN + f"\nMission '{mission['title']}' progress updated!")
-        
-        # Check if mission is now complete
         if mission["current_step"] >= len(mission["steps"]):
-            complete_mission(mission_id)
+            complete_mission(mission["id"])
+        return True
+    
+    championship = get_championship_by_id(objective.entry_id)
+    if not championship or championship["completed"] or championship["current_task"] != objective.position:
+        return False
+    if not can_compete(championship):
+        return False
+    task = championship["tasks"][championship["current_task"]]
+    championship["current_task"] += 1
+    game_state.championships.activate(championship["id"])
+    print(Fore.CYAN + f"\nChampionship '{championship['title']}' task completed: {task}")
+    if championship["current_task"] >= len(championship["tasks"]):
+        complete_championship(championship["id"])
+    return True
 
 def complete_mission(mission_id: str) -> None:
     """Complete a mission and award rewards"""
@@ -822,9 +3446,9 @@ def complete_mission(mission_id: str) -> None:
     game_state.player["reputation"] += rep_reward
     
     # Mark as completed
-    mission["completed"] = True
-    if mission_id not in game_state.player["completed_missions"]:
+    if not mission["completed"]:
         game_state.player["completed_missions"].append(mission_id)
+    game_state.missions.complete(mission_id)
         
     # Reset current mission
     game_state.player["current_mission"] = None
@@ -862,7 +3486,7 @@ def complete_championship(championship_id: str) -> None:
     game_state.player["reputation"] += rep_reward
     
     # Mark as completed
-    championship["completed"] = True
+    game_state.championships.complete(championship_id)
     
     # Display completion message
     print(Fore.GREEN + f"\nChampionship '{championship['title']}' completed!")
@@ -880,50 +3504,54 @@ def complete_championship(championship_id: str) -> None:
         print("You now have full access to Dark Army resources.")
         game_state.player["dark_army_contact"] = True
 
-def generate_new_mission() -> Dict:
-    """Generate a new mission for the player"""
-    # Create mission ID
-    mission_count = len(game_state.missions)
-    mission_id = f"m{mission_count+1:03d}"
-    
-    # Randomly select a target
-    available_targets = [t for t in game_state.network_targets 
-                        if t["security_level"] <= int(get_pc_power_level() / 2) + 3]
-    
-    if not available_targets:
-        available_targets = [random.choice(game_state.network_targets)]
-        
-    target = random.choice(available_targets)
+# Mission and championship generation
+MISSION_STEPS = ["scan network", "identify vulnerability", "exploit vulnerability",
+                 "bypass firewall", "gain access", "escalate privileges",
+                 "download data", "plant backdoor", "erase tracks"]
+MISSION_TITLES = ["Data Breach", "Corporate Espionage", "Financial Hack",
+                  "System Infiltration", "Security Bypass", "Ghost Protocol"]
+CHAMPIONSHIP_TASKS = ["network scan", "vulnerability analysis", "firewall bypass",
+                      "system infiltration", "privilege escalation", "data extraction",
+                      "backdoor installation", "log manipulation", "cover tracks",
+                      "communication interception", "encryption breaking"]
+CHAMPIONSHIP_TITLES = ["Hacker Elite", "Digital Phantom", "Shadow Infiltrator",
+                       "Code Breaker", "Network Ghost", "System Overlord"]
+
+def get_security_index() -> Tuple[List[int], List[Dict]]:
+    """Security levels of every network target in ascending order, and the targets in that order.
+
+    Levels never change, so the index is only rebuilt when the target list changes.
+    """
+    def build():
+        ordered = sorted(game_state.network_targets, key=lambda t: t["security_level"])
+        return [t["security_level"] for t in ordered], ordered
+    return game_state.derived.get("security_index", ("targets",), build)
+
+def content_inputs() -> Tuple[List[int], List[Dict], float]:
+    """What drawing missions and championships depends on: the security index and the PC's power"""
+    levels, targets = get_security_index()
+    return levels, targets, get_pc_power_level()
+
+def build_mission(rng, inputs: Tuple[List[int], List[Dict], float]) -> Dict:
+    """Draw a mission's target, rewards and steps; generate_new_mission gives it an ID and deadline"""
+    # Randomly select a target the player's PC can take on
+    levels, targets, pc_power = inputs
+    max_security = int(pc_power / 2) + 3
+    count = bisect.bisect_right(levels, max_security)
+    target = targets[rng.randrange(count)] if count else rng.choice(targets)
     
     # Generate mission properties
     difficulty = target["security_level"]
-    reward = 0.001 * difficulty * (1 + random.random())
+    reward = 0.001 * difficulty * (1 + rng.random())
     rep_reward = 5 * difficulty
     
-    # Generate mission steps
-    step_count = random.randint(2, 4)
-    possible_steps = ["scan network", "identify vulnerability", "exploit vulnerability", 
-                    "bypass firewall", "gain access", "escalate privileges", 
-                    "download data", "plant backdoor", "erase tracks"]
-    
-    steps = ["scan"]  # Always start with scan
-    for _ in range(step_count - 1):
-        step = random.choice(possible_steps)
-        if step not in steps:
-            steps.append(step)
-    
-    # Generate mission title and description
-    titles = [
-        "Data Breach", "Corporate Espionage", "Financial Hack",
-        "System Infiltration", "Security Bypass", "Ghost Protocol"
-    ]
-    
-    title = random.choice(titles)
+    # Always start with scan, then distinct steps
+    steps = ["scan"] + rng.sample(MISSION_STEPS, rng.randint(2, 4) - 1)
+    title = rng.choice(MISSION_TITLES)
     description = f"Infiltrate {target['name']} and {steps[-1].lower()} to complete the mission."
     
-    # Create the mission
-    mission = {
-        "id": mission_id,
+    return {
+        "id": None,
         "title": title,
         "description": description,
         "difficulty": difficulty,
@@ -934,56 +3562,28 @@ def generate_new_mission() -> Dict:
         "steps": steps,
         "current_step": 0
     }
-    
-    # Add mission to the list
-    game_state.missions.append(mission)
-    
-    return mission
 
-def generate_new_championship() -> Dict:
-    """Generate a new championship challenge"""
-    # Create championship ID
-    championship_count = len(game_state.championships)
-    championship_id = f"c{championship_count+1:03d}"
-    
+def build_championship(rng, inputs: Tuple[List[int], List[Dict], float]) -> Dict:
+    """Draw a championship's target, rewards and tasks; generate_new_championship gives it an ID"""
     # Select a high-difficulty target
-    available_targets = [t for t in game_state.network_targets if t["security_level"] >= 5]
-    if not available_targets:
-        available_targets = [t for t in game_state.network_targets if t["security_level"] >= 3]
-    
-    target = random.choice(available_targets)
+    levels, targets, _ = inputs
+    first = bisect.bisect_left(levels, 5)
+    if first == len(levels):
+        first = bisect.bisect_left(levels, 3)
+    target = targets[rng.randrange(first, len(targets))] if first < len(targets) else rng.choice(targets)
     
     # Generate championship properties
-    difficulty = target["security_level"] + random.randint(1, 3)
-    reward = 0.01 * difficulty * (1 + random.random())
+    difficulty = target["security_level"] + rng.randint(1, 3)
+    reward = 0.01 * difficulty * (1 + rng.random())
     rep_reward = 10 * difficulty
     required_rep = max(20, difficulty * 10)
     
-    # Generate championship tasks
-    task_count = random.randint(4, 6)
-    possible_tasks = ["network scan", "vulnerability analysis", "firewall bypass", 
-                     "system infiltration", "privilege escalation", "data extraction",
-                     "backdoor installation", "log manipulation", "cover tracks",
-                     "communication interception", "encryption breaking"]
-    
-    tasks = []
-    for _ in range(task_count):
-        task = random.choice(possible_tasks)
-        if task not in tasks:
-            tasks.append(task)
-    
-    # Generate championship title and description
-    titles = [
-        "Hacker Elite", "Digital Phantom", "Shadow Infiltrator",
-        "Code Breaker", "Network Ghost", "System Overlord"
-    ]
-    
-    title = random.choice(titles)
+    tasks = rng.sample(CHAMPIONSHIP_TASKS, rng.randint(4, 6))
+    title = rng.choice(CHAMPIONSHIP_TITLES)
     description = f"A challenging series of hacks against {target['name']} to prove your elite status."
     
-    # Create the championship
-    championship = {
-        "id": championship_id,
+    return {
+        "id": None,
         "title": title,
         "description": description,
         "difficulty": difficulty,
@@ -995,12 +3595,118 @@ def generate_new_championship() -> Dict:
         "tasks": tasks,
         "current_task": 0
     }
+
+class ContentPool:
+    """Ready-made missions and championships, kept in stock by a background thread.
+
+    The thread never touches the game state: the main thread snapshots the builders'
+    inputs (content_inputs) whenever the game state, PC or target list changed, and the
+    thread draws against the latest snapshot. Every entry remembers the snapshot it was
+    drawn from and take() throws away entries from an older one. Without the thread, or
+    when the stock has run dry, take() draws a fresh entry on the spot with the global
+    random generator, so seeded headless runs stay reproducible.
+    """
+    def __init__(self):
+        self.builders = {"mission": build_mission, "championship": build_championship}
+        self.sizes = {"mission": CONTENT_POOL_MISSIONS, "championship": CONTENT_POOL_CHAMPIONSHIPS}
+        self.stock = {kind: deque() for kind in self.builders}  # kind -> (inputs, entry)
+        self.stamp = None   # (game state, PC version, target list version) of the inputs
+        self.inputs = None  # content_inputs() snapshot the thread draws against
+        self.rng = random.Random()
+        self.wanted = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.failures = 0   # builds the thread gave up on; 'perf' reports them
+        self.error = None   # the last of those failures
+
+    def refresh(self) -> Tuple[List[int], List[Dict], float]:
+        """The builders' inputs, snapshotted again if they changed; main thread only"""
+        versions = game_state.derived.versions
+        stamp = (game_state, versions["pc"], versions["targets"])
+        if self.stamp is None or stamp[0] is not self.stamp[0] or stamp[1:] != self.stamp[1:]:
+            self.stamp, self.inputs = stamp, content_inputs()
+        return self.inputs
+
+    def start(self) -> None:
+        """Start the background generator"""
+        if self.thread is None:
+            self.refresh()
+            self.stop_event.clear()
+            self.wanted.set()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.stop_event.set()
+            self.wanted.set()
+            self.thread.join()
+            self.thread = None
+
+    def _run(self) -> None:
+        """Background thread: top the stock up whenever take() used some of it"""
+        while not self.stop_event.is_set():
+            self.wanted.wait()
+            self.wanted.clear()
+            for kind, stock in self.stock.items():
+                while len(stock) < self.sizes[kind] and not self.stop_event.is_set():
+                    inputs = self.inputs
+                    try:
+                        stock.append((inputs, self.builders[kind](self.rng, inputs)))
+                    except Exception as e:
+                        self.failures += 1
+                        self.error = f"{type(e).__name__}: {e}"
+                        break
+
+    def take(self, kind: str) -> Dict:
+        """A ready entry of a kind, or a freshly drawn one if none is usable"""
+        inputs = self.refresh()
+        stock = self.stock[kind]
+        entry = None
+        while stock and entry is None:
+            entry_inputs, candidate = stock.popleft()
+            if entry_inputs is inputs:
+                entry = candidate
+        if self.thread is not None:
+            self.wanted.set()
+        return entry if entry is not None else self.builders[kind](random, inputs)
+
+content_pool = ContentPool()
+atexit.register(content_pool.stop)
+
+def generate_new_mission() -> Dict:
+    """Generate a new mission for the player"""
+    mission = content_pool.take("mission")
+    mission["id"] = game_state.missions.new_id()
+    mission["expires_at"] = time.time() + MISSION_LIFETIME / game_state.time_acceleration
+    
+    # Add mission to the registry
+    game_state.missions.add(mission)
+    
+    return mission
+
+def generate_new_championship() -> Dict:
+    """Generate a new championship challenge"""
+    championship = content_pool.take("championship")
+    championship["id"] = game_state.championships.new_id()
     
-    # Add championship to the list
-    game_state.championships.append(championship)
+    # Add championship to the registry
+    game_state.championships.add(championship)
+    game_state.derived.invalidate("objectives")
     
     return championship
 
+def offer_missions() -> None:
+    """Keep MISSIONS_OFFERED generated missions on offer"""
+    offered = sum(1 for mission in game_state.missions.available.values() if "expires_at" in mission)
+    for _ in range(MISSIONS_OFFERED - offered):
+        generate_new_mission()
+
+def offer_championships() -> None:
+    """Keep CHAMPIONSHIPS_OFFERED championships open"""
+    for _ in range(CHAMPIONSHIPS_OFFERED - len(game_state.championships.available) - len(game_state.championships.active)):
+        generate_new_championship()
+
 # Windows-friendly menu implementation (replacing simple_term_menu)
 def show_menu(title: str, options: List[str]) -> Optional[int]:
     """Display a menu and get the user's selection"""
@@ -1031,6 +3737,9 @@ def execute_command(command_str: str) -> None:
     # Update command counter
     game_state.stats["commands_executed"] += 1
     
+    # Pay out shares found by the background miner
+    collect_mining_rewards()
+    
     # Parse the command and arguments
     parts = command_str.split(maxsplit=1)
     command = parts[0].lower()
@@ -1054,32 +3763,63 @@ def execute_command(command_str: str) -> None:
         "rmdir": cmd_rmdir,
         "rd": cmd_rmdir,  # Windows equivalent
         "scan": cmd_scan,
+        "route": cmd_route,
         "hack": cmd_hack,
         "bruteforce": cmd_bruteforce,
+        "botnet": cmd_botnet,
         "mission": cmd_mission,
         "shop": cmd_shop,
         "upgrade": cmd_upgrade,
         "bitcoin": cmd_bitcoin,
         "btc": cmd_bitcoin,
+        "buy": cmd_buy,
+        "sell": cmd_sell,
+        "orders": cmd_orders,
+        "cancel": cmd_cancel,
+        "mine": cmd_mine,
         "stats": display_player_stats,
         "pc": display_pc_stats,
         "skills": display_skills,
         "history": display_history,
         "connect": cmd_connect,
         "disconnect": cmd_disconnect,
+        "circuits": cmd_circuits,
         "run": cmd_run,
-        "clear": lambda _: os.system('cls' if os.name == 'nt' else 'clear'),
-        "cls": lambda _: os.system('cls' if os.name == 'nt' else 'clear'),
-        "save": lambda _: print(Fore.GREEN + "Game saved successfully!" if save_game() else Fore.RED + "Failed to save game."),
-        "exit": lambda _: print(Fore.YELLOW + "Exiting Asathot... Game saved.") or save_game() or sys.exit(0)
+        "tui": cmd_tui,
+        "perf": cmd_perf,
+        "recommend": cmd_recommend,
+        "plan": cmd_plan,
+        "debug": cmd_debug,
+        "clear": renderer.clear_screen,
+        "cls": renderer.clear_screen,
+        "save": lambda: print(Fore.GREEN + "Game saved successfully!" if save_game() else Fore.RED + "Failed to save game."),
+        "exit": cmd_exit
     }
     
-    # Execute the command if it exists
+    # Execute the command if it exists, buffering its output into a single write
+    began = time.perf_counter()
+    delay_before = perf.delay_total
+    with renderer:
+        try:
+            run_command(commands, command, args)
+        finally:
+            perf.record_command(command if command in commands else "<unknown>",
+                                time.perf_counter() - began, perf.delay_total - delay_before)
+    
+    # Warn when a subsystem outgrows its memory budget
+    for warning in memory.check(game_state):
+        print(Fore.YELLOW + f"Memory warning: {warning}")
+
+def run_command(commands: Dict, command: str, args: str) -> None:
+    """Dispatch a parsed command to its handler"""
     if command in commands:
         try:
             if command in ["help", "scan", "hack", "bruteforce", "mission", "shop", 
                        "upgrade", "connect", "run", "ls", "dir", "cd", "cat", "type", 
-                       "mkdir", "md", "touch", "echo", "rm", "del", "rmdir", "rd"]:
+                       "mkdir", "md", "touch", "echo", "rm", "del", "rmdir", "rd",
+                       "tui", "bitcoin", "btc", "buy", "sell", "cancel", "mine", "history",
+                       "perf", "debug", "recommend", "plan", "route",
+                       "botnet"]:
                 commands[command](args)
             else:
                 commands[command]()
@@ -1139,27 +3879,77 @@ def show_help(args: str) -> None:
             print("  globalch.onion - Global hacker chat forum")
             print("  champions.onion - Hacker championship challenges")
             print("  fsociety.onion - FSociety darknet site (requires reputation)")
+            print(f"\nThe first connect to a site builds a {len(CIRCUIT_HOPS)}-hop circuit, which takes longer on a slow")
+            print("network. Reconnecting reuses the circuit while it is warm; see 'circuits'.")
         elif cmd == "disconnect":
             print("\ndisconnect - Disconnect from the current darkweb site")
             print("Usage: disconnect")
+            print(f"The site's circuit stays open for {format_time(CIRCUIT_IDLE_TIMEOUT)} so that reconnecting is fast.")
+        elif cmd == "circuits":
+            print("\ncircuits - Show the open darkweb circuits")
+            print("Usage: circuits")
+            print("Lists each pooled circuit's relays, round-trip time, uses and idle time, and the")
+            print("cold (circuit built) and warm (circuit reused) connect latencies so far.")
+            print(f"At most {CIRCUIT_POOL_SIZE} circuits stay open; the least recently used one is closed first.")
         elif cmd == "scan":
             print("\nscan - Scan an IP address for vulnerabilities")
-            print("Usage: scan <ip>")
+            print("Usage: scan [--fresh] <ip>")
+            print("       scan -p <ports> <ip> [ip ...]")
             print("Example: scan 192.168.1.1")
+            print("Example: scan -p 1-65535 192.168.1.1")
+            print(f"Results are cached for {format_time(SCAN_CACHE_TTL)}, or until the target or your network skill")
+            print("changes; --fresh rescans anyway.")
+            print("-p scans every port in a range like 1-1024,3306 at the speed of your network link.")
+        elif cmd == "route":
+            print("\nroute - Show the hop path to a host")
+            print("Usage: route <ip> [from <ip>]")
+            print("       route")
+            print("Example: route 104.128.115.74")
+            print(f"Hosts above security level {TOPOLOGY_EXPOSED_LEVEL}, other than their subnet's gateway, sit behind a")
+            print("firewall and can only be reached by pivoting through hosts you have hacked.")
+            print("Without an IP, lists your footholds.")
+            print("A failed hack may expose the footholds it went through.")
+        elif cmd == "botnet":
+            print("\nbotnet - Run jobs on the hosts you have hacked")
+            print("Usage: botnet [status]")
+            print("       botnet crack <ip> [wordlist]")
+            print(f"       botnet mine [minutes]   (at most {BOTNET_MINE_MAX_MINUTES})")
+            print("       botnet scan <ports> <ip> [ip ...]")
+            print("Example: botnet crack 192.168.1.1")
+            print(f"Every reachable foothold lends you {BOTNET_CPU_SHARE:.0%} of its CPU and network link.")
+            print("Jobs are split into chunks that idle bots steal from busy ones; bots may drop")
+            print("out mid-job, and some of them are lost for good.")
         elif cmd == "hack":
             print("\nhack - Attempt to hack a target system")
             print("Usage: hack <ip>")
             print("Example: hack 192.168.1.1")
+        elif cmd == "recommend":
+            print("\nrecommend - Rank discovered targets by what hacking them brings per minute")
+            print("Usage: recommend [count]")
+            print("Targets where a hack completes a mission step or championship task come first,")
+            print("with the expected mBTC per minute of each hack type that does; '-' marks hack")
+            print("types that complete nothing there. Then come the reachable hosts you do not own")
+            print("yet, fastest footholds first. The current mission's target is marked with *.")
+        elif cmd == "plan":
+            print("\nplan - Plan the best upgrades for a budget")
+            print("Usage: plan upgrades [budget] | plan target <ip> [budget]")
+            print("  plan upgrades [budget]     highest power level for the budget (default: your balance)")
+            print("  plan target <ip> [budget]  shortest expected time to hack a discovered target")
+            print("Example: plan target 104.128.115.74 0.1")
         elif cmd == "bruteforce":
             print("\nbruteforce - Perform a bruteforce attack on a target")
-            print("Usage: bruteforce <ip>")
+            print("Usage: bruteforce <ip> [wordlist]")
             print("Example: bruteforce 192.168.1.1")
+            print(f"Cracks leaked password hashes with a wordlist (default: {DEFAULT_WORDLIST}) and mangling rules.")
+            print("Higher crypto skill unlocks more rules and a faster engine; more CPU cores add workers.")
         elif cmd == "mission":
             print("\nmission - Manage missions")
             print("Usage: mission [list|info|accept|current]")
             print("Example: mission list")
             print("Example: mission accept m001")
             print("Example: mission current")
+            print("Each step completes when you do what it asks on the mission target: scan, hack,")
+            print("bruteforce, run a tool, or edit files. 'mission current' shows the command for the current step.")
         elif cmd == "shop":
             print("\nshop - Access the upgrade shop")
             print("Usage: shop [category]")
@@ -1170,8 +3960,26 @@ def show_help(args: str) -> None:
             print("Usage: upgrade <component> <level>")
             print("Example: upgrade cpu 2")
         elif cmd == "bitcoin" or cmd == "btc":
-            print("\nbitcoin / btc - Check Bitcoin balance")
-            print("Usage: bitcoin")
+            print("\nbitcoin / btc - Check Bitcoin balance and market prices")
+            print("Usage: bitcoin [chart [btc|eth|ecoin] [1m|15m|1h|4h]]")
+            print("Example: bitcoin chart eth 15m")
+        elif cmd == "buy" or cmd == "sell":
+            print(f"\n{cmd} - {'Buy' if cmd == 'buy' else 'Sell'} Bitcoin for E-Coin on the BitcoinHub order book")
+            print(f"Usage: {cmd} <btc amount> [price in E-Coin]")
+            print(f"Example: {cmd} 0.001 45000")
+            print("Without a price the order fills against the best available offers.")
+        elif cmd == "orders":
+            print("\norders - Show the order book, your open orders and recent fills")
+            print("Usage: orders")
+        elif cmd == "cancel":
+            print("\ncancel - Cancel one of your open orders")
+            print("Usage: cancel <order id>")
+            print("Example: cancel 42")
+        elif cmd == "mine":
+            print("\nmine - Mine Bitcoin in the BitcoinHub pool")
+            print("Usage: mine [start|stop|status]")
+            print("Runs one SHA-256 worker per CPU core (limited by your real machine).")
+            print("Shares are paid out while you keep playing.")
         elif cmd == "run":
             print("\nrun - Run a tool or script")
             print("Usage: run <tool> [args]")
@@ -1186,9 +3994,34 @@ def show_help(args: str) -> None:
             print("\nskills - Display hacking skills")
             print("Usage: skills")
         elif cmd == "history":
-            print("\nhistory - Display command history")
+            print("\nhistory - Display the event history")
             print("Usage: history [count]")
+            print("       history [-n N] [--since HH:MM] [grep <regex>]")
             print("Example: history 20")
+            print("Example: history grep hack --since 14:30")
+            print("Without options the recent events in memory are shown; options search the")
+            print(f"full event log on disk ({EVENT_LOG_PREFIX}.*.jsonl).")
+        elif cmd == "tui":
+            print("\ntui - Toggle the split-screen dashboard")
+            print("Usage: tui [on|off]")
+            print("Shows a pinned status bar (BTC, reputation, mission step, site) and")
+            print("in-place progress bars. Start with 'python Asathot.py --tui' to enable it at launch.")
+        elif cmd == "perf":
+            print("\nperf - Command latency diagnostics")
+            print("Usage: perf [report|dump [file]|profile <command>|reset]")
+            print("  report            p50/p95/p99 wall time per command, the share spent in delays,")
+            print("                    and the pre-generated content stock with any background build errors")
+            print(f"  dump [file]       write the histograms as JSON (default: {PERF_DUMP_FILE})")
+            print("  profile <command> run a command under cProfile and show the hottest functions")
+            print("  reset             clear the statistics")
+        elif cmd == "debug":
+            print("\ndebug mem - Memory accounting")
+            print("Usage: debug mem [report|snapshot|diff [a b]|limit [subsystem size]]")
+            print("  report                 deep size of each game subsystem against its soft limit")
+            print("  snapshot               take a tracemalloc snapshot and show the largest allocations")
+            print("  diff [a b]             compare two snapshots (default: the last two)")
+            print("  limit [subsystem size] show or set a soft limit, e.g. 'debug mem limit history 2M'")
+            print(f"Soft limits are checked a little at a time: {MEMORY_CHECK_OBJECTS:,} references after each command.")
         elif cmd == "clear" or cmd == "cls":
             print("\nclear / cls - Clear the terminal screen")
             print("Usage: clear")
@@ -1216,30 +4049,43 @@ def show_help(args: str) -> None:
         
         print("\nHacking Operations:")
         print("  scan - Scan an IP address for vulnerabilities")
+        print("  route - Show the hop path to a host")
+        print("  botnet - Run jobs on the hosts you have hacked")
         print("  hack - Attempt to hack a target system")
         print("  bruteforce - Perform a bruteforce attack on a target")
         print("  run - Run a tool or script")
+        print("  recommend - Rank discovered targets")
         
         print("\nMission & Progress:")
         print("  mission - Manage missions")
         print("  shop - Access the upgrade shop")
         print("  upgrade - Purchase a PC upgrade")
+        print("  plan - Plan the best upgrades for a budget")
         print("  bitcoin / btc - Check Bitcoin balance")
+        print("  buy / sell - Trade Bitcoin for E-Coin")
+        print("  orders - Show your open orders")
+        print("  cancel - Cancel an open order")
+        print("  mine - Mine Bitcoin in the background")
         
         print("\nDarkweb Navigation:")
         print("  connect - Connect to a darkweb site")
         print("  disconnect - Disconnect from the current darkweb site")
+        print("  circuits - Show the open darkweb circuits")
         
         print("\nInformation & Utilities:")
         print("  stats - Display player statistics")
         print("  pc - Display PC specifications")
         print("  skills - Display hacking skills")
         print("  history - Display command history")
+        print("  tui - Toggle the split-screen dashboard")
+        print("  perf - Command latency diagnostics")
+        print("  debug mem - Memory usage by subsystem")
         print("  clear / cls - Clear the terminal screen")
         print("  save - Save the game")
         print("  exit - Exit the game (automatically saves)")
         print("  help - Show this help message")
         print("  help <command> - Show help for a specific command")
+        print("\nUse the up arrow and Ctrl-R to recall commands from earlier sessions.")
 
 def cmd_ls(args: str) -> None:
     """List directory contents"""
@@ -1424,6 +4270,7 @@ def cmd_mkdir(args: str) -> None:
     }
     
     print(Fore.GREEN + f"Directory {dirname} created")
+    emit_event("file", op="create", path=f"{current_path}/{dirname}")
 
 def cmd_touch(args: str) -> None:
     """Create a file"""
@@ -1455,6 +4302,7 @@ def cmd_touch(args: str) -> None:
     }
     
     print(Fore.GREEN + f"File {filename} created")
+    emit_event("file", op="create", path=f"{current_path}/{filename}")
 
 def cmd_rm(args: str) -> None:
     """Remove a file"""
@@ -1487,6 +4335,7 @@ def cmd_rm(args: str) -> None:
     # Remove the file
     del current[filename]
     print(Fore.GREEN + f"File {filename} deleted")
+    emit_event("file", op="delete", path=f"{current_path}/{filename}")
 
 def cmd_rmdir(args: str) -> None:
     """Remove a directory"""
@@ -1524,6 +4373,7 @@ def cmd_rmdir(args: str) -> None:
     # Remove the directory
     del current[dirname]
     print(Fore.GREEN + f"Directory {dirname} deleted")
+    emit_event("file", op="delete", path=f"{current_path}/{dirname}")
 
 def cmd_echo(args: str) -> None:
     """Echo text to the terminal"""
@@ -1568,6 +4418,17 @@ def resolve_path(path: str) -> Optional[str]:
         else:
             return f"~/{result}"
 
+def get_file_node(resolved_path: str) -> Optional[Dict]:
+    """File system node at a resolved path, or None if it does not exist"""
+    current = {"content": game_state.file_system}
+    for component in resolved_path.split('/'):
+        if not component or component == '.':
+            continue
+        if current.get("type", "dir") != "dir" or component not in current["content"]:
+            return None
+        current = current["content"][component]
+    return current
+
 def cmd_connect(args: str) -> None:
     """Connect to a darkweb site"""
     site = args.strip().lower()
@@ -1591,6 +4452,8 @@ def cmd_connect(args: str) -> None:
         "darkArmy.onion": display_dark_army
     }
     
+    # Site names are matched case-insensitively (darkArmy.onion)
+    site = next((name for name in sites if name.lower() == site), site)
     if site not in sites:
         print(Fore.RED + f"Error: site {site} not found or unreachable")
         return
@@ -1636,14 +4499,22 @@ def cmd_connect(args: str) -> None:
             print("The Dark Army appreciates talent. We will be in touch.")
             game_state.player["dark_army_contact"] = True
     
-    # Connect to the site
-    print(Fore.YELLOW + f"Connecting to {site}...")
-    time.sleep(1)
-    print(Fore.GREEN + "Connected!")
+    # Connect to the site, over a pooled circuit if one is still warm
+    network = game_state.pc["network"]
+    circuit, latency, reused = game_state.circuits.connect(
+        site, TOPOLOGY_UPLINK_MS[network["level"] - 1], network["speed"],
+        keep=game_state.current_site if game_state.connected_to_darkweb else None)
+    if reused:
+        print(Fore.YELLOW + f"Connecting to {site} over a warm circuit...")
+    else:
+        print(Fore.YELLOW + f"Building a circuit to {site}: " + " -> ".join(ip for _, ip, _ in circuit.relays) + "...")
+    pause(latency)
+    print(Fore.GREEN + f"Connected in {format_duration(latency)} ({'warm' if reused else 'cold'} circuit)!")
     
     # Display the site
     game_state.connected_to_darkweb = True
     game_state.current_site = site
+    emit_event("connect", site=site)
     sites[site]()
 
 def cmd_disconnect() -> None:
@@ -1654,279 +4525,569 @@ def cmd_disconnect() -> None:
         
     site = game_state.current_site
     print(Fore.YELLOW + f"Disconnecting from {site}...")
-    time.sleep(0.5)
-    print(Fore.GREEN + "Disconnected.")
+    game_state.circuits.release(site)
+    print(Fore.GREEN + f"Disconnected. The circuit stays open for {format_time(CIRCUIT_IDLE_TIMEOUT)} if you come back.")
     
     game_state.connected_to_darkweb = False
     game_state.current_site = None
 
-def display_bitcoinhub() -> None:
-    """Display the BitcoinHub site"""
-    print(Fore.YELLOW + """
+def cmd_circuits() -> None:
+    """Show the pooled darkweb circuits and cold and warm connect latency"""
+    pool = game_state.circuits
+    now = time.time()
+    current = game_state.current_site if game_state.connected_to_darkweb else None
+    pool.expire(now, current)
+    print(Fore.YELLOW + f"Open circuits ({len(pool.circuits)}/{CIRCUIT_POOL_SIZE}, "
+          f"closed after {format_time(CIRCUIT_IDLE_TIMEOUT)} idle):")
+    if not pool.circuits:
+        print(Fore.WHITE + "  None. 'connect <site>' builds one.")
+    for site, circuit in reversed(pool.circuits.items()):
+        idle = "in use" if site == current else f"idle {format_time(int(now - circuit.last_used))}"
+        print(Fore.WHITE + f"  {site:<20}{circuit.rtt() * 1000:>6.0f} ms RTT, built in {format_duration(circuit.build_seconds)}, "
+              f"{circuit.uses} use{'s' if circuit.uses != 1 else ''}, {idle}")
+        print(Fore.CYAN + "    " + " -> ".join(f"{role} {ip} ({rtt:.0f} ms)" for role, ip, rtt in circuit.relays))
+
+    print(Fore.YELLOW + "\nConnect latency:")
+    for label, histogram in (("cold", pool.cold), ("warm", pool.warm)):
+        if histogram.count:
+            print(Fore.WHITE + f"  {label}  {histogram.count:>4} connects  p50 {format_duration(histogram.percentile(0.5))}"
+                  f"  p95 {format_duration(histogram.percentile(0.95))}")
+        else:
+            print(Fore.WHITE + f"  {label}  no connects yet")
+    print(Fore.WHITE + f"Circuits built: {pool.built}, closed: {pool.closed}")
+
+# Darkweb site engine
+#
+# Every site is a set of declarative pages driven by run_site() in a plain loop, so a
+# session never grows the Python stack no matter how long the player stays on a site.
+# A page may define:
+#   text    - pre-rendered static text
+#   render  - callable(session) -> str for text that depends on the game state
+#   cache   - True to keep the rendered text of a data-only page (keyed by selection)
+#   enter   - callable(session) -> page name to redirect to before showing the page
+#   prompt  - input prompt; pages without one just display their text
+#   options - {choice: page name} for fixed menu entries
+#   select  - callable(session, choice) -> page name, None to leave, or INVALID_OPTION
+#   back    - page to go to when the player types 'back' (None leaves the site)
+#   invalid - page to go to after an invalid choice (defaults to the same page)
+#   pause   - "Press Enter" prompt shown before moving on to 'next'
+#   next    - page shown after a page without a prompt (None leaves the site)
+INVALID_OPTION = object()
+
+# Pre-rendered page text, keyed by (site, page, selection)
+site_page_cache = {}
+
+def render_site_page(site: str, page_name: str, page: Dict, session: Dict) -> str:
+    """Get the text of a site page, using the cache for pages that only depend on data"""
+    if "text" in page:
+        return page["text"]
+    if "render" not in page:
+        return ""
+    if not page.get("cache"):
+        return page["render"](session)
+    key = (site, page_name, session.get("selection"))
+    text = site_page_cache.get(key)
+    if text is None:
+        text = site_page_cache[key] = page["render"](session)
+    return text
+
+def run_site(site: str) -> None:
+    """Run a darkweb site's page state machine until the player leaves"""
+    definition = SITES[site]
+    guard = definition.get("guard")
+    if guard and not guard():
+        return
+
+    pages = definition["pages"]
+    session = {"selection": None}
+    page_name = definition["start"]
+
+    while page_name is not None:
+        page = pages[page_name]
+
+        if "enter" in page:
+            redirect = page["enter"](session)
+            if redirect:
+                page_name = redirect
+                continue
+
+        text = render_site_page(site, page_name, page, session)
+        if text:
+            print(text)
+
+        if "prompt" not in page:
+            if "pause" in page:
+                input(page["pause"])
+            page_name = page.get("next")
+            continue
+
+        choice = input(page["prompt"]).strip()
+        if choice.lower() == "back":
+            page_name = page.get("back")
+            continue
+
+        target = page.get("options", {}).get(choice, INVALID_OPTION)
+        if target is INVALID_OPTION and "select" in page:
+            target = page["select"](session, choice)
+
+        if target is INVALID_OPTION:
+            print(Fore.RED + "Invalid option.")
+            page_name = page.get("invalid", page_name)
+        else:
+            page_name = target
+
+def select_number(choice: str, count: int) -> Optional[int]:
+    """Convert a 1-based menu choice into an index, or None if it is out of range"""
+    if choice.isdigit() and 1 <= int(choice) <= count:
+        return int(choice) - 1
+    return None
+
+def leave_site() -> None:
+    """Drop the darkweb connection after a site refuses access"""
+    game_state.circuits.release(game_state.current_site)
+    game_state.connected_to_darkweb = False
+    game_state.current_site = None
+
+# BitcoinHub
+BITCOINHUB_BANNER = Fore.YELLOW + """
 ===================================================
           ₿ITCOIN HUB - Cryptocurrency Exchange
 ===================================================
-    """)
-    
-    print(Fore.WHITE + f"""
+    """
+
+def render_bitcoinhub_home(session: Dict) -> str:
+    """BitcoinHub front page with the player's balance"""
+    return BITCOINHUB_BANNER + "\n" + Fore.WHITE + f"""
 Your Balance: {format_btc(game_state.player['bitcoin'])} (${get_btc_usd_value(game_state.player['bitcoin']):.2f})
-Current BTC Value: ${DEFAULT_BTC_VALUE:.2f}
+Current BTC Value: ${game_state.market.price('BTC'):.2f}
 
 Options:
 1. Exchange rates
 2. Market trends
-3. Trading (coming soon)
-4. Mining pools (coming soon)
-    """)
-    
-    choice = input(Fore.CYAN + "Enter option (or 'back' to return): " + Fore.WHITE)
-    
-    if choice == "1":
-        print(Fore.WHITE + """
-Exchange Rates:
-1 BTC = $45,000 USD
-1 BTC = €41,000 EUR
-1 BTC = £35,000 GBP
-1 BTC = ¥5,200,000 JPY
+3. Trading
+4. Mining pools
+    """
 
-1 E-Coin = $1.00 USD (E Corp pegged rate)
-        """)
-    elif choice == "2":
-        print(Fore.WHITE + """
-Market Trends:
-Bitcoin: ↑ +3.2% (Last 24h)
-Ethereum: ↑ +1.7% (Last 24h)
-E-Coin: → 0.0% (Stable, pegged to USD)
+def render_bitcoinhub_rates(session: Dict) -> str:
+    """Live exchange rates"""
+    market = update_market()
+    btc = market.price("BTC")
+    lines = [Fore.WHITE + "\nExchange Rates:", f"1 BTC = ${btc:,.2f} USD"]
+    for currency, (symbol, rate) in FIAT_RATES.items():
+        lines.append(f"1 BTC = {symbol}{btc * rate:,.2f} {currency}")
+    lines.append(f"1 ETH = ${market.price('ETH'):,.2f} USD")
+    lines.append(f"\n1 E-Coin = ${market.price('ECOIN'):.4f} USD (E Corp pegged rate)\n")
+    return "\n".join(lines)
 
+def render_bitcoinhub_trends(session: Dict) -> str:
+    """24h price changes with a sparkline of the last in-game day"""
+    market = update_market()
+    day = 24 * 3600 // MARKET_TICK_SECONDS
+    lines = [Fore.WHITE + "\nMarket Trends:"]
+    for asset, label in [("BTC", "Bitcoin"), ("ETH", "Ethereum"), ("ECOIN", "E-Coin")]:
+        trend = sparkline(market.closes(asset, "1h")[-24:])
+        lines.append(f"{label + ':':10} {format_change(market.change(asset, day)):>9} (Last 24h)  {trend}")
+    lines.append('''
 Analyst Notes:
-"With recent cyber attacks on financial systems, cryptocurrency 
+"With recent cyber attacks on financial systems, cryptocurrency
 adoption continues to rise. E-Coin's stability is maintained
 by E Corp's massive reserves, though some question for how long."
-        """)
-    elif choice == "3" or choice == "4":
-        print(Fore.YELLOW + "This feature is not yet available.")
-    elif choice.lower() == "back":
-        return
-    else:
-        print(Fore.RED + "Invalid option.")
-    
-    # Remain on the page
-    display_bitcoinhub()
-
-def display_globalch() -> None:
-    """Display the Global Hacker Chat site"""
-    print(Fore.GREEN + """
-===================================================
-          GLOBAL HACKER CHAT - Latest Threads
-===================================================
-    """)
-    
-    threads = [
-        ["AnonymouS", "E Corp vulnerabilities", "12h ago", 24],
-        ["darkPulse", "New zero-day in Windows", "3h ago", 87],
-        ["FSociety", "Operation planning", "6h ago", 31],
-        ["CyberPhantom", "Steel Mountain bypass methods", "2d ago", 45],
-        ["Whiterose", "Time sensitive matters", "1h ago", 17],
-        ["NetHunter", "Network traffic analysis tools", "8h ago", 29]
-    ]
-    
-    print(Fore.WHITE + "\nActive Threads:")
-    for i, (user, title, time, replies) in enumerate(threads, 1):
-        print(f"{i}. {Fore.CYAN}[{user}]{Fore.WHITE} {title} {Fore.YELLOW}({time}, {replies} replies)")
-    
-    choice = input(Fore.CYAN + "\nEnter thread number (or 'back' to return): " + Fore.WHITE)
-    
-    if choice.isdigit() and 1 <= int(choice) <= len(threads):
-        thread_idx = int(choice) - 1
-        user, title, _, _ = threads[thread_idx]
-        
-        print(Fore.YELLOW + f"\n=== Thread: {title} by {user} ===\n")
-        
-        # Generate some fake chat messages based on the thread
-        if "E Corp" in title:
-            messages = [
-                ["AnonymouS", "Found a potential SQL injection in their customer portal."],
-                ["ShadowByte", "Old news. They patched that last month."],
-                ["RedTeamer", "The real vulnerability is in their API gateway."],
-                ["FSociety", "We have more effective plans for E Corp..."],
-                ["l33tHax", "Anyone tried attacking their SWIFT terminals?"],
-                ["AnonymouS", "Their security team is expanding. Be careful."]
-            ]
-        elif "zero-day" in title:
-            messages = [
-                ["darkPulse", "This affects all Windows systems with SMB enabled."],
-                ["WinHacker", "Proof of concept: github.com/darkpulse/smb-exploit"],
-                ["SecureOS", "Microsoft is aware but hasn't released a patch yet."],
-                ["Elliot", "Already weaponized. Use with extreme caution."],
-                ["BugHunter", "I've reported it to MSRC, bounty rejected."],
-                ["darkPulse", "Typical corporation ignoring real threats."]
-            ]
-        elif "FSociety" in title:
-            messages = [
-                ["FSociety", "Next phase begins tomorrow. Check secure channels."],
-                ["MrRobot", "All members confirm readiness."],
-                ["Darlene", "Hardware is prepared and distributed."],
-                ["Trenton", "Network reconnaissance complete. Sending data via usual method."],
-                ["Mobley", "Infrastructure is ready. Waiting for the signal."],
-                ["FSociety", "Remember: We are fsociety, we are finally free, we are finally awake!"]
-            ]
-        elif "Steel Mountain" in title:
-            messages = [
-                ["CyberPhantom", "Their HVAC systems run on an isolated network, but there's a bridge."],
-                ["NetRunner", "Old Raspberry Pi trick still works if you can get physical access."],
-                ["IceBreaker", "Better to social engineer your way in as HVAC technician."],
-                ["0xDEADBEEF", "Don't bother. They've implemented RFID entry badges with biometrics."],
-                ["CyberPhantom", "RFID can be cloned if you get close enough to an employee."],
-                ["Elliot", "The real vulnerability is in their climate monitoring software."]
-            ]
-        elif "Time sensitive" in title:
-            messages = [
-                ["Whiterose", "Everything happens exactly when it is supposed to happen."],
-                ["DarkArmy", "Instructions received. Teams deployed."],
-                ["Cipher", "Washington Township facility is ready."],
-                ["Whiterose", "The project must remain on schedule. Delays are unacceptable."],
-                ["Phantom", "Surveillance of target continues as directed."],
-                ["Whiterose", "Remember, every person has a purpose, whether they know it or not."]
-            ]
-        else:
-            messages = [
-                ["NetHunter", "Wireshark still the best for most analysis needs."],
-                ["PacketWiz", "Try Zeek (formerly Bro) for large-scale monitoring."],
-                ["tcpdumpGod", "Don't sleep on tcpdump with custom filters."],
-                ["NetMonster", "Anyone tried Arkime (formerly Moloch)?"],
-                ["DataSnoop", "For encrypted traffic analysis, look at JA3 fingerprinting."],
-                ["NetHunter", "Good point. Tool chain matters less than your methodology."]
-            ]
-        
-        for user, message in messages:
-            print(f"{Fore.CYAN}{user}: {Fore.WHITE}{message}")
-        
-        input(Fore.YELLOW + "\nPress Enter to return to thread list...")
-        display_globalch()
-    elif choice.lower() == "back":
-        return
-    else:
-        print(Fore.RED + "Invalid option.")
-        display_globalch()
+''')
+    return "\n".join(lines)
 
-def display_champions() -> None:
-    """Display the Hacker Championships site"""
-    print(Fore.RED + """
+def render_bitcoinhub_trading(session: Dict) -> str:
+    """Order book depth for BTC/E-Coin and the player's open orders"""
+    book = update_order_book()
+    lines = [Fore.WHITE + "\nBTC/E-Coin Order Book:", f"{'Price (E-Coin)':>16}  {'Amount (BTC)':>14}"]
+    for price, quantity in reversed(book.depth("sell")):
+        lines.append(f"{Fore.RED}{price:>16,.2f}  {quantity:>14.4f}")
+    lines.append(Fore.WHITE + "-" * 32)
+    for price, quantity in book.depth("buy"):
+        lines.append(f"{Fore.GREEN}{price:>16,.2f}  {quantity:>14.4f}")
+    lines.append(Fore.WHITE + f"\nYour E-Coin: {game_state.player['ecoin']:,.2f}   Open orders: {len(book.player_orders())}")
+    lines.append("Trade from the terminal with 'buy', 'sell', 'orders' and 'cancel'.\n")
+    return "\n".join(lines)
+
+def render_bitcoinhub_mining(session: Dict) -> str:
+    """Mining pool terms and the player's rig"""
+    cpu = game_state.pc["cpu"]
+    workers = host_worker_count(cpu["cores"])
+    lines = [Fore.WHITE + "\nBitcoinHub Mining Pool:",
+             f"Share difficulty: {MINING_SHARE_BITS} leading zero bits (double SHA-256)",
+             f"Payout: {format_btc(MINING_SHARE_REWARD)} per share",
+             f"\nYour rig: {cpu['name']} ({cpu['cores']} cores) -> {workers} worker{'s' if workers != 1 else ''}",
+             f"Status: {Fore.GREEN + 'mining' if miner.running else Fore.RED + 'idle'}{Fore.WHITE}",
+             "Control your miner from the terminal with 'mine start', 'mine stop' and 'mine status'.\n"]
+    return "\n".join(lines)
+
+# Global Hacker Chat
+GLOBALCH_BANNER = Fore.GREEN + """
+===================================================
+          GLOBAL HACKER CHAT - Latest Threads
+===================================================
+    """
+
+GLOBALCH_THREADS = [
+    {
+        "user": "AnonymouS", "title": "E Corp vulnerabilities", "age": "12h ago", "replies": 24,
+        "messages": [
+            ["AnonymouS", "Found a potential SQL injection in their customer portal."],
+            ["ShadowByte", "Old news. They patched that last month."],
+            ["RedTeamer", "The real vulnerability is in their API gateway."],
+            ["FSociety", "We have more effective plans for E Corp..."],
+            ["l33tHax", "Anyone tried attacking their SWIFT terminals?"],
+            ["AnonymouS", "Their security team is expanding. Be careful."]
+        ]
+    },
+    {
+        "user": "darkPulse", "title": "New zero-day in Windows", "age": "3h ago", "replies": 87,
+        "messages": [
+            ["darkPulse", "This affects all Windows systems with SMB enabled."],
+            ["WinHacker", "Proof of concept: github.com/darkpulse/smb-exploit"],
+            ["SecureOS", "Microsoft is aware but hasn't released a patch yet."],
+            ["Elliot", "Already weaponized. Use with extreme caution."],
+            ["BugHunter", "I've reported it to MSRC, bounty rejected."],
+            ["darkPulse", "Typical corporation ignoring real threats."]
+        ]
+    },
+    {
+        "user": "FSociety", "title": "Operation planning", "age": "6h ago", "replies": 31,
+        "messages": [
+            ["FSociety", "Next phase begins tomorrow. Check secure channels."],
+            ["MrRobot", "All members confirm readiness."],
+            ["Darlene", "Hardware is prepared and distributed."],
+            ["Trenton", "Network reconnaissance complete. Sending data via usual method."],
+            ["Mobley", "Infrastructure is ready. Waiting for the signal."],
+            ["FSociety", "Remember: We are fsociety, we are finally free, we are finally awake!"]
+        ]
+    },
+    {
+        "user": "CyberPhantom", "title": "Steel Mountain bypass methods", "age": "2d ago", "replies": 45,
+        "messages": [
+            ["CyberPhantom", "Their HVAC systems run on an isolated network, but there's a bridge."],
+            ["NetRunner", "Old Raspberry Pi trick still works if you can get physical access."],
+            ["IceBreaker", "Better to social engineer your way in as HVAC technician."],
+            ["0xDEADBEEF", "Don't bother. They've implemented RFID entry badges with biometrics."],
+            ["CyberPhantom", "RFID can be cloned if you get close enough to an employee."],
+            ["Elliot", "The real vulnerability is in their climate monitoring software."]
+        ]
+    },
+    {
+        "user": "Whiterose", "title": "Time sensitive matters", "age": "1h ago", "replies": 17,
+        "messages": [
+            ["Whiterose", "Everything happens exactly when it is supposed to happen."],
+            ["DarkArmy", "Instructions received. Teams deployed."],
+            ["Cipher", "Washington Township facility is ready."],
+            ["Whiterose", "The project must remain on schedule. Delays are unacceptable."],
+            ["Phantom", "Surveillance of target continues as directed."],
+            ["Whiterose", "Remember, every person has a purpose, whether they know it or not."]
+        ]
+    },
+    {
+        "user": "NetHunter", "title": "Network traffic analysis tools", "age": "8h ago", "replies": 29,
+        "messages": [
+            ["NetHunter", "Wireshark still the best for most analysis needs."],
+            ["PacketWiz", "Try Zeek (formerly Bro) for large-scale monitoring."],
+            ["tcpdumpGod", "Don't sleep on tcpdump with custom filters."],
+            ["NetMonster", "Anyone tried Arkime (formerly Moloch)?"],
+            ["DataSnoop", "For encrypted traffic analysis, look at JA3 fingerprinting."],
+            ["NetHunter", "Good point. Tool chain matters less than your methodology."]
+        ]
+    }
+]
+
+def render_globalch_threads(session: Dict) -> str:
+    """Thread list of the Global Hacker Chat"""
+    lines = [GLOBALCH_BANNER, Fore.WHITE + "\nActive Threads:"]
+    for i, thread in enumerate(GLOBALCH_THREADS, 1):
+        lines.append(f"{i}. {Fore.CYAN}[{thread['user']}]{Fore.WHITE} {thread['title']} "
+                     f"{Fore.YELLOW}({thread['age']}, {thread['replies']} replies)")
+    return "\n".join(lines)
+
+def render_globalch_thread(session: Dict) -> str:
+    """Messages of the selected chat thread"""
+    thread = GLOBALCH_THREADS[session["selection"]]
+    lines = [Fore.YELLOW + f"\n=== Thread: {thread['title']} by {thread['user']} ===\n"]
+    for user, message in thread["messages"]:
+        lines.append(f"{Fore.CYAN}{user}: {Fore.WHITE}{message}")
+    return "\n".join(lines)
+
+def select_globalch_thread(session: Dict, choice: str):
+    """Open a chat thread by number"""
+    index = select_number(choice, len(GLOBALCH_THREADS))
+    if index is None:
+        return INVALID_OPTION
+    session["selection"] = index
+    return "thread"
+
+# Hacker Championships
+CHAMPIONS_BANNER = Fore.RED + """
 ===================================================
           HACKER CHAMPIONSHIPS - Elite Challenges
 ===================================================
-    """)
-    
-    # Filter championships by reputation requirement
-    available_championships = [c for c in game_state.championships 
-                             if c["required_rep"] <= game_state.player["reputation"]]
-    
-    if not available_championships:
-        print(Fore.YELLOW + "\nNo championships available at your current reputation level.")
-        print(f"Your reputation: {game_state.player['reputation']}")
-        print("Check back after building more reputation.")
-        
-        input(Fore.CYAN + "\nPress Enter to return...")
-        return
-    
-    print(Fore.WHITE + "\nAvailable Championships:")
-    for i, championship in enumerate(available_championships, 1):
+    """
+
+def get_available_championships() -> List[Dict]:
+    """Championships the player has enough reputation to see"""
+    return [c for c in game_state.championships
+            if c["required_rep"] <= game_state.player["reputation"]]
+
+def enter_champions_list(session: Dict) -> Optional[str]:
+    """Redirect to the 'nothing available' page when the player lacks reputation"""
+    offer_championships()
+    return None if get_available_championships() else "unavailable"
+
+def render_champions_unavailable(session: Dict) -> str:
+    """Shown when no championship is open to the player yet"""
+    return (CHAMPIONS_BANNER + "\n" +
+            Fore.YELLOW + "\nNo championships available at your current reputation level.\n" +
+            f"Your reputation: {game_state.player['reputation']}\n" +
+            "Check back after building more reputation.")
+
+def render_champions_list(session: Dict) -> str:
+    """List of championships open to the player"""
+    lines = [CHAMPIONS_BANNER, Fore.WHITE + "\nAvailable Championships:"]
+    for i, championship in enumerate(get_available_championships(), 1):
         status = f"{Fore.GREEN}[COMPLETED]" if championship["completed"] else ""
-        print(f"{i}. {Fore.CYAN}{championship['title']}{Fore.WHITE} (Difficulty: {championship['difficulty']}) {status}")
-        print(f"   {championship['description']}")
-        print(f"   Reward: {format_btc(championship['reward'])} + {championship['rep_reward']} rep")
-    
-    choice = input(Fore.CYAN + "\nEnter championship number for details (or 'back'): " + Fore.WHITE)
-    
-    if choice.isdigit() and 1 <= int(choice) <= len(available_championships):
-        champ_idx = int(choice) - 1
-        championship = available_championships[champ_idx]
-        
-        print(Fore.YELLOW + f"\n=== Championship: {championship['title']} ===\n")
-        print(Fore.WHITE + f"Description: {championship['description']}")
-        print(f"Target: {championship['target']}")
-        print(f"Difficulty: {championship['difficulty']}/10")
-        print(f"Reward: {format_btc(championship['reward'])} + {championship['rep_reward']} reputation")
-        
-        print("\nRequired Tasks:")
-        for i, task in enumerate(championship["tasks"], 1):
-            if i <= championship["current_task"]:
-                print(f"{i}. {Fore.GREEN}[DONE] {task}")
-            else:
-                print(f"{i}. {Fore.YELLOW}{task}")
-        
-        # Show special requirements
-        if championship.get("fsociety_required") and not game_state.player["fsociety_member"]:
-            print(Fore.RED + "\nRequires FSociety membership!")
-            
-        if championship.get("dark_army_required") and not game_state.player["dark_army_contact"]:
-            print(Fore.RED + "\nRequires Dark Army contact!")
-        
-        print("\nTo attempt this championship, use the following commands:")
-        print(f"1. scan {championship['target']}")
-        print(f"2. hack {championship['target']}")
-        print(f"(Advanced hacking commands may be required based on tasks)")
-        
-        input(Fore.CYAN + "\nPress Enter to return to championship list...")
-        display_champions()
-    elif choice.lower() == "back":
-        return
-    else:
-        print(Fore.RED + "Invalid option.")
-        display_champions()
+        lines.append(f"{i}. {Fore.CYAN}{championship['title']}{Fore.WHITE} (Difficulty: {championship['difficulty']}) {status}")
+        lines.append(f"   {championship['description']}")
+        lines.append(f"   Reward: {format_btc(championship['reward'])} + {championship['rep_reward']} rep")
+    return "\n".join(lines)
 
-def display_fsociety() -> None:
-    """Display the fsociety site"""
-    print(Fore.RED + """
+def select_championship(session: Dict, choice: str):
+    """Open a championship's details by number"""
+    available = get_available_championships()
+    index = select_number(choice, len(available))
+    if index is None:
+        return INVALID_OPTION
+    session["selection"] = available[index]["id"]
+    return "details"
+
+def render_championship_details(session: Dict) -> str:
+    """Details and task progress of the selected championship"""
+    championship = get_championship_by_id(session["selection"])
+    lines = [
+        Fore.YELLOW + f"\n=== Championship: {championship['title']} ===\n",
+        Fore.WHITE + f"Description: {championship['description']}",
+        f"Target: {championship['target']}",
+        f"Difficulty: {championship['difficulty']}/10",
+        f"Reward: {format_btc(championship['reward'])} + {championship['rep_reward']} reputation",
+        "\nRequired Tasks:"
+    ]
+    for i, task in enumerate(championship["tasks"], 1):
+        if i <= championship["current_task"]:
+            lines.append(f"{i}. {Fore.GREEN}[DONE] {task}")
+        else:
+            lines.append(f"{i}. {Fore.YELLOW}{task}")
+
+    # Show special requirements
+    if championship.get("fsociety_required") and not game_state.player["fsociety_member"]:
+        lines.append(Fore.RED + "\nRequires FSociety membership!")
+
+    if championship.get("dark_army_required") and not game_state.player["dark_army_contact"]:
+        lines.append(Fore.RED + "\nRequires Dark Army contact!")
+
+    lines.append("\nTo attempt this championship, use the following commands:")
+    for i, task in enumerate(championship["tasks"][championship["current_task"]:], championship["current_task"] + 1):
+        lines.append(f"{i}. {objective_hint(task, championship['target'])}")
+    return "\n".join(lines)
+
+# fsociety
+FSOCIETY_HOME = Fore.RED + """
 ███████╗███████╗ ██████╗  ██████╗██╗███████╗████████╗██╗   ██╗
 ██╔════╝██╔════╝██╔═══██╗██╔════╝██║██╔════╝╚══██╔══╝╚██╗ ██╔╝
-█████╗  ███████╗██║   ██║██║     ██║█████╗     ██║    ╚████╔╝ 
-██╔══╝  ╚════██║██║   ██║██║     ██║██╔══╝     ██║     ╚██╔╝  
-██║     ███████║╚██████╔╝╚██████╗██║███████╗   ██║      ██║   
-╚═╝     ╚══════╝ ╚═════╝  ╚═════╝╚═╝╚══════╝   ╚═╝      ╚═╝   
+█████╗  ███████╗██║   ██║██║     ██║█████╗     ██║    ╚████╔╝
+██╔══╝  ╚════██║██║   ██║██║     ██║██╔══╝     ██║     ╚██╔╝
+██║     ███████║╚██████╔╝╚██████╗██║███████╗   ██║      ██║
+╚═╝     ╚══════╝ ╚═════╝  ╚═════╝╚═╝╚══════╝   ╚═╝      ╚═╝
 ===================================================================
             "Democracy has been hacked"
 ===================================================================
+    """ + "\n" + Fore.GREEN + f"Welcome, {Fore.YELLOW}member{Fore.GREEN}. Our revolution continues." + """
+""" + Fore.WHITE + """
+FSociety Terminal:
+1. Active Missions
+2. Five/Nine Planning
+3. Member Communications
+4. E Corp Intelligence"""
+
+def get_fsociety_missions() -> List[Dict]:
+    """Open missions tied to fsociety"""
+    return [m for m in game_state.missions.open() if m.get("fsociety_related")]
+
+def enter_fsociety_missions(session: Dict) -> Optional[str]:
+    """Redirect to the 'no missions' page when there is nothing to accept"""
+    return None if get_fsociety_missions() else "no_missions"
+
+def render_fsociety_missions(session: Dict) -> str:
+    """List of fsociety missions"""
+    lines = [Fore.WHITE + "\nFSociety Missions:"]
+    for i, mission in enumerate(get_fsociety_missions(), 1):
+        lines.append(f"{i}. {Fore.CYAN}{mission['title']}{Fore.WHITE}")
+        lines.append(f"   {mission['description']}")
+        lines.append(f"   Target: {mission['target']}")
+    return "\n".join(lines)
+
+def accept_fsociety_mission(session: Dict, choice: str) -> str:
+    """Accept an fsociety mission by number; any other input just returns to the menu"""
+    missions = get_fsociety_missions()
+    index = select_number(choice, len(missions))
+    if index is not None:
+        mission = missions[index]
+        set_current_mission(mission["id"])
+        print(Fore.GREEN + f"\nMission accepted: {mission['title']}")
+    return "resume"
+
+# E Corp internal network
+def ecorp_access_check() -> bool:
+    """Only players with enough reputation get past E Corp's login"""
+    # This should only be accessible once specific missions are completed
+    if game_state.player["reputation"] >= 70:
+        return True
+
+    print(Fore.RED + """
+===================================================
+          ACCESS DENIED - E Corp Internal Network
+===================================================
+
+Your access attempt has been logged.
+This incident will be reported to security.
     """)
-    
-    print(Fore.GREEN + f"Welcome, {Fore.YELLOW}member{Fore.GREEN}. Our revolution continues.")
-    
-    menu_options = [
-        "Active Missions",
-        "Five/Nine Planning",
-        "Member Communications",
-        "E Corp Intelligence"
-    ]
-    
-    print(Fore.WHITE + "\nFSociety Terminal:")
-    for i, option in enumerate(menu_options, 1):
-        print(f"{i}. {option}")
-    
-    choice = input(Fore.CYAN + "\nSelect option (or 'back'): " + Fore.WHITE)
-    
-    if choice == "1":
-        # Display available fsociety missions
-        fsociety_missions = [m for m in game_state.missions 
-                           if m.get("fsociety_related") and not m["completed"]]
-        
-        if not fsociety_missions:
-            print(Fore.YELLOW + "\nNo active fsociety missions available.")
-            print("Check back later or complete the Five/Nine preparation.")
-        else:
-            print(Fore.WHITE + "\nFSociety Missions:")
-            for i, mission in enumerate(fsociety_missions, 1):
-                print(f"{i}. {Fore.CYAN}{mission['title']}{Fore.WHITE}")
-                print(f"   {mission['description']}")
-                print(f"   Target: {mission['target']}")
-            
-            mission_choice = input(Fore.CYAN + "\nAccept mission (number) or 'back': " + Fore.WHITE)
-            if mission_choice.isdigit() and 1 <= int(mission_choice) <= len(fsociety_missions):
-                mission = fsociety_missions[int(mission_choice) - 1]
-                game_state.player["current_mission"] = mission["id"]
-                print(Fore.GREEN + f"\nMission accepted: {mission['title']}")
-    
-    elif choice == "2":
-        print(Fore.WHITE + """
+    pause(2)
+    print(Fore.YELLOW + "Connection terminated.")
+    leave_site()
+    return False
+
+ECORP_HOME = Fore.BLUE + r"""
+ ______   ______     ______     ______     ______
+/\  ___\ /\  ___\   /\  __ \   /\  == \   /\  == \
+\ \  __\ \ \ \____  \ \ \/\ \  \ \  __<   \ \  _-/
+ \ \_____\ \_____\  \ \_____\  \ \_\ \_\  \ \_\
+  \/_____/ \/_____/   \/_____/   \/_/ /_/   \/_/
+===================================================
+          INTERNAL NETWORK - Authorized Users Only
+===================================================
+    """ + "\n" + Fore.RED + """WARNING: You have illegally accessed E Corp's internal network.
+This is for storytelling purposes only. Unauthorized access to real systems is illegal.
+""" + Fore.WHITE + """
+E Corp Systems:
+1. Employee Directory
+2. Project Dashboard
+3. Financial Records
+4. Security Protocols"""
+
+# Dark Army
+def dark_army_access_check() -> bool:
+    """The Dark Army site only exists for players they have contacted"""
+    if game_state.player["dark_army_contact"]:
+        return True
+    print(Fore.RED + "Connection terminated. This site does not exist.")
+    leave_site()
+    return False
+
+DARK_ARMY_HOME = Fore.MAGENTA + """
+╔╦╗╔═╗╦═╗╦╔═  ╔═╗╦═╗╔╦╗╦ ╦
+ ║║╠═╣╠╦╝╠╩╗  ╠═╣╠╦╝║║║╚╦╝
+═╩╝╩ ╩╩╚═╩ ╩  ╩ ╩╩╚═╩ ╩ ╩
+===================================================
+         "Those who control the answers..."
+===================================================
+    """ + "\n" + Fore.WHITE + """
+Welcome. Time is always of the essence.
+""" + Fore.WHITE + """
+Terminal:
+1. Active Operations
+2. Communication Protocols
+3. Whiterose's Directives
+4. Intelligence Reports"""
+
+# Shared "Press Enter" page used by the menu-style sites
+RETURN_TO_MAIN_MENU = {"pause": Fore.CYAN + "\nPress Enter to return to main menu...", "next": "main"}
+
+def menu_text_page(text: str) -> Dict:
+    """A static information page that returns to the main menu"""
+    return {"text": Fore.WHITE + text, "next": "resume"}
+
+SITES = {
+    "bitcoinhub.onion": {
+        "start": "main",
+        "pages": {
+            "main": {
+                "render": render_bitcoinhub_home,
+                "prompt": Fore.CYAN + "Enter option (or 'back' to return): " + Fore.WHITE,
+                "options": {"1": "rates", "2": "trends", "3": "trading", "4": "mining"},
+                "back": None
+            },
+            "rates": {"render": render_bitcoinhub_rates, "next": "main"},
+            "trends": {"render": render_bitcoinhub_trends, "next": "main"},
+            "trading": {"render": render_bitcoinhub_trading, "next": "main"},
+            "mining": {"render": render_bitcoinhub_mining, "next": "main"}
+        }
+    },
+    "globalch.onion": {
+        "start": "main",
+        "pages": {
+            "main": {
+                "render": render_globalch_threads,
+                "cache": True,
+                "prompt": Fore.CYAN + "\nEnter thread number (or 'back' to return): " + Fore.WHITE,
+                "select": select_globalch_thread,
+                "back": None
+            },
+            "thread": {
+                "render": render_globalch_thread,
+                "cache": True,
+                "pause": Fore.YELLOW + "\nPress Enter to return to thread list...",
+                "next": "main"
+            }
+        }
+    },
+    "champions.onion": {
+        "start": "main",
+        "pages": {
+            "main": {
+                "enter": enter_champions_list,
+                "render": render_champions_list,
+                "prompt": Fore.CYAN + "\nEnter championship number for details (or 'back'): " + Fore.WHITE,
+                "select": select_championship,
+                "back": None
+            },
+            "unavailable": {
+                "render": render_champions_unavailable,
+                "pause": Fore.CYAN + "\nPress Enter to return...",
+                "next": None
+            },
+            "details": {
+                "render": render_championship_details,
+                "pause": Fore.CYAN + "\nPress Enter to return to championship list...",
+                "next": "main"
+            }
+        }
+    },
+    "fsociety.onion": {
+        "start": "main",
+        "pages": {
+            "main": {
+                "text": FSOCIETY_HOME,
+                "prompt": Fore.CYAN + "\nSelect option (or 'back'): " + Fore.WHITE,
+                "options": {"1": "missions", "2": "plan", "3": "communications", "4": "intelligence"},
+                "back": None,
+                "invalid": "resume"
+            },
+            "resume": RETURN_TO_MAIN_MENU,
+            "missions": {
+                "enter": enter_fsociety_missions,
+                "render": render_fsociety_missions,
+                "prompt": Fore.CYAN + "\nAccept mission (number) or 'back': " + Fore.WHITE,
+                "select": accept_fsociety_mission,
+                "back": "resume"
+            },
+            "no_missions": {
+                "text": Fore.YELLOW + "\nNo active fsociety missions available.\n" +
+                        "Check back later or complete the Five/Nine preparation.",
+                "next": "resume"
+            },
+            "plan": menu_text_page("""
 Five/Nine Attack Plan:
 
 Phase 1: [COMPLETE] Infiltrate Steel Mountain (E Corp's backup facility)
@@ -1937,10 +5098,8 @@ Phase 5: [PENDING] Public announcement claiming responsibility
 
 Current Progress: 42%
 Estimated timeline: 17 days until execution
-        """)
-    
-    elif choice == "3":
-        print(Fore.WHITE + """
+        """),
+            "communications": menu_text_page("""
 Recent Communications:
 
 [Darlene] We need more people on the Steel Mountain operation.
@@ -1951,10 +5110,8 @@ Recent Communications:
 
 Secure Chat Channel: IRC://fsociety.offset-314159.onion
 Next Meeting: Tomorrow, 23:00 EST, Coney Island location
-        """)
-    
-    elif choice == "4":
-        print(Fore.WHITE + """
+        """),
+            "intelligence": menu_text_page("""
 E Corp Intelligence:
 
 CEO: Phillip Price
@@ -1970,63 +5127,21 @@ Key Vulnerabilities:
 Security Alert Level: ELEVATED
 Recent Security Changes: Added biometric verification to data centers
         """)
-    
-    elif choice.lower() == "back":
-        return
-    else:
-        print(Fore.RED + "Invalid option.")
-    
-    # Return to the fsociety main menu
-    input(Fore.CYAN + "\nPress Enter to return to main menu...")
-    display_fsociety()
-
-def display_ecorp_internal() -> None:
-    """Display the E Corp internal site"""
-    # This should only be accessible once specific missions are completed
-    if game_state.player["reputation"] < 70:
-        print(Fore.RED + """
-===================================================
-          ACCESS DENIED - E Corp Internal Network
-===================================================
-
-Your access attempt has been logged.
-This incident will be reported to security.
-    """)
-        time.sleep(2)
-        print(Fore.YELLOW + "Connection terminated.")
-        game_state.connected_to_darkweb = False
-        game_state.current_site = None
-        return
-    
-    print(Fore.BLUE + """
- ______   ______     ______     ______     ______  
-/\  ___\ /\  ___\   /\  __ \   /\  == \   /\  == \ 
-\ \  __\ \ \ \____  \ \ \/\ \  \ \  __<   \ \  _-/ 
- \ \_____\\ \_____\  \ \_____\  \ \_\ \_\  \ \_\   
-  \/_____/ \/_____/   \/_____/   \/_/ /_/   \/_/   
-===================================================
-          INTERNAL NETWORK - Authorized Users Only
-===================================================
-    """)
-    
-    print(Fore.RED + "WARNING: You have illegally accessed E Corp's internal network.")
-    print("This is for storytelling purposes only. Unauthorized access to real systems is illegal.")
-    
-    menu_options = [
-        "Employee Directory",
-        "Project Dashboard",
-        "Financial Records",
-        "Security Protocols"
-    ]
-    
-    print(Fore.WHITE + "\nE Corp Systems:")
-    for i, option in enumerate(menu_options, 1):
-        print(f"{i}. {option}")
-    
-    choice = input(Fore.CYAN + "\nSelect option (or 'back'): " + Fore.WHITE)
-    
-    if choice == "1":
-        print(Fore.WHITE + """
+        }
+    },
+    "ecorp.onion": {
+        "start": "main",
+        "guard": ecorp_access_check,
+        "pages": {
+            "main": {
+                "text": ECORP_HOME,
+                "prompt": Fore.CYAN + "\nSelect option (or 'back'): " + Fore.WHITE,
+                "options": {"1": "directory", "2": "projects", "3": "financials", "4": "security"},
+                "back": None,
+                "invalid": "resume"
+            },
+            "resume": RETURN_TO_MAIN_MENU,
+            "directory": menu_text_page("""
 Employee Directory:
 
 Executive Team:
@@ -2047,10 +5162,8 @@ IT Operations:
 - Marcus Brown (Infrastructure)
 - Olivia Martinez (Applications)
 - David Garcia (Network Operations)
-        """)
-    
-    elif choice == "2":
-        print(Fore.WHITE + """
+        """),
+            "projects": menu_text_page("""
 Project Dashboard:
 
 Active Projects:
@@ -2062,10 +5175,8 @@ Active Projects:
 Recently Completed:
 - Project Monarch: Executive communications encryption
 - Project Icarus: Cloud transition phase 1
-        """)
-    
-    elif choice == "3":
-        print(Fore.WHITE + """
+        """),
+            "financials": menu_text_page("""
 Financial Records:
 
 Quarterly Earnings (Last Quarter):
@@ -2081,10 +5192,8 @@ Loan Portfolio:
 Market Position:
 - Global Market Share: 72% of consumer credit
 - E-Coin Adoption Rate: 37% month-over-month growth
-        """)
-    
-    elif choice == "4":
-        print(Fore.WHITE + """
+        """),
+            "security": menu_text_page("""
 Security Protocols:
 
 Current Security Level: 4 (ELEVATED)
@@ -2102,50 +5211,21 @@ Security Bulletin:
 attacks targeting E Corp employees. Report any suspicious
 communications to security@ecorp.com immediately."
         """)
-    
-    elif choice.lower() == "back":
-        return
-    else:
-        print(Fore.RED + "Invalid option.")
-    
-    # Return to the E Corp main menu
-    input(Fore.CYAN + "\nPress Enter to return to main menu...")
-    display_ecorp_internal()
-
-def display_dark_army() -> None:
-    """Display the Dark Army site"""
-    if not game_state.player["dark_army_contact"]:
-        print(Fore.RED + "Connection terminated. This site does not exist.")
-        game_state.connected_to_darkweb = False
-        game_state.current_site = None
-        return
-    
-    print(Fore.MAGENTA + """
-╔╦╗╔═╗╦═╗╦╔═  ╔═╗╦═╗╔╦╗╦ ╦
- ║║╠═╣╠╦╝╠╩╗  ╠═╣╠╦╝║║║╚╦╝
-═╩╝╩ ╩╩╚═╩ ╩  ╩ ╩╩╚═╩ ╩ ╩ 
-===================================================
-         "Those who control the answers..."
-===================================================
-    """)
-    
-    print(Fore.WHITE + "\nWelcome. Time is always of the essence.")
-    
-    menu_options = [
-        "Active Operations",
-        "Communication Protocols",
-        "Whiterose's Directives",
-        "Intelligence Reports"
-    ]
-    
-    print(Fore.WHITE + "\nTerminal:")
-    for i, option in enumerate(menu_options, 1):
-        print(f"{i}. {option}")
-    
-    choice = input(Fore.CYAN + "\nSelect option (or 'back'): " + Fore.WHITE)
-    
-    if choice == "1":
-        print(Fore.WHITE + """
+        }
+    },
+    "darkArmy.onion": {
+        "start": "main",
+        "guard": dark_army_access_check,
+        "pages": {
+            "main": {
+                "text": DARK_ARMY_HOME,
+                "prompt": Fore.CYAN + "\nSelect option (or 'back'): " + Fore.WHITE,
+                "options": {"1": "operations", "2": "protocols", "3": "directives", "4": "intelligence"},
+                "back": None,
+                "invalid": "resume"
+            },
+            "resume": RETURN_TO_MAIN_MENU,
+            "operations": menu_text_page("""
 Active Operations:
 
 Operation Nightshade [PRIORITY]:
@@ -2156,15 +5236,13 @@ Operation Nightshade [PRIORITY]:
 Operation Eclipse:
 - Support for Whiterose's Washington Township project
 - Resource procurement and security
-        
+
 Operation Phantom:
 - Monitoring of intelligence agencies
 - Counterintelligence measures
 - Elimination of security risks (as necessary)
-        """)
-    
-    elif choice == "2":
-        print(Fore.WHITE + """
+        """),
+            "protocols": menu_text_page("""
 Communication Protocols:
 
 - All communications must use Tox encryption (no exceptions)
@@ -2176,10 +5254,8 @@ Communication Protocols:
 
 Current Verification: "The highest value sees the farthest light"
 Next rotation: 12 hours
-        """)
-    
-    elif choice == "3":
-        print(Fore.WHITE + """
+        """),
+            "directives": menu_text_page("""
 Whiterose's Directives:
 
 "Time remains our most valuable asset. Schedules must be maintained
@@ -2193,116 +5269,685 @@ operation against E Corp unless specifically instructed."
 
 "Eliminate any threats to our operations with extreme prejudice.
 No exceptions, no matter the target's significance."
-        """)
-    
-    elif choice == "4":
-        print(Fore.WHITE + """
+        """),
+            "intelligence": menu_text_page("""
 Intelligence Reports:
 
-E Corp:
-- CEO Price suspects external manipulation but has no evidence
-- Internal security focusing on wrong attack vectors
-- Project Olympus (E-Coin) approaching critical deployment phase
+E Corp:
+- CEO Price suspects external manipulation but has no evidence
+- Internal security focusing on wrong attack vectors
+- Project Olympus (E-Coin) approaching critical deployment phase
+
+Government:
+- FBI operation "Python" is monitoring known hackers
+- Agent DiPierro showing concerning pattern recognition skills
+- NSA data collection poses minimal risk due to implemented countermeasures
+
+FSociety:
+- Five/Nine attack preparations proceeding as expected
+- Key members showing expected psychological patterns
+- Potential for successful operation: 78%
+        """)
+        }
+    }
+}
+
+def display_bitcoinhub() -> None:
+    """Display the BitcoinHub site"""
+    run_site("bitcoinhub.onion")
+
+def display_globalch() -> None:
+    """Display the Global Hacker Chat site"""
+    run_site("globalch.onion")
+
+def display_champions() -> None:
+    """Display the Hacker Championships site"""
+    run_site("champions.onion")
+
+def display_fsociety() -> None:
+    """Display the fsociety site"""
+    run_site("fsociety.onion")
+
+def display_ecorp_internal() -> None:
+    """Display the E Corp internal site"""
+    run_site("ecorp.onion")
+
+def display_dark_army() -> None:
+    """Display the Dark Army site"""
+    run_site("darkArmy.onion")
+
+# Port model
+PORT_CLOSED, PORT_OPEN, PORT_FILTERED = 0, 1, 2
+PORT_BLOCKS = 65536 >> PORT_BLOCK_BITS
+MASK64 = (1 << 64) - 1
+HASH_GOLDEN = 0x9E3779B97F4A7C15
+# Hash salts, so every random property of a target is drawn independently
+SALT_SERVICE, SALT_EXTRAS, SALT_RTT, SALT_BANNER, SALT_BOT = 1 << 20, 1 << 21, 1 << 22, 1 << 23, 1 << 24
+
+def mix64(x):
+    """SplitMix64 finalizer, on an int or elementwise on a uint64 NumPy array"""
+    if np is not None and isinstance(x, np.ndarray):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+def port_hash(seed, salt):
+    """Deterministic 64-bit hash of a target seed and a salt; uint64 arrays broadcast"""
+    if np is not None and isinstance(seed, np.ndarray):
+        return mix64(seed ^ (np.asarray(salt, dtype=np.uint64) * np.uint64(HASH_GOLDEN)))
+    return mix64(seed ^ (salt * HASH_GOLDEN & MASK64))
+
+def hash_unit(h):
+    """Map 64-bit hashes to floats in [0, 1)"""
+    if np is not None and isinstance(h, np.ndarray):
+        return (h >> np.uint64(11)).astype(float) * 2.0 ** -53
+    return (h >> 11) * 2.0 ** -53
+
+def profile_seed(target: Dict) -> int:
+    """64-bit seed derived from a target's profile, so its ports are the same in every game"""
+    profile = f"{target['ip']}|{target['name']}|{target['security_level']}|{','.join(target['services'])}"
+    return int.from_bytes(hashlib.blake2b(profile.encode(), digest_size=8).digest(), "little")
+
+def high_port(h: int) -> int:
+    return 1024 + h % (65536 - 1024)
+
+def service_ports(target: Dict, seed: Optional[int] = None) -> List[Tuple[int, str]]:
+    """(port, service) of every service a target runs, including unidentified ones on high ports"""
+    seed = profile_seed(target) if seed is None else seed
+    ports = {}
+    for i, service in enumerate(target["services"]):
+        ports.setdefault(SERVICE_PORTS.get(service) or high_port(port_hash(seed, SALT_SERVICE + i)), service)
+    for j in range(port_hash(seed, SALT_EXTRAS) % (PORT_EXTRA_SERVICES + 1)):
+        ports.setdefault(high_port(port_hash(seed, SALT_EXTRAS + 1 + j)), "unknown")
+    return sorted(ports.items())
+
+def filtered_blocks(seeds, levels):
+    """Which port blocks each target's firewall filters, one row per target"""
+    if np is not None:
+        chance = np.minimum(0.9, PORT_FILTER_PER_LEVEL * np.asarray(levels, dtype=float))
+        blocks = np.arange(PORT_BLOCKS, dtype=np.uint64)
+        return hash_unit(port_hash(np.asarray(seeds, dtype=np.uint64)[:, None], blocks[None, :])) < chance[:, None]
+    return [[hash_unit(port_hash(seed, block)) < min(0.9, PORT_FILTER_PER_LEVEL * level)
+             for block in range(PORT_BLOCKS)] for seed, level in zip(seeds, levels)]
+
+def port_states(target: Dict):
+    """State of all 65,536 ports of a target: PORT_CLOSED, PORT_OPEN or PORT_FILTERED.
+
+    Services listen on their ports whatever the firewall does; the rest of a filtered
+    block is filtered and everything else is closed.
+    """
+    seed = profile_seed(target)
+    blocks = filtered_blocks([seed], [target["security_level"]])[0]
+    if np is not None:
+        states = np.repeat(np.where(blocks, PORT_FILTERED, PORT_CLOSED).astype(np.uint8), 1 << PORT_BLOCK_BITS)
+    else:
+        states = bytearray(b"".join(bytes([PORT_FILTERED if blocked else PORT_CLOSED]) * (1 << PORT_BLOCK_BITS)
+                                    for blocked in blocks))
+    for port, _ in service_ports(target, seed):
+        states[port] = PORT_OPEN
+    return states
+
+def parse_ports(spec: str):
+    """Port mask (index = port number) for a spec like '1-1024,3306,8000-9000'"""
+    wanted = np.zeros(65536, dtype=bool) if np is not None else bytearray(65536)
+    for part in spec.split(","):
+        low, _, high = part.partition("-")
+        low = int(low)
+        high = int(high) if high else low
+        if not 1 <= low <= high <= 65535:
+            raise ValueError(part)
+        if np is not None:
+            wanted[low:high + 1] = True
+        else:
+            wanted[low:high + 1] = b"\x01" * (high + 1 - low)
+    return wanted
+
+def simulate_port_scan(targets: List[Dict], wanted) -> List[Dict]:
+    """Scan the ports in a mask (see parse_ports) on every target.
+
+    Port states come from port_states(), but the work is done per 256-port block and on
+    the few open ports, for all targets at once: filtered ports are counted as filtered
+    blocks times requested ports per block. Probes go out at the PC's network speed and
+    every filtered port is retried, so slow links and tight firewalls make scans slow.
+    Returns per target its open ports as (port, service, banner), the filtered and
+    closed counts and the scan time in seconds.
+    """
+    seeds = [profile_seed(target) for target in targets]
+    levels = [target["security_level"] for target in targets]
+    services = [service_ports(target, seed) for target, seed in zip(targets, seeds)]
+    blocks = filtered_blocks(seeds, levels)
+    bandwidth = game_state.pc["network"]["speed"] * 1e6 / 8  # bytes per second
+    
+    if np is not None:
+        per_block = np.bincount(np.flatnonzero(wanted) >> PORT_BLOCK_BITS, minlength=PORT_BLOCKS)
+        requested = int(per_block.sum())
+        filtered = blocks.astype(np.int64) @ per_block
+        hosts = np.repeat(np.arange(len(targets)), [len(ports) for ports in services])
+        ports = np.array([port for ports in services for port, _ in ports], dtype=np.int64)
+        scanned = wanted[ports]
+        # Open ports are not filtered, even inside a filtered block
+        filtered -= np.bincount(hosts[scanned & blocks[hosts, ports >> PORT_BLOCK_BITS]], minlength=len(targets))
+        opened = np.bincount(hosts[scanned], minlength=len(targets))
+        banner_hashes = port_hash(np.asarray(seeds, dtype=np.uint64)[hosts], ports.astype(np.uint64) + np.uint64(SALT_BANNER))
+        rtt = ((PORT_RTT_BASE + PORT_RTT_PER_LEVEL * np.asarray(levels, dtype=float))
+               * (0.5 + hash_unit(port_hash(np.asarray(seeds, dtype=np.uint64), SALT_RTT))))
+        seconds = ((requested + filtered * PORT_SCAN_RETRIES) * PORT_PROBE_BYTES / bandwidth
+                   + rtt * (1 + PORT_SCAN_TIMEOUT_RTTS * (filtered > 0)))
+        scanned, banner_hashes = scanned.tolist(), banner_hashes.tolist()
+        filtered, opened, seconds = filtered.tolist(), opened.tolist(), seconds.tolist()
+    else:
+        per_block = [0] * PORT_BLOCKS
+        for port in range(65536):
+            if wanted[port]:
+                per_block[port >> PORT_BLOCK_BITS] += 1
+        requested = sum(per_block)
+        scanned, banner_hashes, filtered, opened, seconds = [], [], [], [], []
+        for seed, level, ports, row in zip(seeds, levels, services, blocks):
+            count = sum(n for n, blocked in zip(per_block, row) if blocked)
+            hits = [bool(wanted[port]) for port, _ in ports]
+            count -= sum(1 for (port, _), hit in zip(ports, hits) if hit and row[port >> PORT_BLOCK_BITS])
+            scanned.extend(hits)
+            banner_hashes.extend(port_hash(seed, SALT_BANNER + port) for port, _ in ports)
+            rtt = (PORT_RTT_BASE + PORT_RTT_PER_LEVEL * level) * (0.5 + hash_unit(port_hash(seed, SALT_RTT)))
+            filtered.append(count)
+            opened.append(sum(hits))
+            seconds.append((requested + count * PORT_SCAN_RETRIES) * PORT_PROBE_BYTES / bandwidth
+                           + rtt * (1 + PORT_SCAN_TIMEOUT_RTTS * (count > 0)))
+    
+    results = []
+    position = 0
+    for i, target in enumerate(targets):
+        open_ports = []
+        for port, service in services[i]:
+            if scanned[position]:
+                banners = SERVICE_BANNERS.get(service, GENERIC_BANNERS)
+                open_ports.append((port, service, banners[banner_hashes[position] % len(banners)]))
+            position += 1
+        results.append({
+            "target": target,
+            "open": open_ports,
+            "filtered": int(filtered[i]),
+            "closed": requested - opened[i] - int(filtered[i]),
+            "seconds": seconds[i]
+        })
+    return results
+
+def filtered_ranges(target: Dict, wanted) -> List[Tuple[int, int]]:
+    """Requested ports the target's firewall filters, as merged (first, last) ranges"""
+    states = port_states(target)
+    if np is not None:
+        mask = np.concatenate(([False], (states == PORT_FILTERED) & wanted, [False]))
+        edges = np.flatnonzero(mask[1:] != mask[:-1])
+        return [(int(first), int(end) - 1) for first, end in zip(edges[::2], edges[1::2])]
+    ranges = []
+    for port in range(65536):
+        if wanted[port] and states[port] == PORT_FILTERED:
+            if ranges and ranges[-1][1] == port - 1:
+                ranges[-1] = (ranges[-1][0], port)
+            else:
+                ranges.append((port, port))
+    return ranges
+
+# Network topology
+LOCALHOST, INTERNET = "localhost", "internet"
+
+def topology_seed(name: str) -> int:
+    """64-bit seed of a host or subnet name, the same in every game"""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+def subnet_of(target: Dict) -> str:
+    """The subnet a target sits in: its 'subnet' field, or else its /24"""
+    return target.get("subnet") or target["ip"].rpartition(".")[0] + ".0/24"
+
+class Topology:
+    """Subnets of the network targets and the cached shortest routes through them.
+
+    Every subnet sits behind a firewall. Its gateway (the least secure host) and hosts up
+    to TOPOLOGY_EXPOSED_LEVEL face the internet; the others can only be reached from inside
+    the subnet. Inside, hosts are split into zones of TOPOLOGY_ZONE_LEVELS security levels.
+    A zone's least secure host is its switch, linked to every host of the zone and to the
+    switches of the zones next to it. Routes may only pass through hosts the player has
+    compromised, so reaching a deep host means pivoting through a chain of footholds.
+
+    Routes are the lowest-latency paths, found with Dijkstra once per source and cached
+    as (distances, previous hops). Edges are never stored: a host's neighbours are looked
+    up in its subnet, and the internet's edges to exposed hosts are priced on demand, so
+    a search only visits the neighbourhoods of compromised hosts however large the world
+    is. Compromising or losing a host repairs the cached tables in place.
+    """
+    def __init__(self, targets: List[Dict]):
+        self.hosts = {}  # IP -> target
+        self.named = defaultdict(list)  # named subnet -> IPs
+        self.compromised = set()
+        for target in targets:
+            ip = target["ip"]
+            self.hosts[ip] = target
+            if target.get("subnet"):
+                self.named[target["subnet"]].append(ip)
+            if target.get("compromised"):
+                self.compromised.add(ip)
+        self.subnets = {}  # subnet -> (security levels, IPs), least secure first
+        self.wan = {}  # IP -> internet latency, for the hosts routed to so far
+        self.seeds = {}  # IP -> topology_seed(IP), for the hosts routed to so far
+        self.routes = {}  # source -> (distances in ms, previous hops)
+
+    def members(self, subnet: str) -> Tuple[List[int], List[str]]:
+        """Security levels and IPs of a subnet's hosts, least secure first, indexed on first use"""
+        members = self.subnets.get(subnet)
+        if members is None:
+            if subnet in self.named:
+                ips = self.named[subnet]
+            else:
+                # A /24 has at most 256 hosts, so probing them beats indexing the whole world
+                prefix = subnet[:-len("0/24")]
+                ips = [ip for ip in (prefix + str(i) for i in range(256))
+                       if ip in self.hosts and not self.hosts[ip].get("subnet")]
+            hosts = sorted((self.hosts[ip]["security_level"], ip) for ip in ips)
+            members = self.subnets[subnet] = ([level for level, _ in hosts], [ip for _, ip in hosts])
+        return members
+
+    def exposed(self, ip: str) -> bool:
+        """Whether a host accepts connections from the internet"""
+        target = self.hosts[ip]
+        return target["security_level"] <= TOPOLOGY_EXPOSED_LEVEL or self.members(subnet_of(target))[1][0] == ip
+
+    def wan_latency(self, ip: str) -> float:
+        """Latency between the internet and a host, in milliseconds"""
+        latency = self.wan.get(ip)
+        if latency is None:
+            low, high = TOPOLOGY_WAN_MS
+            latency = self.wan[ip] = (low + (high - low) * hash_unit(mix64(topology_seed(subnet_of(self.hosts[ip]))))
+                                      + TOPOLOGY_LAN_MS[1] * hash_unit(mix64(topology_seed(ip))))
+        return latency
+
+    def lan_latency(self, a: str, b: str) -> float:
+        """Latency between two hosts of a subnet, in milliseconds"""
+        seeds = self.seeds
+        if a not in seeds:
+            seeds[a] = topology_seed(a)
+        if b not in seeds:
+            seeds[b] = topology_seed(b)
+        low, high = TOPOLOGY_LAN_MS
+        return low + (high - low) * hash_unit(mix64(seeds[a] ^ seeds[b]))
+
+    @staticmethod
+    def zone(levels: List[int], level: int) -> Tuple[int, int]:
+        """Index range of the zone holding a security level in a subnet's sorted levels"""
+        low = (level - 1) // TOPOLOGY_ZONE_LEVELS * TOPOLOGY_ZONE_LEVELS
+        return bisect.bisect_right(levels, low), bisect.bisect_right(levels, low + TOPOLOGY_ZONE_LEVELS)
+
+    def neighbours(self, ip: str) -> List[str]:
+        """Hosts of the same subnet a host can connect to"""
+        target = self.hosts[ip]
+        levels, ips = self.members(subnet_of(target))
+        start, end = self.zone(levels, target["security_level"])
+        if ips[start] != ip:
+            return [ips[start]]
+        # A switch: its zone, the switch below (first of its zone) and the one above
+        links = ips[start + 1:end]
+        if start > 0:
+            links.append(ips[self.zone(levels, levels[start - 1])[0]])
+        if end < len(ips):
+            links.append(ips[end])
+        return links
+
+    def links(self, ip: str) -> List[Tuple[str, float]]:
+        """(node, latency) of every node that can connect to a host"""
+        links = [(other, self.lan_latency(ip, other)) for other in self.neighbours(ip)]
+        if self.exposed(ip):
+            links.append((INTERNET, self.wan_latency(ip)))
+        return links
+
+    def edges(self, node: str) -> List[Tuple[str, float]]:
+        """(node, latency) of every node a node can connect to"""
+        if node == LOCALHOST:
+            return [(INTERNET, 0.0)]
+        if node == INTERNET:
+            # Only exposed footholds; other exposed hosts are leaves priced in route()
+            return [(ip, self.wan_latency(ip)) for ip in self.compromised if self.exposed(ip)]
+        return ([(other, self.lan_latency(node, other)) for other in self.neighbours(node)]
+                + [(INTERNET, self.wan_latency(node))])
+
+    def relays(self, node: str, source: str) -> bool:
+        """Whether routes from source may pass through a node"""
+        return node == source or node == INTERNET or node in self.compromised
+
+    def table(self, source: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """Distances and previous hops of the routes from a source, computed on first use"""
+        table = self.routes.get(source)
+        if table is None:
+            table = self.routes[source] = ({source: 0.0}, {})
+            self._settle(source, table, [(0.0, source)])
+        return table
+
+    def _settle(self, source: str, table: Tuple[Dict, Dict], heap: List[Tuple[float, str]]) -> None:
+        """Run Dijkstra from the queued nodes until no distance in the table can improve"""
+        dist, previous = table
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > dist.get(node, math.inf) or not self.relays(node, source):
+                continue
+            for neighbour, latency in self.edges(node):
+                if distance + latency < dist.get(neighbour, math.inf):
+                    dist[neighbour] = distance + latency
+                    previous[neighbour] = node
+                    heapq.heappush(heap, (distance + latency, neighbour))
+
+    def route(self, ip: str, source: str = LOCALHOST) -> Optional[List[Tuple[str, float]]]:
+        """Hops from source to a host as (node, latency so far in ms), or None without a route"""
+        dist, previous = self.table(source)
+        if ip == source:
+            return []
+        best, hop = dist.get(ip, math.inf), previous.get(ip)
+        if INTERNET in dist and ip in self.hosts and self.exposed(ip):
+            direct = dist[INTERNET] + self.wan_latency(ip)
+            if direct < best:
+                best, hop = direct, INTERNET
+        if best == math.inf:
+            return None
+        hops = [(ip, best)]
+        while hop != source:
+            hops.append((hop, dist[hop]))
+            hop = previous[hop]
+        return hops[::-1]
+
+    def compromise(self, ip: str) -> None:
+        """Make a host a foothold and extend the cached routes through it"""
+        if ip in self.compromised:
+            return
+        self.compromised.add(ip)
+        for source, table in self.routes.items():
+            hops = self.route(ip, source)
+            if not hops:
+                continue
+            dist, previous = table
+            dist[ip] = hops[-1][1]
+            previous[ip] = hops[-2][0] if len(hops) > 1 else source
+            self._settle(source, table, [(dist[ip], ip)])
+
+    def lose(self, ip: str) -> None:
+        """Drop a foothold and reroute the cached routes that went through it"""
+        if ip not in self.compromised:
+            return
+        self.compromised.discard(ip)
+        self.routes.pop(ip, None)
+        for source in list(self.routes):
+            self._repair(source, ip)
+
+    def _repair(self, source: str, lost: str) -> None:
+        """Recompute the part of a source's table that was reached through a lost foothold"""
+        dist, previous = table = self.routes[source]
+        below = defaultdict(list)
+        for node, hop in previous.items():
+            below[hop].append(node)
+        stale, stack = set(), list(below[lost])
+        while stack:
+            node = stack.pop()
+            stale.add(node)
+            stack.extend(below[node])
+        if INTERNET in stale:
+            # Everything hangs off the internet; rebuilding is as cheap as repairing
+            del self.routes[source]
+            return
+        for node in stale:
+            del dist[node], previous[node]
+        # Re-enter the stale nodes from the nodes that kept their routes, then let
+        # Dijkstra propagate the new distances among them
+        heap = []
+        for node in stale:
+            for other, latency in self.links(node):
+                if (other not in stale and other in dist and self.relays(other, source)
+                        and dist[other] + latency < dist.get(node, math.inf)):
+                    dist[node] = dist[other] + latency
+                    previous[node] = other
+            if node in dist:
+                heap.append((dist[node], node))
+        heapq.heapify(heap)
+        self._settle(source, table, heap)
+
+    def pivot_path(self, ip: str) -> List[str]:
+        """Lowest-latency chain of hosts from the internet into a host, compromised or not"""
+        levels, ips = self.members(subnet_of(self.hosts[ip]))
+        dist = {other: self.wan_latency(other) for other in ips if self.exposed(other)}
+        previous = {}
+        heap = [(distance, other) for other, distance in dist.items()]
+        heapq.heapify(heap)
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node == ip:
+                break
+            if distance > dist[node]:
+                continue
+            for other in self.neighbours(node):
+                latency = distance + self.lan_latency(node, other)
+                if latency < dist.get(other, math.inf):
+                    dist[other] = latency
+                    previous[other] = node
+                    heapq.heappush(heap, (latency, other))
+        path = [ip]
+        while path[-1] in previous:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+def get_topology() -> Topology:
+    """The network topology; targets never move, so it is only rebuilt when the target list changes"""
+    return game_state.derived.get("topology", ("targets",), lambda: Topology(game_state.network_targets))
+
+def route_to(ip: str) -> Optional[List[Tuple[str, float]]]:
+    """Hops from the player's machine to a host, or None if no foothold leads to it"""
+    return get_topology().route(ip)
+
+def next_pivot(target: Dict) -> Optional[Dict]:
+    """The next host to break into on the way to a target, or None if it can be reached"""
+    topology = get_topology()
+    if topology.route(target["ip"]) is not None:
+        return None
+    return next(topology.hosts[ip] for ip in topology.pivot_path(target["ip"]) if ip not in topology.compromised)
+
+def compromise_host(target: Dict) -> None:
+    """Keep a foothold on a hacked host so routes can pivot through it"""
+    if not target.get("compromised"):
+        target["compromised"] = True
+        target_changed(target)
+        get_topology().compromise(target["ip"])
+
+def lose_host(target: Dict) -> None:
+    """Give up the foothold on a host, rerouting everything that went through it"""
+    target["compromised"] = False
+    target_changed(target)
+    get_topology().lose(target["ip"])
+    add_to_history(f"Lost foothold on {target['ip']}", Fore.RED)
+
+def burn_footholds(hops: List[Tuple[str, float]]) -> None:
+    """After a failed hack, the pivots it went through may be discovered and cleaned up"""
+    for node, _ in hops:
+        target = get_topology().hosts.get(node)
+        if target and target.get("compromised") and random.random() < TOPOLOGY_BURN_CHANCE:
+            lose_host(target)
+            print(Fore.RED + f"Your foothold on {target['name']} ({node}) was detected and closed.")
+
+def record_scan(target: Dict) -> Dict:
+    """Scan result of a target as the player sees it now, stored in the scan cache"""
+    visible = game_state.player["skills"]["network"] >= max(1, target["security_level"] - 2)
+    result = {
+        "time": time.time(),
+        "ports": [[port, service] for port, service in service_ports(target)],
+        "vulnerabilities": list(target.get("vulnerabilities", [])) if visible else None,
+        "credentials": target["credentials"]["user"] if visible and "credentials" in target else None,
+        "skill": int(game_state.player["skills"]["network"]),
+        "version": game_state.derived.versions[("target", target["ip"])]
+    }
+    game_state.scan_cache[target["ip"]] = result
+    return result
 
-Government:
-- FBI operation "Python" is monitoring known hackers
-- Agent DiPierro showing concerning pattern recognition skills
-- NSA data collection poses minimal risk due to implemented countermeasures
+def get_cached_scan(target: Optional[Dict], ttl: float = SCAN_CACHE_TTL) -> Optional[Dict]:
+    """The cached scan of a target, unless it is older than ttl or the target or network skill changed"""
+    result = game_state.scan_cache.get(target["ip"]) if target else None
+    if (result is None or time.time() - result["time"] > ttl
+            or result["skill"] != int(game_state.player["skills"]["network"])
+            or result["version"] != game_state.derived.versions[("target", target["ip"])]):
+        return None
+    return result
 
-FSociety:
-- Five/Nine attack preparations proceeding as expected
-- Key members showing expected psychological patterns
-- Potential for successful operation: 78%
-        """)
-    
-    elif choice.lower() == "back":
+def format_duration(seconds: float) -> str:
+    """format_time, with sub-minute durations to the hundredth of a second"""
+    return f"{seconds:.2f}s" if seconds < 60 else format_time(int(seconds))
+
+def port_scan_targets(spec: str, ips: List[str], usage: str) -> Optional[Tuple[Any, List[Dict]]]:
+    """Parse the ports and hosts of a port scan; None (after printing why) if nothing can be scanned"""
+    try:
+        wanted = parse_ports(spec)
+    except ValueError:
+        print(Fore.RED + f"Error: invalid port range: {spec or '(none)'}")
+        print(usage)
+        return None
+    if not ips:
+        print(Fore.RED + "Error: no IP address provided")
+        print(usage)
+        return None
+    
+    targets = []
+    for ip in ips:
+        target = get_target_by_ip(ip)
+        if not target:
+            print(Fore.RED + f"{ip}: no response from host. This IP appears to be offline or firewalled.")
+        elif route_to(ip) is None:
+            print(Fore.RED + f"{ip}: no route to host behind the {subnet_of(target)} firewall (see 'route {ip}').")
+        else:
+            targets.append(target)
+    return (wanted, targets) if targets else None
+
+def run_port_scan(spec: str, ips: List[str]) -> None:
+    """scan -p: port-level scan of one or more hosts"""
+    parsed = port_scan_targets(spec, ips, "Usage: scan -p <ports> <ip> [ip ...]")
+    if parsed is None:
         return
+    wanted, targets = parsed
+    results = simulate_port_scan(targets, wanted)
+    seconds = sum(result["seconds"] for result in results)
+    ports = results[0]["closed"] + results[0]["filtered"] + len(results[0]["open"])
+    print(Fore.YELLOW + f"Scanning {ports:,} ports on {len(targets)} host{'s' if len(targets) != 1 else ''} "
+          f"over {game_state.pc['network']['name']} ({game_state.pc['network']['speed']:g} Mbps)...")
+    print(f"Estimated time: {format_duration(seconds)}")
+    
+    wait_with_progress(f"port scan {ips[0]}", min(seconds / game_state.time_acceleration, PORT_SCAN_MAX_WAIT))
+    report_port_scan(results, wanted)
+
+def wait_with_progress(label: str, wait: float, steps: int = 20) -> None:
+    """Wait with a progress bar, drawn in place on the dashboard when split-screen mode is on"""
+    op_id = dashboard.start_operation(label) if dashboard.active else None
+    for i in range(steps):
+        pause(wait / steps)
+        if op_id is not None:
+            dashboard.update_operation(op_id, (i + 1) / steps)
+            continue
+        progress = i + 1
+        print(f"\r[{'█' * progress}{' ' * (steps - progress)}] {progress / steps * 100:.1f}%", end="")
+    if op_id is not None:
+        dashboard.finish_operation(op_id)
     else:
-        print(Fore.RED + "Invalid option.")
+        print()
+
+def report_port_scan(results: List[Dict], wanted) -> None:
+    """Print the results of a port scan, and discover and train on the scanned hosts"""
+    for result in results:
+        target = result["target"]
+        if discover_ip(target["ip"]):
+            add_to_history(f"Discovered new target: {target['name']} ({target['ip']})", Fore.GREEN)
+        print(Fore.GREEN + f"\n{target['name']} ({target['ip']}): {len(result['open'])} open, "
+              f"{result['filtered']:,} filtered, {result['closed']:,} closed in {format_duration(result['seconds'])}")
+        for port, service, banner in result["open"]:
+            print(f"  {port:>5}/tcp  open  {service:<20}{banner}")
+        if result["filtered"]:
+            ranges = filtered_ranges(target, wanted)
+            shown = ", ".join(f"{first}-{last}" if first != last else str(first)
+                              for first, last in ranges[:PORT_SCAN_RANGES_SHOWN])
+            more = len(ranges) - PORT_SCAN_RANGES_SHOWN
+            print(f"  filtered: {shown}" + (f" (+{more} more ranges)" if more > 0 else ""))
+        emit_event("scan", target["ip"])
     
-    # Return to the Dark Army main menu
-    input(Fore.CYAN + "\nPress Enter to return to main menu...")
-    display_dark_army()
+    if skill_level_up_check("network"):
+        new_level = int(game_state.player["skills"]["network"])
+        print(Fore.CYAN + f"\nSkill level up! Your network skills improved to level {new_level}!")
 
 def cmd_scan(args: str) -> None:
     """Scan an IP address"""
-    target_ip = args.strip()
-    if not target_ip:
+    parts = args.split()
+    if "-p" in parts:
+        index = parts.index("-p")
+        run_port_scan(parts[index + 1] if index + 1 < len(parts) else "", parts[:index] + parts[index + 2:])
+        return
+    fresh = "--fresh" in parts
+    parts = [part for part in parts if part != "--fresh"]
+    if not parts:
         print(Fore.RED + "Error: no IP address provided")
-        print("Usage: scan <ip>")
+        print("Usage: scan [--fresh] <ip>")
         return
+    target_ip = parts[0]
     
     # Get the target information
     target = get_target_by_ip(target_ip)
     
     if not target:
         print(Fore.YELLOW + f"Scanning {target_ip}...")
-        time.sleep(1)
+        pause(1)
         print(Fore.RED + "No response from host. This IP appears to be offline or firewalled.")
         return
     
-    print(Fore.YELLOW + f"Scanning {target_ip}...")
-    
-    # Simulate scanning progress
-    time.sleep(1)
-    print("Port scanning in progress...")
-    time.sleep(0.5)
-    print("Service detection running...")
-    time.sleep(0.5)
-    print("OS fingerprinting...")
-    time.sleep(0.5)
-    print("Vulnerability scanning...")
-    time.sleep(1)
-    
-    # Mark the target as discovered
-    is_new = discover_ip(target_ip)
+    if route_to(target_ip) is None:
+        print(Fore.YELLOW + f"Scanning {target_ip}...")
+        pause(1)
+        print(Fore.RED + f"No response from host. It sits behind the {subnet_of(target)} firewall.")
+        print(f"Use 'route {target_ip}' to see which hosts to compromise first.")
+        return
     
-    if is_new:
-        add_to_history(f"Discovered new target: {target['name']} ({target_ip})", Fore.GREEN)
+    result = None if fresh else get_cached_scan(target)
+    scanned = result is None
+    if scanned:
+        print(Fore.YELLOW + f"Scanning {target_ip}...")
+        
+        # Simulate scanning progress
+        op_id = dashboard.start_operation(f"scan {target_ip}") if dashboard.active else None
+        pause(1)
+        for i, (phase, delay) in enumerate(SCAN_PHASES, 1):
+            if op_id is not None:
+                dashboard.update_operation(op_id, (i - 1) / len(SCAN_PHASES), f"scan {target_ip}: {phase}")
+            else:
+                print(phase)
+            pause(delay)
+        if op_id is not None:
+            dashboard.finish_operation(op_id)
+        
+        # Mark the target as discovered
+        is_new = discover_ip(target_ip)
+        
+        if is_new:
+            add_to_history(f"Discovered new target: {target['name']} ({target_ip})", Fore.GREEN)
+        result = record_scan(target)
+        print(Fore.GREEN + "\nScan Results:")
+    else:
+        age = format_time(int(time.time() - result["time"]))
+        print(Fore.GREEN + f"Scan Results (cached {age} ago; 'scan --fresh {target_ip}' rescans):")
     
     # Display scan results
-    print(Fore.GREEN + "\nScan Results:")
     print(f"Target: {target['name']} ({target_ip})")
     print(f"Status: Online")
     
     # Show open ports/services
     print("\nOpen Ports:")
-    for service in target["services"]:
-        port = None
-        if service == "http":
-            port = 80
-        elif service == "https":
-            port = 443
-        elif service == "ssh":
-            port = 22
-        elif service == "ftp":
-            port = 21
-        elif service == "smtp":
-            port = 25
-        elif service == "mysql":
-            port = 3306
-        elif service == "vpn":
-            port = 1194
-        elif service == "hvac":
-            port = 8080
-        elif service == "radius":
-            port = 1812
-        elif service == "building_management":
-            port = 9090
-        
-        if port:
-            print(f"  {port}/tcp - {service}")
-        else:
-            print(f"  unknown - {service}")
-    
-    # Only show vulnerabilities if security skill is high enough
-    security_level = target["security_level"]
-    security_skill_needed = max(1, security_level - 2)
+    for port, service in result["ports"]:
+        print(f"  {port}/tcp - {service}")
     
-    if game_state.player["skills"]["network"] >= security_skill_needed:
+    # Vulnerabilities are only found with enough network skill
+    if result["vulnerabilities"] is not None:
         print("\nPotential Vulnerabilities:")
-        for vuln in target.get("vulnerabilities", []):
+        for vuln in result["vulnerabilities"]:
             print(f"  - {vuln}")
+        if result["credentials"]:
+            print(f"\nPassword hash leaked for '{result['credentials']}' (salted SHA-256). Try 'bruteforce {target['ip']}'.")
     else:
         print("\nVulnerability scan inconclusive. Need higher network skills.")
     
@@ -2310,10 +5955,137 @@ def cmd_scan(args: str) -> None:
     if "description" in target:
         print(f"\nAdditional Info: {target['description']}")
     
-    # Improve network skill
-    if skill_level_up_check("network"):
+    # Improve network skill; showing a cached result does not train it
+    if scanned and skill_level_up_check("network"):
         new_level = int(game_state.player["skills"]["network"])
         print(Fore.CYAN + f"\nSkill level up! Your network skills improved to level {new_level}!")
+    
+    emit_event("scan", target_ip)
+
+def cmd_route(args: str) -> None:
+    """Show the hop path to a host, or the footholds to pivot through"""
+    parts = args.split()
+    usage = "Usage: route <ip> [from <ip>]"
+    topology = get_topology()
+    if not parts:
+        if not topology.compromised:
+            print(Fore.YELLOW + "No footholds yet. Every host you hack becomes one to pivot through.")
+            print(usage)
+            return
+        print(Fore.GREEN + "Footholds:")
+        for ip in sorted(topology.compromised):
+            target = topology.hosts[ip]
+            print(f"  {ip:<16}{target['name'][:30]:<32}{subnet_of(target)}")
+        return
+    if len(parts) not in (1, 3) or (len(parts) == 3 and parts[1].lower() != "from"):
+        print(Fore.RED + usage)
+        return
+    
+    target_ip = parts[0]
+    source = parts[2] if len(parts) == 3 else LOCALHOST
+    target = topology.hosts.get(target_ip)
+    if not target:
+        print(Fore.RED + f"Error: IP {target_ip} not found in database.")
+        return
+    if source != LOCALHOST and source not in topology.compromised:
+        print(Fore.RED + f"Error: {source} is not one of your footholds.")
+        return
+    
+    hops = topology.route(target_ip, source)
+    if hops is None:
+        path = topology.pivot_path(target_ip)
+        pivot = next(ip for ip in path if ip not in topology.compromised)
+        print(Fore.RED + f"No route to {target['name']} ({target_ip}): it sits behind the {subnet_of(target)} firewall.")
+        print("Way in: " + " -> ".join(path))
+        print(f"Compromise {pivot} ({topology.hosts[pivot]['name']}) next.")
+        return
+    
+    # Routes from the player's machine start with its own link to the internet
+    uplink = TOPOLOGY_UPLINK_MS[game_state.pc["network"]["level"] - 1] if source == LOCALHOST else 0
+    print(Fore.GREEN + f"Route to {target['name']} ({target_ip}) from {source}: "
+          f"{len(hops)} hop{'s' if len(hops) != 1 else ''}, {uplink + (hops[-1][1] if hops else 0):.1f} ms")
+    for number, (node, latency) in enumerate(hops, 1):
+        host = topology.hosts.get(node)
+        name = host["name"][:30] if host else ""
+        role = "pivot" if node in topology.compromised and node != target_ip else ""
+        print(f"  {number:>2}  {node:<16}{name:<32}{uplink + latency:>8.1f} ms  {role}".rstrip())
+
+def cmd_recommend(args: str) -> None:
+    """Rank discovered targets by what hacking them brings per minute"""
+    count = args.strip()
+    if count and (not count.isdigit() or int(count) < 1):
+        print(Fore.RED + "Usage: recommend [count]  (count of at least 1)")
+        return
+    ranked = recommend_targets(int(count) if count else RECOMMEND_ROWS)
+    if not ranked:
+        print(Fore.YELLOW + "No targets to recommend. Scan the network to discover more.")
+        return
+    
+    mission_target = None
+    if game_state.player["current_mission"]:
+        mission = get_mission_by_id(game_state.player["current_mission"])
+        mission_target = mission["target"] if mission else None
+    print(Fore.YELLOW + "Recommended targets (expected mBTC per minute from mission steps and championship tasks):")
+    print(Fore.WHITE + f"  {'#':>3}  {'IP':<16}{'Name':<26}{'Sec':>4}{'Chance':>8}{'Time':>9}"
+          + "".join(f"{hack_type:>12}" for hack_type in RECOMMEND_HACK_TYPES) + "  Gains")
+    for rank, (target, chance, seconds, rates, gains) in enumerate(ranked, 1):
+        on_mission = target["ip"] == mission_target
+        line = (f"  {rank:>3} {'*' if on_mission else ' '}{target['ip']:<16}{target['name'][:25]:<26}"
+                f"{target['security_level']:>4}{chance:>8.0%}{format_time(int(seconds)):>9}")
+        for hack_type in RECOMMEND_HACK_TYPES:
+            line += f"{rates[hack_type] * 1000:>12.3f}" if hack_type in rates else f"{'-':>12}"
+        print((Fore.CYAN if on_mission else Fore.GREEN) + line + "  " + ", ".join(gains))
+    if any(target["ip"] == mission_target for target, *_ in ranked):
+        print(Fore.CYAN + "\n* Target of your current mission.")
+    print(Fore.WHITE + "Hacks only pay through objectives; elsewhere they leave a foothold to pivot through and add to your botnet.")
+
+def cmd_plan(args: str) -> None:
+    """Plan the best upgrades for a budget"""
+    parts = args.split()
+    usage = "Usage: plan upgrades [budget] | plan target <ip> [budget]"
+    if not parts or parts[0].lower() not in ("upgrades", "target"):
+        print(Fore.RED + usage)
+        return
+    
+    target = None
+    if parts[0].lower() == "target":
+        if len(parts) < 2:
+            print(Fore.RED + usage)
+            return
+        target = get_target_by_ip(parts[1])
+        if not target or not target["discovered"]:
+            print(Fore.RED + f"Error: Target {parts[1]} not recognized. Scan it first.")
+            return
+    budget_text = parts[2 if target else 1] if len(parts) > (2 if target else 1) else None
+    try:
+        budget = float(budget_text) if budget_text else game_state.player["bitcoin"]
+    except ValueError:
+        print(Fore.RED + f"Error: budget must be an amount of BTC, e.g. 0.05")
+        return
+    
+    plan = plan_upgrades(budget, target)
+    purchases = [(category, level) for category, level in plan["levels"].items() if level > game_state.pc[category]["level"]]
+    print(Fore.YELLOW + f"Upgrade plan for a budget of {format_btc(budget)}:")
+    if not purchases:
+        print("  Nothing within the budget improves on your current PC.")
+        return
+    
+    for category, level in purchases:
+        names = {upgrade["level"]: upgrade for upgrade in game_state.upgrades[category]}
+        cost = sum(names[l]["cost"] for l in range(game_state.pc[category]["level"] + 1, level + 1))
+        change = f"{game_state.pc[category]['name']} -> {names[level]['name']} (level {level})"
+        print(f"  {category:<9}{change:<52}{format_btc(cost):>16}")
+    power = get_pc_power_level()
+    print(Fore.GREEN + f"\nTotal: {format_btc(plan['cost'])}   Power level: {power:.2f} -> {plan['power']:.2f} "
+          f"({(plan['power'] - power) / plan['cost'] / 1000 if plan['cost'] else 0:.2f} per mBTC)")
+    if target:
+        difficulty = get_difficulty_level(target)
+        now = get_time_for_hack(difficulty) / get_success_chance(target)
+        print(Fore.GREEN + f"Expected time to hack {target['name']}: "
+              f"{format_time(int(now))} -> {format_time(int(plan['score']))}")
+    steps = [f"upgrade {category} {level}" for category, top in purchases
+             for level in range(game_state.pc[category]["level"] + 1, top + 1)]
+    print(Fore.CYAN + "Buy in order: " + ", ".join(steps))
 
 def cmd_hack(args: str) -> None:
     """Hack a target system"""
@@ -2339,13 +6111,95 @@ def cmd_hack(args: str) -> None:
     # Perform the hack
     perform_hack(target_ip, "hack")
 
+def open_wordlist(wordlist_path: str) -> Optional[Tuple[str, str]]:
+    """Resolved path and content of a wordlist file, or None (after an error) if there is none"""
+    resolved = resolve_path(wordlist_path)
+    node = get_file_node(resolved) if resolved else None
+    if node is None or node["type"] != "file":
+        print(Fore.RED + f"Error: wordlist not found: {wordlist_path}")
+        return None
+    return resolved, node["content"]
+
+def crack_password(target: Dict, wordlist_path: str) -> Optional[bool]:
+    """Run a wordlist and mangling rules attack on a target's password hash.
+
+    Returns True when the password is found, False when the candidates run out and
+    None when the attack could not start.
+    """
+    wordlist = open_wordlist(wordlist_path)
+    if wordlist is None:
+        return None
+    resolved, content = wordlist
+    
+    credentials = target["credentials"]
+    crypto = int(game_state.player["skills"]["crypto"])
+    tiers = max(1, min(len(CRACK_RULE_TIERS), crypto))
+    midstate = crypto >= CRACK_MIDSTATE_LEVEL
+    workers = host_worker_count(game_state.pc["cpu"]["cores"])
+    total_words = sum(1 for _ in stream_words(content))
+    per_word = rule_candidates(tiers)
+    
+    print(f"\n{Fore.YELLOW}Cracking {credentials['user']}@{target['ip']} (salted SHA-256)...")
+    print(f"Wordlist: {resolved} ({total_words:,} words x {per_word} variants = {total_words * per_word:,} candidates)")
+    print(f"Rule tiers: {tiers}/{len(CRACK_RULE_TIERS)}   Engine: {'salted midstate' if midstate else 'basic'}   Workers: {workers}")
+    
+    pool = get_worker_pool()
+    salt = bytes.fromhex(credentials["salt"])
+    digest = bytes.fromhex(credentials["hash"])
+    words = stream_words(content)
+    in_flight = {}  # future -> words in its chunk
+    found = None
+    tried = 0
+    words_done = 0
+    began = time.perf_counter()
+    op_id = dashboard.start_operation(f"crack {target['ip']}") if dashboard.active else None
+    while found is None:
+        # Keep two chunks per worker queued so no worker waits for the next one
+        while len(in_flight) < workers * 2:
+            chunk = list(itertools.islice(words, CRACK_CHUNK_WORDS))
+            if not chunk:
+                break
+            in_flight[pool.submit(crack_chunk, chunk, tiers, salt, digest, midstate)] = len(chunk)
+        if not in_flight:
+            break
+        done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            words_done += in_flight.pop(future)
+            password, count, _ = future.result()
+            tried += count
+            found = found or password
+        fraction = words_done / total_words if total_words else 1.0
+        if op_id is not None:
+            dashboard.update_operation(op_id, fraction)
+        else:
+            progress = int(fraction * 20)
+            print(f"\r[{'█' * progress}{' ' * (20 - progress)}] {fraction * 100:.1f}%", end="")
+            # Nothing here pauses, so push the bar past the renderer's buffer by hand
+            sys.stdout.flush()
+    for future in in_flight:
+        future.cancel()
+    if op_id is not None:
+        dashboard.finish_operation(op_id)
+    else:
+        print()
+    
+    elapsed = max(time.perf_counter() - began, 1e-9)
+    print(f"Tried {tried:,} candidates in {elapsed:.2f}s ({tried / elapsed:,.0f} candidates/sec)")
+    if found is not None:
+        print(Fore.GREEN + f"Password found: {credentials['user']}:{found}")
+        return True
+    print(Fore.YELLOW + "Password not found. Better crypto skills unlock more mangling rules.")
+    return False
+
 def cmd_bruteforce(args: str) -> None:
     """Bruteforce attack on a target"""
-    target_ip = args.strip()
-    if not target_ip:
+    parts = args.split()
+    if not parts:
         print(Fore.RED + "Error: no IP address provided")
-        print("Usage: bruteforce <ip>")
+        print("Usage: bruteforce <ip> [wordlist]")
         return
+    target_ip = parts[0]
+    wordlist = parts[1] if len(parts) > 1 else DEFAULT_WORDLIST
     
     # Get the target information
     target = get_target_by_ip(target_ip)
@@ -2360,8 +6214,318 @@ def cmd_bruteforce(args: str) -> None:
         print(Fore.RED + f"Error: Target {target_ip} not recognized. Scan it first.")
         return
     
-    # Perform the bruteforce attack
-    perform_hack(target_ip, "bruteforce")
+    # Targets without a password weakness fall back to a generic attack
+    if "credentials" not in target:
+        perform_hack(target_ip, "bruteforce")
+        return
+    
+    cracked = crack_password(target, wordlist)
+    if cracked is not None:
+        game_state.stats["hacks_attempted"] += 1
+        finish_hack(target, "bruteforce", cracked)
+
+# Botnet
+BOTNET_JOB_KINDS = ("crack", "mine", "scan")
+
+class Bot:
+    """A machine working on the player's jobs: a compromised host, or the player's own PC"""
+    __slots__ = ("ip", "name", "cores", "ghz", "mbps", "share")
+
+    def __init__(self, ip: str, name: str, cores: int, ghz: float, mbps: float, share: float):
+        self.ip = ip
+        self.name = name
+        self.cores = cores
+        self.ghz = ghz
+        self.mbps = mbps
+        self.share = share
+
+    def rate(self, kind: str) -> float:
+        """Work units per second on a kind of job: candidates, hashes or bytes on the wire"""
+        if kind == "scan":
+            return self.mbps * 1e6 / 8 * self.share
+        per_ghz = BOTNET_CANDIDATES_PER_GHZ if kind == "crack" else BOTNET_HASHES_PER_GHZ
+        return self.cores * self.ghz * per_ghz * self.share
+
+def bot_profile(target: Dict) -> Bot:
+    """The hardware of a compromised host, derived from its profile so it is the same in every game"""
+    seed = profile_seed(target)
+    level = target["security_level"]
+    cores = max(1, level // 2) << (port_hash(seed, SALT_BOT) % 3)
+    ghz = 1.5 + 2.5 * hash_unit(port_hash(seed, SALT_BOT + 1))
+    mbps = 10 ** (1 + level / 3 + hash_unit(port_hash(seed, SALT_BOT + 2)))
+    return Bot(target["ip"], target["name"], cores, round(ghz, 1), mbps, BOTNET_CPU_SHARE)
+
+def get_bots() -> Tuple[List[Bot], List[Dict]]:
+    """The player's PC followed by every reachable foothold, and the footholds cut off from the player"""
+    pc = game_state.pc
+    bots = [Bot(LOCALHOST, f"Your PC ({pc['cpu']['name']})", pc["cpu"]["cores"], pc["cpu"]["speed"],
+                pc["network"]["speed"], 1.0)]
+    unreachable = []
+    topology = get_topology()
+    for ip in sorted(topology.compromised):
+        if topology.route(ip) is None:
+            unreachable.append(topology.hosts[ip])
+        else:
+            bots.append(bot_profile(topology.hosts[ip]))
+    return bots, unreachable
+
+def schedule_chunks(rates: List[float], chunks: List[Tuple[float, Any]], execute=None, rng=random) -> Dict:
+    """Run a job's chunks on bots with the given rates, in simulated time, with work stealing.
+
+    Chunks are (work units, payload) and are dealt out in contiguous runs in proportion
+    to the bots' rates. A bot works through its own deque from the front; once it is
+    empty it steals from the back of the deque whose owner will finish last, but only a
+    chunk it would finish before the owner could get to it, so fast bots take over the
+    work of slow ones and a slow bot never holds up the end of a job. Owners' finishing
+    times never move later, so a bot that finds nothing worth stealing stays idle until
+    another bot drops out.
+
+    Every bot but the first (the player's PC) may drop out after an exponentially
+    distributed time; the chunk it was on goes back to its deque for the others to
+    steal. execute(bot, payload) is called as each chunk finishes and ends the job early
+    by returning True.
+    Returns the simulated seconds, the work, chunks and busy time per bot, the number
+    of steals and of chunks reclaimed from dropped bots, and the bots that dropped out.
+    """
+    count = len(rates)
+    queues = [deque() for _ in range(count)]
+    queued = [0.0] * count  # work units waiting in each deque
+    total, dealt, cumulative = sum(rates), 0, 0.0
+    for bot, rate in enumerate(rates):
+        cumulative += rate
+        end = len(chunks) if bot == count - 1 else round(len(chunks) * cumulative / total)
+        queues[bot].extend(chunks[dealt:end])
+        queued[bot] = sum(units for units, _ in chunks[dealt:end])
+        dealt = end
+    hazard = BOTNET_DROPOUTS_PER_HOUR / 3600
+    drop_at = [math.inf] + [rng.expovariate(hazard) if hazard > 0 else math.inf for _ in range(count - 1)]
+    stats = {"seconds": 0.0, "units": [0.0] * count, "chunks": [0] * count, "busy": [0.0] * count,
+             "steals": 0, "reclaimed": 0, "dropped": [], "stopped": False}
+    events = []  # (finish or dropout time, bot, chunk, start time, drops out) per busy bot
+    free_at = [0.0] * count  # when each bot is done with its current chunk; never for dropped bots
+    idle = []
+
+    def start(bot: int, now: float) -> None:
+        if queues[bot]:
+            owner = bot
+        else:
+            owner = max((other for other in range(count) if queues[other]),
+                        key=lambda other: free_at[other] + queued[other] / rates[other], default=None)
+            if (owner is None or now + queues[owner][-1][0] / rates[bot]
+                    >= free_at[owner] + queued[owner] / rates[owner]):
+                idle.append(bot)
+                return
+            stats["steals"] += 1
+        chunk = queues[owner].popleft() if owner == bot else queues[owner].pop()
+        queued[owner] -= chunk[0]
+        finish = now + chunk[0] / rates[bot]
+        free_at[bot] = min(finish, drop_at[bot])
+        heapq.heappush(events, (free_at[bot], bot, chunk, now, finish > drop_at[bot]))
+
+    # Bots start on their own deques before any of them goes stealing
+    for bot in sorted(range(count), key=lambda bot: not queues[bot]):
+        start(bot, 0.0)
+    while events:
+        now, bot, chunk, began, drops = heapq.heappop(events)
+        stats["busy"][bot] += now - began
+        stats["seconds"] = now
+        if drops:
+            queues[bot].appendleft(chunk)
+            queued[bot] += chunk[0]
+            free_at[bot] = math.inf
+            stats["reclaimed"] += len(queues[bot])
+            stats["dropped"].append(bot)
+            waiting, idle[:] = idle[:], []
+            for other in waiting:
+                start(other, now)
+            continue
+        stats["units"][bot] += chunk[0]
+        stats["chunks"][bot] += 1
+        if execute is not None and execute(bot, chunk[1]):
+            stats["stopped"] = True
+            break
+        start(bot, now)
+    return stats
+
+def format_throughput(kind: str, per_second: float) -> str:
+    """A job kind's work units per second in the unit players know it by"""
+    if kind == "crack":
+        return f"{per_second / 1e6:,.1f}M candidates/s"
+    if kind == "mine":
+        return f"{per_second / 1e6:,.2f} MH/s"
+    return f"{per_second * 8 / 1e6:,.1f} Mbps"
+
+# Summary of the last job of each kind, for 'botnet status'
+botnet_jobs = {}
+
+def run_botnet_job(bots: List[Bot], kind: str, label: str, chunks: List[Tuple[float, Any]], execute=None) -> Dict:
+    """Run a job on the botnet, wait for it and report how the bots shared the work"""
+    rates = [bot.rate(kind) for bot in bots]
+    print(Fore.YELLOW + f"Dispatching {len(chunks):,} chunk{'s' if len(chunks) != 1 else ''} to {len(bots) - 1} bot{'s' if len(bots) != 2 else ''} and your PC...")
+    stats = schedule_chunks(rates, chunks, execute)
+    print(f"Estimated time: {format_duration(stats['seconds'])}")
+    wait_with_progress(label, min(stats["seconds"] / game_state.time_acceleration, BOTNET_MAX_WAIT))
+
+    seconds = stats["seconds"]
+    throughput = sum(stats["units"]) / seconds if seconds else 0.0
+    busy = sum(stats["busy"]) / (seconds * len(bots)) if seconds else 0.0
+    done = sum(stats["chunks"])
+    print(Fore.WHITE + f"{done:,} chunk{'s' if done != 1 else ''} done in {format_duration(seconds)} at {format_throughput(kind, throughput)}; "
+          f"{stats['steals']:,} stolen, bots busy {busy:.0%} of the time")
+    if stats["dropped"]:
+        print(Fore.YELLOW + f"{len(stats['dropped'])} bot{'s' if len(stats['dropped']) != 1 else ''} dropped out; "
+              f"{stats['reclaimed']} unfinished chunk{'s' if stats['reclaimed'] != 1 else ''} went to the others.")
+    for index in stats["dropped"]:
+        bot = bots[index]
+        if random.random() < BOTNET_RECLAIM_CHANCE:
+            lose_host(get_topology().hosts[bot.ip])
+            print(Fore.RED + f"{bot.name} ({bot.ip}) was cleaned up by its owner. The foothold is lost.")
+    botnet_jobs[kind] = {"chunks": sum(stats["chunks"]), "seconds": seconds, "throughput": throughput,
+                         "steals": stats["steals"], "dropped": len(stats["dropped"]), "busy": busy}
+    return stats
+
+def botnet_crack(parts: List[str]) -> None:
+    """botnet crack: split a wordlist attack on a leaked password hash across the botnet"""
+    if not parts:
+        print(Fore.RED + "Error: no IP address provided")
+        print("Usage: botnet crack <ip> [wordlist]")
+        return
+    target = get_target_by_ip(parts[0])
+    if not target or not target["discovered"]:
+        print(Fore.RED + f"Error: Target {parts[0]} not recognized. Scan it first.")
+        return
+    if "credentials" not in target:
+        print(Fore.RED + f"Error: no password hash has leaked from {parts[0]}.")
+        return
+    wordlist = open_wordlist(parts[1] if len(parts) > 1 else DEFAULT_WORDLIST)
+    if wordlist is None:
+        return
+    resolved, content = wordlist
+    bots, _ = get_bots()
+
+    credentials = target["credentials"]
+    crypto = int(game_state.player["skills"]["crypto"])
+    tiers = max(1, min(len(CRACK_RULE_TIERS), crypto))
+    midstate = crypto >= CRACK_MIDSTATE_LEVEL
+    words = list(stream_words(content))
+    per_word = rule_candidates(tiers)
+    chunks = [(len(words[i:i + CRACK_CHUNK_WORDS]) * per_word, words[i:i + CRACK_CHUNK_WORDS])
+              for i in range(0, len(words), CRACK_CHUNK_WORDS)]
+    print(f"\n{Fore.YELLOW}Cracking {credentials['user']}@{target['ip']} (salted SHA-256) on the botnet...")
+    print(f"Wordlist: {resolved} ({len(words):,} words x {per_word} variants = {len(words) * per_word:,} candidates)")
+
+    salt = bytes.fromhex(credentials["salt"])
+    digest = bytes.fromhex(credentials["hash"])
+    found = []
+    def execute(bot: int, chunk: List[str]) -> bool:
+        password, _, _ = crack_chunk(chunk, tiers, salt, digest, midstate)
+        if password is not None:
+            found.append((password, bots[bot]))
+        return password is not None
+    run_botnet_job(bots, "crack", f"botnet crack {target['ip']}", chunks, execute)
+
+    game_state.stats["hacks_attempted"] += 1
+    if found:
+        password, bot = found[0]
+        print(Fore.GREEN + f"Password found by {bot.name}: {credentials['user']}:{password}")
+    else:
+        print(Fore.YELLOW + "Password not found. Better crypto skills unlock more mangling rules.")
+    finish_hack(target, "bruteforce", bool(found))
+
+def botnet_mine(parts: List[str]) -> None:
+    """botnet mine: mine pool shares on every bot for some in-game minutes"""
+    try:
+        minutes = float(parts[0]) if parts else BOTNET_MINE_MAX_MINUTES
+    except ValueError:
+        minutes = 0
+    if not 0 < minutes <= BOTNET_MINE_MAX_MINUTES:
+        print(Fore.RED + f"Error: mining jobs last between 0 and {BOTNET_MINE_MAX_MINUTES} minutes")
+        print("Usage: botnet mine [minutes]")
+        return
+    bots, _ = get_bots()
+    hashes = sum(bot.rate("mine") for bot in bots) * minutes * 60
+    count = len(bots) * BOTNET_CHUNKS_PER_BOT
+    chunks = [(hashes / count, hashes / count)] * count
+    print(Fore.YELLOW + f"Mining on the botnet for {minutes:g} minutes (~{2 ** MINING_SHARE_BITS:,} hashes per share)...")
+
+    shares = [0]
+    def execute(bot: int, chunk_hashes: float) -> bool:
+        shares[0] += poisson(chunk_hashes / 2 ** MINING_SHARE_BITS)
+        return False
+    run_botnet_job(bots, "mine", "botnet mine", chunks, execute)
+
+    reward = shares[0] * MINING_SHARE_REWARD
+    game_state.player["bitcoin"] += reward
+    game_state.stats["bitcoins_earned"] += reward
+    print(Fore.GREEN + f"The pool paid {format_btc(reward)} for {shares[0]:,} shares.")
+    add_to_history(f"Botnet mining paid {format_btc(reward)} for {shares[0]} shares", Fore.GREEN)
+
+def botnet_scan(parts: List[str]) -> None:
+    """botnet scan: port scan of many hosts, spread over the bots' network links"""
+    usage = "Usage: botnet scan <ports> <ip> [ip ...]"
+    parsed = port_scan_targets(parts[0] if parts else "", parts[1:], usage)
+    if parsed is None:
+        return
+    wanted, targets = parsed
+    bots, _ = get_bots()
+    results = simulate_port_scan(targets, wanted)
+
+    # Every requested port is probed once and every filtered one retried
+    for result in results:
+        requested = result["closed"] + result["filtered"] + len(result["open"])
+        result["bytes"] = (requested + result["filtered"] * PORT_SCAN_RETRIES) * PORT_PROBE_BYTES
+    size = max(1, len(results) // (len(bots) * BOTNET_CHUNKS_PER_BOT))
+    chunks = []
+    for i in range(0, len(results), size):
+        part = results[i:i + size]
+        chunks.append((sum(result["bytes"] for result in part), part))
+    print(Fore.YELLOW + f"Scanning {len(targets)} host{'s' if len(targets) != 1 else ''} from the botnet...")
+
+    def execute(bot: int, part: List[Dict]) -> bool:
+        rate = bots[bot].rate("scan")
+        for result in part:
+            result["seconds"] = result["bytes"] / rate
+        return False
+    run_botnet_job(bots, "scan", f"botnet scan {targets[0]['ip']}", chunks, execute)
+    report_port_scan(results, wanted)
+
+def show_botnet_status() -> None:
+    """botnet status: the bots, their combined throughput and the last jobs"""
+    bots, unreachable = get_bots()
+    print(Fore.YELLOW + "Botnet Status:")
+    print(Fore.WHITE + f"  {'Host':<16}{'Name':<32}{'Cores':>6}{'GHz':>6}{'Mbps':>11}{'Share':>7}")
+    for bot in bots:
+        print(f"  {bot.ip:<16}{bot.name[:31]:<32}{bot.cores:>6}{bot.ghz:>6.1f}{bot.mbps:>11,.1f}{bot.share:>7.0%}")
+    for target in unreachable:
+        print(Fore.RED + f"  {target['ip']:<16}{target['name'][:31]:<32}unreachable: a pivot on its route was lost")
+    if len(bots) == 1:
+        print(Fore.WHITE + "\nNo bots yet. Every host you hack joins your botnet.")
+
+    print(Fore.YELLOW + "\nAggregate throughput:")
+    for kind in BOTNET_JOB_KINDS:
+        print(Fore.WHITE + f"  {kind:<6}{format_throughput(kind, sum(bot.rate(kind) for bot in bots))}")
+    if botnet_jobs:
+        print(Fore.YELLOW + "\nLast jobs:")
+        for kind, job in botnet_jobs.items():
+            print(Fore.WHITE + f"  {kind:<6}{job['chunks']:,} chunks in {format_duration(job['seconds'])} at "
+                  f"{format_throughput(kind, job['throughput'])}: {job['steals']:,} stolen, "
+                  f"{job['dropped']} dropped out, busy {job['busy']:.0%}")
+
+def cmd_botnet(args: str) -> None:
+    """Run jobs on the botnet of compromised hosts, or show its status"""
+    parts = args.split()
+    action = parts[0].lower() if parts else "status"
+    if action == "status":
+        show_botnet_status()
+        return
+    if action not in BOTNET_JOB_KINDS:
+        print(Fore.RED + f"Unknown botnet action: {action}")
+        print("Usage: botnet [status] | botnet crack <ip> [wordlist] | botnet mine [minutes] | botnet scan <ports> <ip> [ip ...]")
+        return
+    if not get_topology().compromised:
+        print(Fore.RED + "Your botnet has no bots yet. Every host you hack joins it.")
+        return
+    {"crack": botnet_crack, "mine": botnet_mine, "scan": botnet_scan}[action](parts[1:])
 
 def cmd_mission(args: str) -> None:
     """Manage missions"""
@@ -2380,7 +6544,9 @@ def cmd_mission(args: str) -> None:
     
     if subcommand == "list":
         # List available missions
-        available_missions = [m for m in game_state.missions if not m["completed"]]
+        expire_missions(time.time())
+        offer_missions()
+        available_missions = game_state.missions.open()
         
         if not available_missions:
             print(Fore.YELLOW + "No missions available. Check back later.")
@@ -2416,7 +6582,7 @@ def cmd_mission(args: str) -> None:
             return
         
         mission_id = subargs.strip()
-        mission = get_mission_by_id(mission_id)
+        mission = game_state.missions.lookup(mission_id)
         
         if not mission:
             print(Fore.RED + f"Error: mission {mission_id} not found")
@@ -2431,6 +6597,8 @@ def cmd_mission(args: str) -> None:
         
         if mission["completed"]:
             print(Fore.GREEN + "Status: Completed")
+        elif mission.get("archived"):
+            print(Fore.RED + f"Status: {mission['archived'].capitalize()}")
         else:
             print(Fore.YELLOW + "Status: Available")
             
@@ -2460,7 +6628,7 @@ def cmd_mission(args: str) -> None:
             return
         
         mission_id = subargs.strip()
-        mission = get_mission_by_id(mission_id)
+        mission = game_state.missions.lookup(mission_id)
         
         if not mission:
             print(Fore.RED + f"Error: mission {mission_id} not found")
@@ -2471,6 +6639,10 @@ def cmd_mission(args: str) -> None:
             print(Fore.YELLOW + f"Mission {mission_id} has already been completed.")
             return
         
+        if mission.get("archived"):
+            print(Fore.YELLOW + f"Mission {mission_id} is no longer available ({mission['archived']}).")
+            return
+        
         # Check if player already has an active mission
         if game_state.player["current_mission"]:
             current_mission = get_mission_by_id(game_state.player["current_mission"])
@@ -2489,7 +6661,7 @@ def cmd_mission(args: str) -> None:
             return
         
         # Accept the mission
-        game_state.player["current_mission"] = mission_id
+        set_current_mission(mission_id)
         print(Fore.GREEN + f"Mission accepted: {mission['title']}")
         print(f"Target: {mission['target']}")
         print(f"First step: {mission['steps'][0]}")
@@ -2514,13 +6686,13 @@ def cmd_mission(args: str) -> None:
         print(f"Reward: {format_btc(mission['reward'])} BTC + {mission['rep_reward']} rep")
         
         print("\nProgress:")
-        for i, step in enumerate(mission["steps"], 1):
+        for i, step in enumerate(mission["steps"]):
             if i < mission["current_step"]:
-                print(f"  {i}. {Fore.GREEN}[COMPLETED] {step}")
+                print(f"  {i + 1}. {Fore.GREEN}[COMPLETED] {step}")
             elif i == mission["current_step"]:
-                print(f"  {i}. {Fore.YELLOW}[CURRENT] {step}")
+                print(f"  {i + 1}. {Fore.YELLOW}[CURRENT] {step}  ({objective_hint(step, mission['target'])})")
             else:
-                print(f"  {i}. {Fore.WHITE}{step}")
+                print(f"  {i + 1}. {Fore.WHITE}{step}")
     
     else:
         print(Fore.RED + f"Unknown mission subcommand: {subcommand}")
@@ -2530,7 +6702,7 @@ def cmd_shop(args: str) -> None:
     """Access the upgrade shop"""
     category = args.strip().lower()
     
-    if not category:
+    while not category:
         # Show shop menu
         print(Fore.CYAN + "Upgrade Shop Categories:")
         print(f"  1. CPU - Current: {game_state.pc['cpu']['name']} (Level {game_state.pc['cpu']['level']})")
@@ -2549,12 +6721,10 @@ def cmd_shop(args: str) -> None:
             
         if selection not in ["1", "2", "3", "4", "5"]:
             print(Fore.RED + "Invalid selection.")
-            cmd_shop("")
-            return
+            continue
             
         categories = ["cpu", "ram", "storage", "network", "security"]
-        cmd_shop(categories[int(selection) - 1])
-        return
+        category = categories[int(selection) - 1]
     
     # Show upgrades for the selected category
     if category not in game_state.upgrades:
@@ -2656,6 +6826,9 @@ def cmd_upgrade(args: str) -> None:
         # Additional details based on category
         if category == "cpu":
             print(f"Specs: {game_state.pc[category]['speed']} GHz, {game_state.pc[category]['cores']} cores")
+            if miner.running and host_worker_count(game_state.pc["cpu"]["cores"]) != miner.workers:
+                miner.start(host_worker_count(game_state.pc["cpu"]["cores"]))
+                print(Fore.CYAN + f"Mining restarted with {miner.workers} workers.")
         elif category == "ram":
             print(f"Size: {game_state.pc[category]['size']} MB")
         elif category == "storage":
@@ -2668,18 +6841,407 @@ def cmd_upgrade(args: str) -> None:
     else:
         print(Fore.RED + "Upgrade failed. Please try again.")
 
-def cmd_bitcoin() -> None:
-    """Check Bitcoin balance"""
+def cmd_bitcoin(args: str = "") -> None:
+    """Check Bitcoin balance or chart market prices"""
+    parts = args.strip().lower().split()
+    if parts and parts[0] == "chart":
+        show_market_chart(parts[1:])
+        return
+    
+    market = update_market()
     btc = game_state.player["bitcoin"]
     usd_value = get_btc_usd_value(btc)
+    day = 24 * 3600 // MARKET_TICK_SECONDS
     
     print(Fore.YELLOW + "Bitcoin Balance:")
     print(Fore.WHITE + f"  {format_btc(btc)} (${usd_value:.2f})")
-    print(f"BTC/USD Rate: ${DEFAULT_BTC_VALUE:.2f}")
+    print(f"BTC/USD Rate: ${market.price('BTC'):.2f} ({format_change(market.change('BTC', day))} 24h)")
     
     if game_state.player["ecoin"] > 0:
         print(Fore.BLUE + "\nE-Coin Balance:")
-        print(Fore.WHITE + f"  {game_state.player['ecoin']:.2f} E-Coin (${game_state.player['ecoin'] * DEFAULT_ECOIN_VALUE:.2f})")
+        print(Fore.WHITE + f"  {game_state.player['ecoin']:.2f} E-Coin (${game_state.player['ecoin'] * market.price('ECOIN'):.2f})")
+    
+    print("\nType 'bitcoin chart' to see the price history.")
+
+def show_market_chart(args: List[str]) -> None:
+    """Draw a sparkline of an asset's closing prices"""
+    market = update_market()
+    asset = "BTC"
+    resolution = "1h"
+    for arg in args:
+        if arg.upper() in market.assets:
+            asset = arg.upper()
+        elif arg in MARKET_CANDLE_RESOLUTIONS or arg == "1m":
+            resolution = arg
+        else:
+            print(Fore.RED + f"Unknown chart option: {arg}")
+            print(f"Usage: bitcoin chart [{'|'.join(a.lower() for a in market.assets)}] "
+                  f"[1m|{'|'.join(MARKET_CANDLE_RESOLUTIONS)}]")
+            return
+    
+    width = max(10, min(60, shutil.get_terminal_size().columns - 20))
+    closes = market.closes(asset, resolution)[-width:]
+    if len(closes) < 2:
+        print(Fore.YELLOW + "Not enough price history yet. Check back later.")
+        return
+    
+    print(Fore.YELLOW + f"{asset}/USD - {resolution} closes ({len(closes)} points)")
+    print(Fore.WHITE + f"  High: ${max(closes):,.4f}")
+    print(f"  {Fore.CYAN}{sparkline(closes)}")
+    print(Fore.WHITE + f"  Low:  ${min(closes):,.4f}")
+    print(f"  Last: ${closes[-1]:,.4f} ({format_change(closes[-1] / closes[0] - 1)} over the chart)")
+
+def update_order_book() -> OrderBook:
+    """Run the NPC order flow up to the current in-game time and settle the player's fills"""
+    book = game_state.order_book
+    market = update_market()
+    rounds = int((time.time() - book.last_npc_update) * game_state.time_acceleration / MARKET_TICK_SECONDS)
+    if rounds > 0:
+        book.last_npc_update += rounds * MARKET_TICK_SECONDS / game_state.time_acceleration
+    elif not book.npc_quotes:
+        rounds = 1  # Fresh book: the market makers post their first quotes
+    rounds = min(rounds, NPC_MAX_ROUNDS)
+    if rounds:
+        # Each round quotes around the price of one of the latest market ticks
+        btc = market.closes("BTC", "1m")[-rounds:]
+        ecoin = market.closes("ECOIN", "1m")[-rounds:]
+        for btc_price, ecoin_price in zip(btc, ecoin):
+            settle_fills(npc_trading_round(book, btc_price / ecoin_price, book.rng))
+    return book
+
+def settle_fills(fills: List[Tuple[Order, Order, float, float]]) -> None:
+    """Credit the player's side of matched trades"""
+    for maker, taker, price, quantity in fills:
+        for order in (maker, taker):
+            if order.owner == "player":
+                credit_fill(order, price, quantity)
+    del game_state.trades[:-TRADE_LOG_SIZE]
+
+def credit_fill(order: Order, price: float, quantity: float) -> None:
+    """Credit one fill of a player order; its funds were reserved when it was placed"""
+    player = game_state.player
+    if order.side == "buy":
+        player["bitcoin"] += quantity
+        # The limit price was reserved, so give back any price improvement
+        player["ecoin"] += (order.price - price) * quantity
+    else:
+        player["ecoin"] += price * quantity
+    game_state.trades.append((order.side, quantity, price))
+    add_to_history(f"Order #{order.id}: {'bought' if order.side == 'buy' else 'sold'} "
+                   f"{format_btc(quantity)} at {price:,.2f} E-Coin", Fore.GREEN)
+
+def refund_order(order: Order) -> None:
+    """Return the funds reserved for the unfilled part of an order"""
+    if order.side == "buy":
+        game_state.player["ecoin"] += order.remaining * order.price
+    else:
+        game_state.player["bitcoin"] += order.remaining
+
+def place_order(side: str, args: str) -> None:
+    """Place a limit order, or a market order when no price is given"""
+    usage = f"Usage: {side} <btc amount> [price in E-Coin]"
+    parts = args.split()
+    if len(parts) not in (1, 2):
+        print(Fore.RED + "Error: amount not specified" if not parts else Fore.RED + "Error: too many arguments")
+        print(usage)
+        return
+    
+    try:
+        quantity = float(parts[0])
+        price = float(parts[1]) if len(parts) > 1 else None
+    except ValueError:
+        print(Fore.RED + "Error: amount and price must be numbers")
+        print(usage)
+        return
+    
+    if quantity <= 0 or (price is not None and price <= 0):
+        print(Fore.RED + "Error: amount and price must be positive")
+        return
+    
+    book = update_order_book()
+    resting = price is not None
+    if price is None:
+        best = book.best("sell" if side == "buy" else "buy")
+        if best is None:
+            print(Fore.YELLOW + "Nobody is trading on the other side right now. Try a limit order.")
+            return
+        price = round(best * (1 + MARKET_ORDER_SLIPPAGE if side == "buy" else 1 - MARKET_ORDER_SLIPPAGE), 2)
+    
+    # Reserve the funds up front
+    player = game_state.player
+    if side == "buy":
+        cost = quantity * price
+        if cost > player["ecoin"] + ORDER_EPSILON:
+            print(Fore.RED + f"Insufficient E-Coin. Need {cost:,.2f}, have {player['ecoin']:,.2f}")
+            return
+        player["ecoin"] -= cost
+    else:
+        if quantity > player["bitcoin"] + ORDER_EPSILON:
+            print(Fore.RED + f"Insufficient Bitcoin. Need {format_btc(quantity)}, have {format_btc(player['bitcoin'])}")
+            return
+        player["bitcoin"] -= quantity
+    
+    order, fills = book.submit("player", side, price, quantity, resting=resting)
+    settle_fills(fills)
+    
+    filled = quantity - order.remaining
+    if filled > ORDER_EPSILON:
+        average = sum(fill_price * fill_quantity for _, _, fill_price, fill_quantity in fills) / filled
+        print(Fore.GREEN + f"Filled {format_btc(filled)} at an average of {average:,.2f} E-Coin")
+    if order.remaining > ORDER_EPSILON:
+        if resting:
+            print(Fore.CYAN + f"Order #{order.id} placed: {side} {format_btc(order.remaining)} at {price:,.2f} E-Coin")
+            add_to_history(f"Placed order #{order.id}: {side} {format_btc(order.remaining)} at {price:,.2f} E-Coin", Fore.CYAN)
+        else:
+            refund_order(order)
+            print(Fore.YELLOW + f"Not enough liquidity: {format_btc(order.remaining)} left unfilled.")
+
+def cmd_buy(args: str) -> None:
+    """Buy Bitcoin with E-Coin on the BitcoinHub order book"""
+    place_order("buy", args)
+
+def cmd_sell(args: str) -> None:
+    """Sell Bitcoin for E-Coin on the BitcoinHub order book"""
+    place_order("sell", args)
+
+def cmd_orders() -> None:
+    """Show the top of the order book, the player's open orders and recent fills"""
+    book = update_order_book()
+    bid, ask = book.best("buy"), book.best("sell")
+    print(Fore.YELLOW + "BTC/E-Coin Order Book:")
+    if bid is not None and ask is not None:
+        print(Fore.WHITE + f"  Best bid: {bid:,.2f}   Best ask: {ask:,.2f}   Spread: {ask - bid:,.2f}")
+    
+    orders = book.player_orders()
+    print(Fore.YELLOW + "\nYour Open Orders:")
+    if not orders:
+        print(Fore.WHITE + "  None")
+    for order in orders:
+        filled = order.quantity - order.remaining
+        print(Fore.WHITE + f"  #{order.id:<6} {order.side:4} {format_btc(order.remaining):>16} @ {order.price:,.2f} E-Coin"
+              + (f" ({format_btc(filled)} filled)" if filled > ORDER_EPSILON else ""))
+    
+    if game_state.trades:
+        print(Fore.YELLOW + "\nRecent Fills:")
+        for side, quantity, price in reversed(game_state.trades):
+            color = Fore.GREEN if side == "buy" else Fore.RED
+            print(f"  {color}{side:4}{Fore.WHITE} {format_btc(quantity):>16} @ {price:,.2f} E-Coin")
+
+def cmd_cancel(args: str) -> None:
+    """Cancel one of the player's open orders"""
+    try:
+        order_id = int(args.strip().lstrip("#"))
+    except ValueError:
+        print(Fore.RED + "Error: no order id specified")
+        print("Usage: cancel <order id>")
+        return
+    
+    book = update_order_book()
+    order = book.orders.get(order_id)
+    if order is None or order.owner != "player":
+        print(Fore.RED + f"Error: you have no open order #{order_id}")
+        return
+    
+    refund_order(book.cancel(order_id))
+    print(Fore.GREEN + f"Order #{order_id} cancelled. Reserved funds returned.")
+    add_to_history(f"Cancelled order #{order_id}", Fore.YELLOW)
+
+def collect_mining_rewards() -> None:
+    """Credit the shares found by the background miner since the last command"""
+    shares = miner.collect()
+    if shares:
+        reward = shares * MINING_SHARE_REWARD
+        game_state.player["bitcoin"] += reward
+        game_state.stats["bitcoins_earned"] += reward
+        add_to_history(f"Mining pool paid {format_btc(reward)} for {shares} shares", Fore.GREEN)
+
+def cmd_mine(args: str) -> None:
+    """Start, stop or inspect proof-of-work mining"""
+    action = args.strip().lower() or "status"
+    cores = game_state.pc["cpu"]["cores"]
+    
+    if action == "start":
+        workers = host_worker_count(cores)
+        print(Fore.CYAN + f"Starting {workers} mining worker{'s' if workers != 1 else ''}...")
+        miner.start(workers)
+        if workers < cores:
+            print(Fore.YELLOW + f"Your host only has {workers} core{'s' if workers != 1 else ''} for your {cores}-core {game_state.pc['cpu']['name']}.")
+        print(Fore.GREEN + "Mining started. Shares are paid out as you keep working.")
+        add_to_history(f"Started mining with {workers} workers", Fore.CYAN)
+    elif action == "stop":
+        if not miner.running:
+            print(Fore.YELLOW + "Mining is not running.")
+            return
+        miner.stop()
+        collect_mining_rewards()
+        print(Fore.GREEN + f"Mining stopped. {miner.total_shares} shares found this session.")
+        add_to_history("Stopped mining", Fore.CYAN)
+    elif action == "status":
+        collect_mining_rewards()
+        print(Fore.YELLOW + "Mining Status:")
+        print(Fore.WHITE + f"  State: {Fore.GREEN + 'running' if miner.running else Fore.RED + 'stopped'}")
+        print(Fore.WHITE + f"  Difficulty: {MINING_SHARE_BITS} leading zero bits (~{2 ** MINING_SHARE_BITS:,} hashes per share)")
+        print(f"  Reward: {format_btc(MINING_SHARE_REWARD)} per share")
+        if miner.error:
+            print(Fore.RED + f"  Error: {miner.error}")
+        rates = miner.hash_rates()
+        if rates:
+            print(Fore.YELLOW + "\nWorkers:")
+            for i, (pid, rate, shares) in enumerate(rates, 1):
+                print(Fore.WHITE + f"  #{i} (pid {pid}): {rate / 1000:,.1f} kH/s, {shares} shares")
+            total = sum(rate for _, rate, _ in rates)
+            print(Fore.WHITE + f"  Total: {total / 1000:,.1f} kH/s, {miner.total_shares} shares, {miner.total_hashes:,} hashes")
+            if miner.running and total:
+                hourly = 3600 * total / 2 ** MINING_SHARE_BITS * MINING_SHARE_REWARD
+                print(f"  Expected income: {format_btc(hourly)} per hour")
+        elif miner.running:
+            print(Fore.WHITE + "\nWaiting for the first jobs to finish...")
+    else:
+        print(Fore.RED + f"Unknown mining action: {action}")
+        print("Usage: mine [start|stop|status]")
+
+def cmd_perf(args: str) -> None:
+    """Latency diagnostics: report, dump, profile or reset"""
+    parts = args.split(maxsplit=1)
+    action = parts[0].lower() if parts else "report"
+    rest = parts[1].strip() if len(parts) > 1 else ""
+    
+    if action == "report":
+        show_perf_report()
+        show_content_pool_status()
+    elif action == "dump":
+        path = rest or PERF_DUMP_FILE
+        try:
+            with open(path, "w") as f:
+                json.dump(perf.to_dict(), f, indent=2)
+        except OSError as e:
+            print(Fore.RED + f"Error writing {path}: {e}")
+            return
+        print(Fore.GREEN + f"Performance data written to {path}")
+    elif action == "profile":
+        if not rest:
+            print(Fore.RED + "Error: no command to profile")
+            print("Usage: perf profile <command>")
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            execute_command(rest)
+        finally:
+            profiler.disable()
+        print(Fore.YELLOW + f"\nProfile of '{rest}' (top {PERF_PROFILE_LINES} by cumulative time):")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(PERF_PROFILE_LINES)
+    elif action == "reset":
+        perf.reset()
+        print(Fore.GREEN + "Performance statistics cleared.")
+    else:
+        print(Fore.RED + f"Unknown perf action: {action}")
+        print("Usage: perf [report|dump [file]|profile <command>|reset]")
+
+def show_perf_report() -> None:
+    """Print latency percentiles per command and for saves and loads"""
+    if not perf.wall and not perf.io:
+        print(Fore.YELLOW + "No performance data yet.")
+        return
+    
+    started = datetime.datetime.fromtimestamp(perf.started).strftime("%H:%M:%S")
+    print(Fore.YELLOW + f"Command latency in ms (since {started}):")
+    print(Fore.WHITE + f"  {'Command':<12}{'Count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'Max':>9}{'Delay':>8}")
+    for command in sorted(perf.wall, key=lambda c: perf.wall[c].total, reverse=True):
+        wall = perf.wall[command]
+        delay = perf.delay[command]
+        share = delay.total / wall.total if wall.total else 0.0
+        print(f"  {command:<12}{wall.count:>7}{wall.percentile(0.5):>9.1f}{wall.percentile(0.95):>9.1f}"
+              f"{wall.percentile(0.99):>9.1f}{wall.max:>9.1f}{share:>8.0%}")
+    print(Fore.CYAN + "  Delay = share of the time spent in artificial delays")
+    
+    if perf.io:
+        print(Fore.YELLOW + "\nSave files in ms:")
+        for operation, histogram in sorted(perf.io.items()):
+            print(Fore.WHITE + f"  {operation:<12}{histogram.count:>7}{histogram.percentile(0.5):>9.1f}"
+                  f"{histogram.percentile(0.95):>9.1f}{histogram.percentile(0.99):>9.1f}{histogram.max:>9.1f}")
+
+def show_content_pool_status() -> None:
+    """Print the pre-generated mission and championship stock and any builder failure"""
+    if content_pool.thread is None:
+        return
+    stock = ", ".join(f"{len(content_pool.stock[kind])}/{size} {kind}s" for kind, size in content_pool.sizes.items())
+    print(Fore.YELLOW + f"\nPre-generated content: {stock}")
+    if content_pool.error:
+        print(Fore.RED + f"  {content_pool.failures} background builds failed, the last with {content_pool.error}")
+        print(Fore.WHITE + "  Missions and championships are drawn when needed until the builders recover.")
+
+def cmd_debug(args: str) -> None:
+    """Debugging tools; currently only 'debug mem'"""
+    parts = args.split()
+    if not parts or parts[0].lower() != "mem":
+        print(Fore.RED + "Usage: debug mem [report|snapshot|diff [a b]|limit [subsystem size]]")
+        return
+    
+    action = parts[1].lower() if len(parts) > 1 else "report"
+    rest = parts[2:]
+    if action == "report":
+        show_memory_report()
+    elif action == "snapshot":
+        tracing = tracemalloc.is_tracing()
+        number, snapshot = memory.snapshot()
+        if not tracing:
+            print(Fore.CYAN + "Allocation tracing started; only allocations made from now on are tracked.")
+        print(Fore.YELLOW + f"Snapshot #{number}: {format_size(sum(stat.size for stat in snapshot.statistics('filename')))} traced")
+        for stat in snapshot.statistics("lineno")[:MEMORY_TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            print(f"  {format_size(stat.size):>10}  {stat.count:>7} blocks  {os.path.basename(frame.filename)}:{frame.lineno}")
+    elif action == "diff":
+        if len(rest) == 2 and all(number.isdigit() for number in rest):
+            numbers = [int(number) for number in rest]
+        elif not rest and len(memory.snapshots) >= 2:
+            numbers = [memory.snapshots[-2][0], memory.snapshots[-1][0]]
+        else:
+            print(Fore.RED + "Usage: debug mem diff [a b] (take two snapshots first)")
+            return
+        old, new = (memory.find(number) for number in numbers)
+        if old is None or new is None:
+            kept = ", ".join(f"#{taken}" for taken, _, _ in memory.snapshots) or "none"
+            print(Fore.RED + f"Unknown snapshot. Snapshots kept: {kept}")
+            return
+        changes = new.compare_to(old, "lineno")
+        growth = sum(change.size_diff for change in changes)
+        print(Fore.YELLOW + f"Snapshot #{numbers[0]} -> #{numbers[1]}: {'+' if growth > 0 else ''}{format_size(growth)}")
+        for change in changes[:MEMORY_TOP_ALLOCATIONS]:
+            frame = change.traceback[0]
+            color = Fore.RED if change.size_diff > 0 else Fore.GREEN
+            size = ("+" if change.size_diff > 0 else "") + format_size(change.size_diff)
+            print(color + f"  {size:>11}  {change.count_diff:>+7} blocks  {os.path.basename(frame.filename)}:{frame.lineno}")
+    elif action == "limit":
+        if not rest:
+            for name, limit in memory.limits.items():
+                print(f"  {name:<16}{format_size(limit):>12}")
+            return
+        limit = parse_size(rest[1]) if len(rest) == 2 else None
+        if rest[0] not in memory.limits or limit is None:
+            print(Fore.RED + "Usage: debug mem limit <subsystem> <size>  (e.g. debug mem limit history 2M)")
+            print(f"Subsystems: {', '.join(memory.limits)}")
+            return
+        memory.limits[rest[0]] = limit
+        memory.over.discard(rest[0])
+        print(Fore.GREEN + f"Soft limit for {rest[0]} set to {format_size(limit)}.")
+    else:
+        print(Fore.RED + f"Unknown debug mem action: {action}")
+        print("Usage: debug mem [report|snapshot|diff [a b]|limit [subsystem size]]")
+
+def show_memory_report() -> None:
+    """Print the deep size of every GameState subsystem against its soft limit"""
+    sizes = memory.sizes(game_state)
+    print(Fore.YELLOW + "Memory by subsystem:")
+    print(Fore.WHITE + f"  {'Subsystem':<16}{'Size':>12}{'Budget':>12}{'Used':>7}")
+    for name, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        limit = memory.limits[name]
+        color = Fore.RED if size > limit else Fore.YELLOW if size > limit * 0.8 else Fore.GREEN
+        print(color + f"  {name:<16}{format_size(size):>12}{format_size(limit):>12}{size / limit:>7.0%}")
+    print(Fore.WHITE + f"  {'total':<16}{format_size(sum(sizes.values())):>12}")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        print(Fore.CYAN + f"\nTraced allocations: {format_size(current)} now, {format_size(peak)} peak")
 
 def cmd_run(args: str) -> None:
     """Run a tool or script"""
@@ -2692,24 +7254,17 @@ def cmd_run(args: str) -> None:
     tool = parts[0]
     tool_args = parts[1] if len(parts) > 1 else ""
     
-    # Current directory contents
-    current_path = game_state.current_dir
-    current = game_state.file_system
-    
-    # Navigate to the current directory
-    for component in current_path.split('/'):
-        if not component or component == '.' or component == '~':
-            continue
-            
-        current = current[component]["content"]
+    # Look the tool up relative to the current directory
+    node = get_file_node(resolve_path(tool))
+    tool = tool.split('/')[-1]
     
     # Check if the tool exists
-    if not tool in current:
+    if node is None:
         print(Fore.RED + f"Error: {tool} not found in current directory")
         return
     
     # Check if it's a file
-    if current[tool]["type"] != "file":
+    if node["type"] != "file":
         print(Fore.RED + f"Error: {tool} is not a file")
         return
     
@@ -2726,11 +7281,10 @@ def cmd_run(args: str) -> None:
     elif tool == "bruteforce.py":
         if not tool_args:
             print(Fore.RED + "Error: no target specified")
-            print("Usage: run bruteforce.py <target_ip>")
+            print("Usage: run bruteforce.py <target_ip> [wordlist]")
             return
         
-        target_ip = tool_args.strip().split()[0]
-        cmd_bruteforce(target_ip)
+        cmd_bruteforce(tool_args)
     
     elif tool == "rootkit_gen.py":
         if not tool_args:
@@ -2756,7 +7310,7 @@ def cmd_run(args: str) -> None:
         if success:
             # Simulate data extraction
             print(Fore.YELLOW + "\nExtracting data...")
-            time.sleep(1)
+            pause(1)
             
             # Generate some fake data based on the target
             target = get_target_by_ip(target_ip)
@@ -2776,35 +7330,293 @@ def cmd_run(args: str) -> None:
                     print("- user_credentials.db (4.3 MB)")
                     print("- system_logs.gz (78.2 MB)")
                     print("- config_backups.tar (23.5 MB)")
+                emit_event("exfiltrate", target_ip, path=args[1] if len(args) > 1 else None)
     
     else:
         # Generic script execution
         print(Fore.YELLOW + f"Running {tool}...")
-        time.sleep(1)
+        pause(1)
         print("...")
-        time.sleep(0.5)
+        pause(0.5)
         print(f"Executed {tool} successfully.")
 
+# Balance simulation
+class NullOutput:
+    """Output stream that discards everything, for headless runs"""
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+def next_upgrades() -> List[Tuple[float, str, int]]:
+    """(cost, component, level) of the next level of every component that has one"""
+    return [(upgrade["cost"], component, upgrade["level"])
+            for component, levels in game_state.upgrades.items()
+            for upgrade in levels
+            if upgrade["level"] == game_state.pc[component]["level"] + 1]
+
+def buy_affordable_upgrades() -> None:
+    """Keep buying the cheapest next-level upgrade the player can afford"""
+    while True:
+        options = [option for option in next_upgrades() if option[0] <= game_state.player["bitcoin"]]
+        if not options:
+            return
+        _, component, level = min(options)
+        upgrade_component(component, level)
+
+def describe_stall(mission: Dict) -> str:
+    """Where a simulated career is stuck: its mission step and what holds it back"""
+    step = mission["current_step"]
+    events, _ = compile_objective(mission["steps"][step])
+    where = f"step {step + 1}/{len(mission['steps'])} ({events[0]})"
+    if events[0] in LOCAL_EVENTS:
+        return where
+    target = get_target_by_ip(mission["target"])
+    pivot = next_pivot(target)
+    host = pivot or target
+    where += f" {'pivoting through' if pivot else 'on'} a security {host['security_level']} host"
+    chance = calculate_hack_success_chance(get_difficulty_level(host))
+    if chance >= SIMULATION_STALL_CHANCE:
+        return where
+    upgrades = next_upgrades()
+    if upgrades:
+        cost, component, level = min(upgrades)
+        return where + f", missing upgrade {component} level {level} ({format_btc(cost)})"
+    hack_type = events[0] if pivot is None and events[0] != "exfiltrate" else "hack"
+    return where + f", missing {HACK_SKILLS.get(hack_type, 'network')} skill"
+
+def simulate_career(horizon: float) -> Dict:
+    """Play one bot career on the current game state for `horizon` seconds of play time.
+
+    The bot takes the first mission it may accept, generating a new one when none is
+    left, and performs the action its current step compiles to: a hack of the mission
+    target, a data exfiltration, or a local file or darkweb action that takes a second.
+    A firewalled target is reached by first hacking the hosts on the way in (next_pivot).
+    It buys the cheapest affordable upgrades after each mission and joins fsociety and
+    the Dark Army as soon as its reputation allows. The result's "stall" is the step the
+    career ended on, with how long it had been on it (describe_stall).
+    """
+    player = game_state.player
+    clock = 0.0
+    result = {"fsociety": None, "dark_army": None, "btc": [], "stall": None}
+    step, step_started = None, 0.0
+    checkpoints = [hours * 3600 for hours in SIMULATION_CHECKPOINTS if hours * 3600 <= horizon]
+    
+    while clock < horizon:
+        while checkpoints and clock >= checkpoints[0]:
+            result["btc"].append(player["bitcoin"])
+            checkpoints.pop(0)
+        
+        mission = get_mission_by_id(player["current_mission"]) if player["current_mission"] else None
+        if mission is None:
+            mission = next((m for m in game_state.missions.available.values()
+                            if m.get("requires_rep", 0) <= player["reputation"]
+                            and (player["fsociety_member"] or not m.get("fsociety_required"))),
+                           None)
+            if mission is None:
+                mission = generate_new_mission()
+            set_current_mission(mission["id"])
+        if step != (mission["id"], mission["current_step"]):
+            step, step_started = (mission["id"], mission["current_step"]), clock
+        
+        events, op = compile_objective(mission["steps"][mission["current_step"]])
+        target = get_target_by_ip(mission["target"])
+        pivot = None if events[0] in LOCAL_EVENTS else next_pivot(target)
+        if events[0] in LOCAL_EVENTS:
+            clock += 1
+            emit_event(events[0], op=op)
+        elif pivot is not None:
+            clock += get_time_for_hack(get_difficulty_level(pivot))
+            perform_hack(pivot["ip"], "hack")
+        else:
+            clock += get_time_for_hack(get_difficulty_level(target))
+            if events[0] == "exfiltrate":
+                if perform_hack(target["ip"], "hack"):
+                    emit_event("exfiltrate", target["ip"])
+            else:
+                perform_hack(target["ip"], events[0])
+        if mission["completed"]:
+            buy_affordable_upgrades()
+        
+        if result["fsociety"] is None and player["reputation"] >= FSOCIETY_REP_THRESHOLD:
+            player["fsociety_member"] = True
+            result["fsociety"] = clock
+        if result["dark_army"] is None and player["reputation"] >= DARK_ARMY_REP_THRESHOLD:
+            player["dark_army_contact"] = True
+            result["dark_army"] = clock
+    
+    result["btc"].extend(player["bitcoin"] for _ in checkpoints)
+    mission = get_mission_by_id(player["current_mission"]) if player["current_mission"] else None
+    if mission is not None and not mission["completed"]:
+        result["stall"] = (describe_stall(mission), clock - step_started)
+    return result
+
+def simulate_careers(seed: int, first: int, count: int, horizon: float) -> List[Dict]:
+    """Play careers first .. first+count-1 headlessly in this process.
+
+    Each career gets a fresh GameState and its own seed, so results do not depend on
+    how careers are spread over workers. Output, delays, the event log and the archive are off.
+    """
+    global game_state, delays_enabled
+    saved = (game_state, delays_enabled, event_log.enabled, archive.enabled, sys.stdout)
+    try:
+        delays_enabled = False
+        event_log.enabled = False
+        archive.enabled = False
+        sys.stdout = NullOutput()
+        results = []
+        for career in range(first, first + count):
+            random.seed(f"{seed}:{career}")
+            game_state = GameState()
+            results.append(simulate_career(horizon))
+        return results
+    finally:
+        game_state, delays_enabled, event_log.enabled, archive.enabled, sys.stdout = saved
+
+def percentiles(values: List[float], fractions: Tuple[float, ...] = (0.1, 0.5, 0.9)) -> List[float]:
+    """Nearest-rank percentiles of a list of numbers"""
+    values = sorted(values)
+    return [values[min(len(values) - 1, int(fraction * len(values)))] for fraction in fractions]
+
+def run_simulation(careers: int, workers: int, seed: int, hours: float) -> None:
+    """Simulate bot careers across the worker pool and print the balance report"""
+    horizon = hours * 3600
+    checkpoints = [h for h in SIMULATION_CHECKPOINTS if h * 3600 <= horizon]
+    workers = min(workers, WORKER_POOL_SIZE)
+    chunk = max(1, min(SIMULATION_CHUNK, careers // (workers * 4)))
+    started = time.perf_counter()
+    jobs = ((simulate_careers, seed, first, min(chunk, careers - first), horizon)
+            for first in range(0, careers, chunk))
+    
+    fsociety, dark_army = [], []
+    stuck = {"fsociety": defaultdict(list), "Dark Army": defaultdict(list)}  # milestone -> where -> time stuck
+    balances = [[] for _ in checkpoints]
+    for results in run_jobs(jobs, workers):
+        for result in results:
+            if result["fsociety"] is not None:
+                fsociety.append(result["fsociety"])
+            if result["dark_army"] is not None:
+                dark_army.append(result["dark_army"])
+            where, seconds = result["stall"] or ("between missions", 0.0)
+            for label, reached in (("fsociety", result["fsociety"]), ("Dark Army", result["dark_army"])):
+                if reached is None:
+                    stuck[label][where].append(seconds)
+            for column, balance in zip(balances, result["btc"]):
+                column.append(balance)
+    elapsed = time.perf_counter() - started
+    
+    print(Fore.YELLOW + f"Simulated {careers:,} careers of {format_time(int(horizon))} play "
+          f"(seed {seed}, {workers} worker{'s' if workers != 1 else ''}) in {elapsed:.1f}s: "
+          f"{careers / elapsed:,.2f} careers/s")
+    print()
+    for label, times in (("fsociety", fsociety), ("Dark Army", dark_army)):
+        line = f"Time to {label}: reached by {len(times) / careers:.1%}"
+        if times:
+            line += "  " + "  ".join(f"p{int(f * 100)} {format_time(int(t))}"
+                                     for f, t in zip((0.1, 0.5, 0.9), percentiles(times)))
+        print(line)
+    print("\nBTC balance by play time:")
+    for hours_played, column in zip(checkpoints, balances):
+        print(f"  {format_time(int(hours_played * 3600)):>8}  " + "  ".join(
+            f"p{int(f * 100)} {format_btc(b)}" for f, b in zip((0.1, 0.5, 0.9), percentiles(column))))
+    print("\nDead ends:")
+    for label, times in (("fsociety", fsociety), ("Dark Army", dark_army)):
+        print(f"  careers that never reached {label}: {1 - len(times) / careers:.1%}")
+        for where, seconds in sorted(stuck[label].items(), key=lambda item: len(item[1]), reverse=True):
+            print(f"    {len(seconds) / careers:>6.1%} stuck at {where} "
+                  f"(p50 {format_time(int(percentiles(seconds)[1]))} on it)")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line options"""
+    parser = argparse.ArgumentParser(description="Asathot - A Mr. Robot-inspired hacking simulation")
+    parser.add_argument("--no-color", action="store_true",
+                        help="disable colored output (the NO_COLOR environment variable does the same)")
+    parser.add_argument("--tui", action="store_true",
+                        help="start in split-screen dashboard mode with a status bar and live progress bars")
+    parser.add_argument("--simulate", type=int, metavar="CAREERS",
+                        help="play CAREERS bot careers headlessly and report progression and economy statistics")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for --simulate, at most one per core (default: all cores)")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="random seed for --simulate (default: 1)")
+    parser.add_argument("--hours", type=float, default=SIMULATION_HOURS,
+                        help=f"play hours per simulated career (default: {SIMULATION_HOURS})")
+    options = parser.parse_args(argv)
+    for name in ("simulate", "workers", "hours"):
+        value = getattr(options, name)
+        if value is not None and value < 1:
+            parser.error(f"--{name} must be at least 1")
+    return options
+
+def cmd_tui(args: str) -> None:
+    """Toggle the split-screen dashboard"""
+    mode = args.strip().lower()
+    if not mode:
+        mode = "off" if dashboard.active else "on"
+    
+    if mode == "on":
+        if dashboard.active:
+            print(Fore.YELLOW + "Dashboard is already on.")
+        elif not dashboard.start():
+            print(Fore.RED + "Dashboard unavailable: this terminal does not support split-screen mode.")
+        else:
+            print(Fore.GREEN + "Dashboard on. Type 'tui off' to return to the plain terminal.")
+    elif mode == "off":
+        if not dashboard.active:
+            print(Fore.YELLOW + "Dashboard is already off.")
+        else:
+            sys.stdout.flush()
+            dashboard.stop()
+            print(Fore.GREEN + "Dashboard off.")
+    else:
+        print(Fore.RED + f"Unknown tui mode: {mode}")
+        print("Usage: tui [on|off]")
+
+def cmd_exit() -> None:
+    """Save the game and quit"""
+    print(Fore.YELLOW + "Exiting Asathot... Game saved.")
+    collect_mining_rewards()
+    save_game()
+    miner.stop()
+    sys.stdout.flush()
+    dashboard.stop()
+    sys.exit(0)
+
 def main():
     """Main function to run the hacker terminal game"""
-    # Initialize colorama
-    colorama.init(autoreset=True)
-    
-    # Clear the screen
-    os.system('cls' if os.name == 'nt' else 'clear')
+    options = parse_args()
+    if options.simulate is not None:
+        run_simulation(options.simulate, options.workers, options.seed, options.hours)
+        return
     
-    # Load the game
-    if not load_game():
-        print(Fore.YELLOW + "Starting new game...")
-    else:
-        print(Fore.GREEN + "Game loaded successfully!")
+    with renderer:
+        # Clear the screen
+        renderer.clear_screen()
+        
+        # Load the game; a new game starts with an empty archive
+        if not os.path.exists(SAVE_FILE):
+            archive.clear()
+        if not load_game():
+            print(Fore.YELLOW + "Starting new game...")
+        else:
+            print(Fore.GREEN + "Game loaded successfully!")
+        
+        # Print the header
+        print_header()
+        
+        # Welcome message
+        print("Welcome to ASATHOT - A Mr. Robot-inspired hacking simulation!")
+        print("Type 'help' to see available commands.")
+        
+        if options.tui:
+            cmd_tui("on")
     
-    # Print the header
-    print_header()
+    # Up-arrow and Ctrl-R recall of commands from earlier sessions
+    command_history.install()
     
-    # Welcome message
-    print("Welcome to ASATHOT - A Mr. Robot-inspired hacking simulation!")
-    print("Type 'help' to see available commands.")
+    # New missions and championships are drawn ahead of time in the background
+    content_pool.start()
     
     # Main game loop
     while True:
@@ -2826,11 +7638,13 @@ def main():
                     
                 prompt = f"{Fore.GREEN}{drive}{windows_path}>{Fore.GREEN} "
             
-            command = input(prompt)
+            command = input(readline_prompt(prompt))
             print(Style.RESET_ALL, end="")  # Reset style after input
+            command_history.record(command)
             
             # Process command
             execute_command(command)
+            dashboard.refresh(force=True)
             
             # Auto-save every 10 commands
             if game_state.stats["commands_executed"] % 10 == 0:
@@ -2838,6 +7652,10 @@ def main():
             
         except KeyboardInterrupt:
             print("\n" + Fore.YELLOW + "Use 'exit' to quit properly.")
+        except EOFError:
+            # Input stream closed (Ctrl-D / Ctrl-Z or piped input ran out)
+            print()
+            execute_command("exit")
         except Exception as e:
             print(Fore.RED + f"Error: {e}")
 
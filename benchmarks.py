@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Asathot performance benchmarks
+
+Times the game's hot paths outside of the interactive prompt, against synthetic
+game states of increasing size.
+Run with: python benchmarks.py [--scale small|medium|large] [-o FILE] [benchmark ...]
+Compare two runs with: python benchmarks.py --compare OLD.json NEW.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+
+import Asathot
+
+# Sizes of the synthetic workloads; "large" needs several GB of memory
+SCALES = {
+    "small": {"orders": 20000, "nonces": 100000, "chunks": 20000, "targets": 1000, "fs_nodes": 1000,
+              "missions": 100, "history": 1000, "calls": 200},
+    "medium": {"orders": 200000, "nonces": 400000, "chunks": 200000, "targets": 10000, "fs_nodes": 100000,
+               "missions": 10000, "history": 20000, "calls": 500},
+    "large": {"orders": 1000000, "nonces": 1600000, "chunks": 1000000, "targets": 1000000, "fs_nodes": 1000000,
+              "missions": 100000, "history": 200000, "calls": 500},
+}
+FILES_PER_DIR = 100
+OPEN_MISSIONS = 20  # Synthetic missions left open; the rest are completed and archived
+PORT_SCAN_HOSTS = 5000  # Hosts in the full-range port scan benchmark
+BOTNET_BOTS = 64  # Bots in the botnet scheduling benchmark
+SERVICES = ["http", "https", "ssh", "ftp", "smtp", "mysql", "vpn", "dns"]
+VULNERABILITIES = ["outdated_ssh", "weak_password", "sql_injection", "xss", "outdated_apache",
+                   "weak_admin_password", "default_credentials", "buffer_overflow"]
+
+
+def synthetic_state(scale: dict, seed: int = 42) -> dict:
+    """Install a game state with many targets, files, missions and history events.
+
+    Returns the paths and IPs the benchmarks look up.
+    """
+    rng = random.Random(seed)
+    state = Asathot.GameState()
+    Asathot.game_state = state
+
+    # Missions are drawn from the built-in targets; drawing from the synthetic ones
+    # would make building the state quadratic in its size
+    missions = [Asathot.generate_new_mission() for _ in range(scale["missions"])]
+    for mission in missions[:-OPEN_MISSIONS]:
+        state.missions.complete(mission["id"])
+
+    targets = []
+    for i in range(scale["targets"]):
+        target = {
+            "ip": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "name": f"Synthetic Host {i}",
+            "security_level": rng.randint(1, 9),
+            "services": rng.sample(SERVICES, 3),
+            "vulnerabilities": rng.sample(VULNERABILITIES, 2),
+            "discovered": rng.random() < 0.5
+        }
+        Asathot.add_credentials(target, rng)
+        targets.append(target)
+    state.network_targets.extend(targets)
+    state.derived.invalidate("targets")
+
+    # ~/bench/dNNN/fMMM.txt, FILES_PER_DIR files per directory
+    bench = {}
+    for i in range(scale["fs_nodes"]):
+        directory = bench.setdefault(f"d{i // FILES_PER_DIR:04d}", {"type": "dir", "content": {}})
+        directory["content"][f"f{i % FILES_PER_DIR:03d}.txt"] = {
+            "type": "file", "content": f"Synthetic file {i}\n" * rng.randint(1, 20)}
+    state.file_system["~"]["content"]["bench"] = {"type": "dir", "content": bench}
+
+    for i in range(scale["history"]):
+        Asathot.add_to_history(f"Synthetic event {i}")
+
+    last_dir = f"d{(scale['fs_nodes'] - 1) // FILES_PER_DIR:04d}"
+    return {
+        "ips": [rng.choice(state.network_targets)["ip"] for _ in range(scale["calls"])],
+        "dir": f"~/bench/{last_dir}",
+        "file": f"~/bench/{last_dir}/f000.txt",
+        "relative": f"bench/./{last_dir}/../{last_dir}/f000.txt",
+        "missions": [mission["id"] for mission in missions]
+    }
+
+def time_calls(function, calls: int, label: str) -> dict:
+    """Call a function repeatedly and summarise its latency in microseconds"""
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        function(i)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        f"{label}_mean_us": sum(samples) / calls * 1e6,
+        f"{label}_p50_us": samples[calls // 2] * 1e6,
+        f"{label}_p95_us": samples[int(calls * 0.95)] * 1e6,
+        f"{label}_max_us": samples[-1] * 1e6
+    }
+
+
+def bench_order_book(scale: dict, seed: int = 42) -> dict:
+    """Matching engine throughput with a realistic mix of resting and crossing orders"""
+    orders = scale["orders"]
+    rng = random.Random(seed)
+    mid = Asathot.DEFAULT_BTC_VALUE
+    flow = []
+    for _ in range(orders):
+        side = "buy" if rng.random() < 0.5 else "sell"
+        # Most orders rest near the top of the book; about a third cross the spread
+        offset = rng.gauss(0.0, 0.002) * mid
+        price = round(mid - offset if side == "buy" else mid + offset, 2)
+        flow.append((side, price, round(rng.uniform(0.01, 1.0), 4)))
+
+    book = Asathot.OrderBook()
+    fills = 0
+    start = time.perf_counter()
+    for side, price, quantity in flow:
+        fills += len(book.submit("npc", side, price, quantity)[1])
+    elapsed = time.perf_counter() - start
+
+    rate = orders / elapsed
+    return {
+        "orders": orders,
+        "fills": fills,
+        "seconds": elapsed,
+        "orders_per_sec": rate,
+        "target": 100000,
+        "passed": rate >= 100000
+    }
+
+
+def bench_mining(scale: dict) -> dict:
+    """Mining throughput with 1, 2, 4, ... workers up to the host's cores; scaling should be near linear"""
+    nonces_per_worker = scale["nonces"]
+    host = os.cpu_count() or 1
+    counts = sorted({1 << i for i in range(host.bit_length()) if 1 << i <= host} | {host})
+    target = Asathot.mining_target(Asathot.MINING_SHARE_BITS)
+    jobs_per_worker = 4
+    job = nonces_per_worker // jobs_per_worker
+
+    result = {"host_cores": host}
+    base_rate = None
+    efficiency = 1.0
+    Asathot.get_worker_pool()
+    for workers in counts:
+        start = time.perf_counter()
+        jobs = ((Asathot.mine_nonces, b"benchmark", i * job, job, target) for i in range(workers * jobs_per_worker))
+        hashes = sum(result[2] for result in Asathot.run_jobs(jobs, workers))
+        rate = hashes / (time.perf_counter() - start)
+        base_rate = base_rate or rate
+        efficiency = min(efficiency, rate / (base_rate * workers))
+        result[f"hashes_per_sec_{workers}w"] = rate
+    Asathot.shutdown_worker_pool()
+
+    result["min_scaling_efficiency"] = efficiency
+    result["passed"] = efficiency >= 0.8
+    return result
+
+
+def bench_botnet(scale: dict, seed: int = 42) -> dict:
+    """Work-stealing scheduler throughput and how close its makespan comes to perfect balance"""
+    rng = random.Random(seed)
+    rates = [rng.uniform(1.0, 100.0) for _ in range(BOTNET_BOTS)]
+    chunks = [(rng.uniform(1.0, 20.0), None) for _ in range(scale["chunks"])]
+
+    start = time.perf_counter()
+    stats = Asathot.schedule_chunks(rates, chunks, rng=rng)
+    elapsed = time.perf_counter() - start
+
+    # Work done over the work the bots could have done while they were up: 1 when every
+    # bot that did not drop out was busy until the very end
+    capacity = sum(rate * (stats["busy"][bot] if bot in stats["dropped"] else stats["seconds"])
+                   for bot, rate in enumerate(rates))
+    balance = sum(stats["units"]) / capacity
+    rate = len(chunks) / elapsed
+    return {
+        "chunks": len(chunks),
+        "bots": BOTNET_BOTS,
+        "steals": stats["steals"],
+        "dropped": len(stats["dropped"]),
+        "seconds": elapsed,
+        "chunks_per_sec": rate,
+        "balance": balance,
+        "passed": rate >= 100000 and balance >= 0.9
+    }
+
+
+def bench_dispatch(scale: dict, lookups: dict) -> dict:
+    """execute_command overhead for a command that does almost nothing"""
+    return time_calls(lambda i: Asathot.execute_command("pwd"), scale["calls"] * 4, "pwd")
+
+def bench_filesystem(scale: dict, lookups: dict) -> dict:
+    """Path resolution, listing and reading in a large file system"""
+    Asathot.game_state.current_dir = "~"
+    result = time_calls(lambda i: Asathot.resolve_path(lookups["relative"]), scale["calls"], "resolve_path")
+    result.update(time_calls(lambda i: Asathot.cmd_ls(lookups["dir"]), scale["calls"], "ls"))
+    result.update(time_calls(lambda i: Asathot.cmd_ls("bench"), max(1, scale["calls"] // 10), "ls_bench"))
+    result.update(time_calls(lambda i: Asathot.cmd_cat(lookups["file"]), scale["calls"], "cat"))
+    return result
+
+def bench_target_lookup(scale: dict, lookups: dict) -> dict:
+    """get_target_by_ip for random known IPs and for an unknown one"""
+    calls = min(scale["calls"], max(10, 10 ** 8 // scale["targets"] // 1000))
+    result = time_calls(lambda i: Asathot.get_target_by_ip(lookups["ips"][i]), calls, "hit")
+    result.update(time_calls(lambda i: Asathot.get_target_by_ip("0.0.0.0"), calls, "miss"))
+    return result
+
+def bench_mission_generation(scale: dict, lookups: dict) -> dict:
+    """generate_new_mission against the full target list"""
+    missions = Asathot.game_state.missions
+    kept = len(missions.available)
+    calls = min(scale["calls"], max(10, 10 ** 8 // scale["targets"] // 1000))
+    result = time_calls(lambda i: Asathot.generate_new_mission(), calls, "generate")
+    for mission_id in list(missions.available)[kept:]:
+        missions.archive(mission_id, "expired")
+    return result
+
+def bench_mission_registry(scale: dict, lookups: dict) -> dict:
+    """Mission lookups and listing with almost every generated mission completed and archived"""
+    ids = lookups["missions"]
+    result = {"hot_missions": len(Asathot.game_state.missions)}
+    result.update(time_calls(lambda i: Asathot.get_mission_by_id(ids[-1 - i % OPEN_MISSIONS]), scale["calls"], "get"))
+    result.update(time_calls(lambda i: Asathot.cmd_mission("list"), scale["calls"], "list"))
+    result.update(time_calls(lambda i: Asathot.cmd_mission(f"info {ids[i * 7919 % len(ids)]}"), scale["calls"], "info"))
+    return result
+
+def bench_save_load(scale: dict, lookups: dict) -> dict:
+    """Writing and reading the save file of the synthetic state"""
+    result = time_calls(lambda i: Asathot.save_game(), 3, "save")
+    result["save_file_bytes"] = os.path.getsize(Asathot.SAVE_FILE)
+    result.update(time_calls(lambda i: Asathot.load_game(), 3, "load"))
+    return result
+
+def bench_hack(scale: dict, lookups: dict) -> dict:
+    """perform_hack end to end with the artificial delays switched off"""
+    Asathot.delays_enabled = False
+    random.seed(42)
+    try:
+        return time_calls(lambda i: Asathot.perform_hack(lookups["ips"][i], "exploit"), scale["calls"], "hack")
+    finally:
+        Asathot.delays_enabled = True
+
+def bench_recommend(scale: dict, lookups: dict) -> dict:
+    """Ranking every discovered target; the column table is built once and then extended"""
+    start = time.perf_counter()
+    table = Asathot.get_target_table()
+    result = {"discovered": len(table), "table_build_us": (time.perf_counter() - start) * 1e6}
+    result.update(time_calls(lambda i: Asathot.recommend_targets(Asathot.RECOMMEND_ROWS), scale["calls"], "recommend"))
+    return result
+
+def bench_port_scan(scale: dict, lookups: dict) -> dict:
+    """Full-range port scan of thousands of hosts; should take well under a second of CPU"""
+    targets = Asathot.game_state.network_targets[-PORT_SCAN_HOSTS:]
+    wall, cpu = time.perf_counter(), time.process_time()
+    results = Asathot.simulate_port_scan(targets, Asathot.parse_ports("1-65535"))
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    return {
+        "hosts": len(targets),
+        "open_ports": sum(len(result["open"]) for result in results),
+        "cpu_seconds": cpu,
+        "hosts_per_sec": len(targets) / wall,
+        "passed": cpu < 1.0
+    }
+
+def bench_routing(scale: dict, lookups: dict) -> dict:
+    """Pivoting into firewalled subnets: topology build, footholds gained and lost, cached routes"""
+    start = time.perf_counter()
+    Asathot.Topology(Asathot.game_state.network_targets)
+    result = {"topology_build_ms": (time.perf_counter() - start) * 1e3}
+    topology = Asathot.get_topology()
+    gained = []
+    def pivot(i):
+        target = Asathot.next_pivot(topology.hosts[lookups["ips"][i]])
+        if target is not None:
+            Asathot.compromise_host(target)
+            gained.append(target)
+    result.update(time_calls(pivot, scale["calls"], "pivot"))
+    result.update(time_calls(lambda i: Asathot.route_to(lookups["ips"][i]), scale["calls"], "route"))
+    result["footholds"] = len(topology.compromised)
+    def lose(i):
+        gained[i]["compromised"] = False
+        Asathot.target_changed(gained[i])
+        topology.lose(gained[i]["ip"])
+    if gained:
+        result.update(time_calls(lose, len(gained), "lose"))
+    return result
+
+BENCHMARKS = {
+    "order_book": bench_order_book,
+    "mining": bench_mining,
+    "botnet": bench_botnet,
+}
+# Benchmarks that run against the synthetic game state
+STATE_BENCHMARKS = {
+    "dispatch": bench_dispatch,
+    "filesystem": bench_filesystem,
+    "target_lookup": bench_target_lookup,
+    "mission_generation": bench_mission_generation,
+    "mission_registry": bench_mission_registry,
+    "save_load": bench_save_load,
+    "hack": bench_hack,
+    "recommend": bench_recommend,
+    "port_scan": bench_port_scan,
+    "routing": bench_routing,
+}
+ALL_BENCHMARKS = {**BENCHMARKS, **STATE_BENCHMARKS}
+
+
+def metric_direction(key: str) -> int:
+    """1 if a larger value is better, -1 if smaller is better, 0 if the metric is not compared.
+
+    Latencies are compared by their median; means and tails of a few hundred calls
+    are too noisy to flag regressions on.
+    """
+    if key.endswith("_per_sec"):
+        return 1
+    if key.endswith(("_p50_us", "seconds")):
+        return -1
+    return 0
+
+def compare_results(old_path: str, new_path: str, threshold: float) -> int:
+    """Print the change of every timed metric between two result files and flag regressions"""
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for name in (name for name in new if name in old):
+        for key, value in new[name].items():
+            direction = metric_direction(key)
+            before = old[name].get(key)
+            if not direction or not isinstance(before, (int, float)) or not before:
+                continue
+            change = value / before - 1
+            regressed = -direction * change > threshold
+            regressions += regressed
+            status = "REGRESSION" if regressed else "improved" if direction * change > threshold else "ok"
+            print(f"{name:18} {key:28} {before:>14,.2f} -> {value:>14,.2f} {change:>+8.1%}  {status}")
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Asathot performance benchmarks")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"benchmarks to run: {', '.join(ALL_BENCHMARKS)} (default: all)")
+    parser.add_argument("--scale", choices=SCALES, default="medium",
+                        help="size of the synthetic workloads (default: medium)")
+    parser.add_argument("-o", "--output", metavar="FILE", default="benchmark_results.json",
+                        help="write the results as JSON (default: benchmark_results.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression (default: 0.2)")
+    args = parser.parse_args()
+    if args.compare:
+        return compare_results(args.compare[0], args.compare[1], args.threshold)
+    unknown = [name for name in args.benchmarks if name not in ALL_BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    scale = SCALES[args.scale]
+    output = os.path.abspath(args.output)
+    results = {}
+    failed = False
+    home = os.getcwd()
+    # Save files, event logs and the mission archive written by the game go to a scratch directory
+    with tempfile.TemporaryDirectory() as scratch, open(os.devnull, "w") as devnull:
+        os.chdir(scratch)
+        try:
+            lookups = None
+            for name in args.benchmarks or ALL_BENCHMARKS:
+                if name in STATE_BENCHMARKS:
+                    if lookups is None:
+                        with contextlib.redirect_stdout(devnull):
+                            lookups = synthetic_state(scale)
+                    with contextlib.redirect_stdout(devnull):
+                        result = STATE_BENCHMARKS[name](scale, lookups)
+                else:
+                    result = BENCHMARKS[name](scale)
+                results[name] = result
+                status = "ok" if result.get("passed", True) else "FAILED"
+                details = ", ".join(f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value}"
+                                    for key, value in result.items() if key != "passed")
+                print(f"{name:18} {status:6} {details}")
+                failed = failed or not result.get("passed", True)
+        finally:
+            os.chdir(home)
+
+    with open(output, "w") as f:
+        json.dump({
+            "version": Asathot.VERSION,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+            "created": time.time(),
+            "results": results
+        }, f, indent=2)
+    print(f"Results written to {output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
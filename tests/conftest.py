@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# Plain output: no colorama stream wrapping while pytest captures stdout
+os.environ["NO_COLOR"] = "1"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Asathot
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    """A fresh game state with delays off, whose save, event log and archive live in tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Asathot, "game_state", Asathot.GameState())
+    monkeypatch.setattr(Asathot, "delays_enabled", False)
+    monkeypatch.setattr(Asathot, "event_log", Asathot.EventLog(str(tmp_path / "events")))
+    monkeypatch.setattr(Asathot, "archive", Asathot.ColdArchive(str(tmp_path / "archive.jsonl")))
+    yield Asathot.game_state
+    Asathot.event_log.close()
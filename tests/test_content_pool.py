@@ -0,0 +1,23 @@
+import time
+
+import Asathot
+
+
+def test_builder_failures_are_reported_and_take_still_draws(game, monkeypatch, capsys):
+    pool = Asathot.ContentPool()
+    def broken(rng, inputs):
+        raise ValueError("no targets")
+    pool.builders["championship"] = broken
+    monkeypatch.setattr(Asathot, "content_pool", pool)
+    pool.start()
+    try:
+        deadline = time.time() + 5
+        while not pool.failures and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.error == "ValueError: no targets"
+        assert Asathot.generate_new_mission()["id"]
+        Asathot.cmd_perf("report")
+    finally:
+        pool.stop()
+    output = capsys.readouterr().out
+    assert "background builds failed, the last with ValueError: no targets" in output
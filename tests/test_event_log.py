@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import Asathot
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    """An event log with tiny segments, few of them kept and dense index points"""
+    monkeypatch.setattr(Asathot, "EVENT_LOG_SEGMENT_BYTES", 300)
+    monkeypatch.setattr(Asathot, "EVENT_LOG_SEGMENTS", 3)
+    monkeypatch.setattr(Asathot, "EVENT_INDEX_STRIDE", 4)
+    log = Asathot.EventLog(str(tmp_path / "events"))
+    yield log
+    log.close()
+
+
+def entry(number):
+    return {"time": 1000.0 + number, "message": f"event {number:04d}", "color": "WHITE"}
+
+
+def write(log, first, count):
+    for number in range(first, first + count):
+        log.append(entry(number))
+
+
+def test_segments_rotate_and_old_ones_are_deleted(log):
+    write(log, 0, 100)
+    segments = log.segments()
+    assert len(segments) == 3
+    assert segments == list(range(segments[0], segments[0] + 3))
+    assert segments[0] > 1
+    for number in segments[:-1]:
+        with open(log.segment_path(number), "rb") as f:
+            assert len(f.read()) >= Asathot.EVENT_LOG_SEGMENT_BYTES
+
+
+def test_index_only_points_into_kept_segments(log, tmp_path):
+    write(log, 0, 100)
+    kept = set(log.segments())
+    with open(tmp_path / "events.idx") as f:
+        on_disk = [tuple(json.loads(line)) for line in f]
+    assert on_disk == log.index
+    assert {segment for _, segment, _ in on_disk} == kept
+    # Every segment starts with an index point
+    assert {(segment, offset) for _, segment, offset in on_disk} >= {(segment, 0) for segment in kept}
+
+
+def test_index_points_land_on_entry_boundaries(log):
+    write(log, 0, 40)
+    for when, segment, offset in log.index:
+        with open(log.segment_path(segment), encoding="utf-8") as f:
+            f.seek(offset)
+            assert json.loads(f.readline())["time"] == when
+
+
+def test_since_returns_the_entries_from_a_time_on(log):
+    write(log, 0, 100)
+    oldest = next(log.read_from(0, 0))["time"]
+    assert [e["time"] for e in log.since(1090.5)] == [1000.0 + n for n in range(91, 100)]
+    assert [e["time"] for e in log.since(0)][0] == oldest
+
+
+def test_tail_returns_the_newest_entries_in_order(log):
+    write(log, 0, 100)
+    assert [e["message"] for e in log.tail(10)] == [f"event {n:04d}" for n in range(90, 100)]
+    everything = list(log.read_from(0, 0))
+    assert log.tail(1000) == everything
+
+
+def test_a_reopened_log_resumes_the_last_segment(log, tmp_path):
+    write(log, 0, 2)
+    log.close()
+    reopened = Asathot.EventLog(str(tmp_path / "events"))
+    write(reopened, 2, 2)
+    reopened.close()
+    assert reopened.segments() == [1]
+    assert [e["message"] for e in reopened.tail(4)] == [f"event {n:04d}" for n in range(4)]
+    assert [e["time"] for e in reopened.since(1002.0)] == [1002.0, 1003.0]
+
+
+def test_torn_index_lines_are_skipped(log, tmp_path):
+    write(log, 0, 10)
+    log.close()
+    with open(tmp_path / "events.idx", "a") as f:
+        f.write('[1010.0, 1, ')
+    reopened = Asathot.EventLog(str(tmp_path / "events"))
+    assert len(reopened.load_index()) == len(log.index)
+    assert [e["time"] for e in reopened.since(1008.0)] == [1008.0, 1009.0]
+
+
+def test_a_disabled_log_writes_nothing(log, tmp_path):
+    log.enabled = False
+    write(log, 0, 10)
+    assert log.segments() == []
+    assert not (tmp_path / "events.idx").exists()
@@ -0,0 +1,29 @@
+import Asathot
+
+
+def test_sliced_walks_add_up_to_the_deep_size():
+    data = {"rows": [[i, str(i), {"n": i}] for i in range(500)], "shared": ["x"] * 10}
+    slices = list(Asathot.sizeof_slices(data, 100))
+    assert all(count == 100 and total is None for count, total in slices[:-1])
+    assert slices[-1][1] == Asathot.deep_sizeof(data)
+
+
+def test_checks_measure_a_bounded_slice_and_warn_once(game, monkeypatch):
+    monkeypatch.setattr(Asathot, "MEMORY_CHECK_OBJECTS", 200)
+    monitor = Asathot.MemoryMonitor()
+    monitor.limits = {"network_targets": 1024, "stats": 1 << 30}
+    walked = []
+    real = Asathot.sizeof_slices
+    def counting(obj, step):
+        for count, total in real(obj, step):
+            walked.append(count)
+            yield count, total
+    monkeypatch.setattr(Asathot, "sizeof_slices", counting)
+
+    warnings = []
+    for _ in range(200):
+        before = len(walked)
+        warnings += monitor.check(game)
+        assert sum(walked[before:]) < 2 * Asathot.MEMORY_CHECK_OBJECTS
+    assert len(warnings) == 1 and warnings[0].startswith("network_targets uses")
+    assert monitor.over == {"network_targets"}
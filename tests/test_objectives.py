@@ -0,0 +1,99 @@
+import pytest
+
+import Asathot
+
+
+@pytest.mark.parametrize("text, compiled", [
+    ("scan", (("scan",), None)),
+    ("Bruteforce admin password", (("bruteforce",), None)),
+    ("Extract password hashes", (("bruteforce",), None)),  # earlier rules win
+    ("download data", (("exfiltrate",), None)),
+    ("Cover tracks", (("file",), "delete")),
+    ("Leave a document", (("file",), "create")),
+    ("Open a covert channel", (("connect",), None)),
+    ("Plant backdoor", (("exploit",), None)),
+    ("system infiltration", (Asathot.INTRUSION_EVENTS, None)),
+])
+def test_steps_compile_to_the_events_that_complete_them(text, compiled):
+    assert Asathot.compile_objective(text) == compiled
+
+
+def test_compiled_steps_are_cached_case_insensitively():
+    first = Asathot.compile_objective("Map Network topology")
+    assert Asathot.compile_objective("map network TOPOLOGY") is first
+    assert Asathot.compiled_objectives["map network topology"] is first
+
+
+def test_hints_name_every_command_that_completes_a_step():
+    assert Asathot.objective_hint("privilege escalation", "10.0.0.1") == "hack 10.0.0.1 or run rootkit_gen.py 10.0.0.1"
+    assert Asathot.objective_hint("erase logs", "10.0.0.1") == "rm <file> or rmdir <dir>"
+
+
+@pytest.fixture
+def mission(game):
+    """The current mission, with known steps"""
+    mission = Asathot.generate_new_mission()
+    mission["steps"] = ["scan", "privilege escalation", "erase logs"]
+    Asathot.set_current_mission(mission["id"])
+    game.derived.invalidate("objectives")
+    return mission
+
+
+def test_events_advance_the_current_step_in_order(game, mission):
+    target = mission["target"]
+    Asathot.emit_event("hack", target)  # not the current step yet
+    assert mission["current_step"] == 0
+    Asathot.emit_event("scan", "10.255.255.255")  # wrong host
+    assert mission["current_step"] == 0
+    Asathot.emit_event("scan", target)
+    Asathot.emit_event("scan", target)  # a repeat does not skip ahead
+    assert mission["current_step"] == 1
+    Asathot.emit_event("exploit", target)
+    assert mission["current_step"] == 2
+
+
+def test_file_steps_need_the_right_operation_and_complete_the_mission(game, mission):
+    mission["current_step"] = 2
+    game.derived.invalidate("objectives")
+    bitcoin = game.player["bitcoin"]
+    Asathot.emit_event("file", op="create")
+    assert mission["current_step"] == 2
+    Asathot.emit_event("file", op="delete")
+    assert mission["completed"]
+    assert game.player["current_mission"] is None
+    assert game.player["bitcoin"] == pytest.approx(bitcoin + mission["reward"])
+    assert mission["id"] in game.missions.completed
+
+
+def test_only_the_current_mission_is_armed(game, mission):
+    other = Asathot.generate_new_mission()
+    other["steps"] = ["scan"]
+    game.derived.invalidate("objectives")
+    Asathot.emit_event("scan", other["target"])
+    assert other["current_step"] == 0
+
+
+@pytest.fixture
+def championship(game):
+    championship = Asathot.generate_new_championship()
+    championship["tasks"] = ["network scan", "encryption breaking"]
+    game.derived.invalidate("objectives")
+    return championship
+
+
+def test_championship_tasks_need_the_required_reputation(game, championship):
+    game.player["reputation"] = championship["required_rep"] - 1
+    Asathot.emit_event("scan", championship["target"])
+    assert championship["current_task"] == 0
+    game.player["reputation"] = championship["required_rep"]
+    Asathot.emit_event("scan", championship["target"])
+    assert championship["current_task"] == 1
+    assert championship["id"] in game.championships.active
+
+
+def test_finishing_every_task_completes_the_championship(game, championship):
+    game.player["reputation"] = championship["required_rep"]
+    Asathot.emit_event("scan", championship["target"])
+    Asathot.emit_event("bruteforce", championship["target"])
+    assert championship["completed"]
+    assert championship["id"] in game.championships.completed
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import Asathot
+
+
+def saved(seconds_ago, now, **data):
+    return dict(data, saved_at=now - seconds_ago)
+
+
+def test_barrier_already_crossed_is_certain():
+    assert Asathot.barrier_hit_probability(100, 90, 95, 0.1, below=True) == 1.0
+    assert Asathot.barrier_hit_probability(100, 110, 105, 0.1, below=False) == 1.0
+
+
+def test_barrier_chance_falls_with_distance_and_rises_with_volatility():
+    assert Asathot.barrier_hit_probability(100, 100, 90, 0.0, below=True) == 0.0
+    near = Asathot.barrier_hit_probability(100, 100, 95, 0.1, below=True)
+    far = Asathot.barrier_hit_probability(100, 100, 80, 0.1, below=True)
+    wild = Asathot.barrier_hit_probability(100, 100, 80, 0.5, below=True)
+    assert 0 < far < near < 1
+    assert far < wild < 1
+
+
+def test_market_catches_up_in_one_call(game):
+    now = game.market.last_update + 3600
+    start = game.market.tick
+    Asathot.apply_offline_progress(saved(3600, now), now)
+    ticks = int(3600 * game.time_acceleration / Asathot.MARKET_TICK_SECONDS)
+    assert game.market.tick == start + ticks
+    # Caught up: nothing is left to simulate at the same moment
+    assert game.market.catch_up(now, game.time_acceleration) == 0
+
+
+def test_crossed_orders_fill_at_their_limit(game, monkeypatch):
+    game.player["bitcoin"] = 0.0
+    game.player["ecoin"] = 1000.0
+    book = game.order_book
+    order = Asathot.Order(book.next_id, "player", "buy", 10.0, 2.0)
+    book.next_id += 1
+    book._rest(order)
+    game.player["ecoin"] -= 20.0
+    monkeypatch.setattr(Asathot, "barrier_hit_probability", lambda *args: 1.0)
+    now = game.market.last_update + 600
+    Asathot.apply_offline_progress(saved(600, now), now)
+    assert book.player_orders() == []
+    assert game.player["bitcoin"] == pytest.approx(2.0)
+    assert game.player["ecoin"] == pytest.approx(980.0)
+    assert game.trades[-1] == ("buy", 2.0, 10.0)
+
+
+def test_untouched_orders_keep_resting(game, monkeypatch):
+    book = game.order_book
+    book._rest(Asathot.Order(book.next_id, "player", "sell", 1e9, 1.0))
+    monkeypatch.setattr(Asathot, "barrier_hit_probability", lambda *args: 0.0)
+    now = game.market.last_update + 600
+    Asathot.apply_offline_progress(saved(600, now), now)
+    assert len(book.player_orders()) == 1
+
+
+def test_mining_pays_the_expected_shares_and_restarts_the_miner(game, monkeypatch):
+    game.player["bitcoin"] = 0.0
+    started = []
+    monkeypatch.setattr(Asathot.miner, "start", started.append)
+    monkeypatch.setattr(Asathot, "poisson", lambda mean: round(mean))
+    hash_rate = 2 ** Asathot.MINING_SHARE_BITS / 10  # one share every 10 seconds
+    now = time.time()
+    Asathot.apply_offline_progress(saved(1000, now, mining={"running": True, "hash_rate": hash_rate}), now)
+    assert game.player["bitcoin"] == pytest.approx(100 * Asathot.MINING_SHARE_REWARD)
+    assert started == [Asathot.host_worker_count(game.pc["cpu"]["cores"])]
+
+
+def test_expired_missions_are_archived_and_reported(game, capsys):
+    mission = Asathot.generate_new_mission()
+    Asathot.set_current_mission(mission["id"])
+    now = mission["expires_at"] + 1
+    Asathot.apply_offline_progress(saved(now - time.time(), now), now)
+    assert game.missions.get(mission["id"]) is None
+    assert game.player["current_mission"] is None
+    assert Asathot.archive.fetch("mission", mission["id"])["status"] == "expired"
+    assert f"Mission {mission['id']}" in capsys.readouterr().out
+
+
+def test_short_breaks_are_not_reported(game, capsys):
+    now = game.market.last_update + 30
+    Asathot.apply_offline_progress(saved(30, now), now)
+    assert "While you were away" not in capsys.readouterr().out
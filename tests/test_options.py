@@ -0,0 +1,19 @@
+import pytest
+
+import Asathot
+
+
+@pytest.mark.parametrize("argv", [
+    ["--simulate", "0"],
+    ["--simulate", "-5"],
+    ["--simulate", "10", "--workers", "0"],
+    ["--simulate", "10", "--hours", "0"],
+])
+def test_simulation_options_below_one_are_rejected(argv):
+    with pytest.raises(SystemExit):
+        Asathot.parse_args(argv)
+
+
+def test_simulate_is_unset_only_when_absent():
+    assert Asathot.parse_args([]).simulate is None
+    assert Asathot.parse_args(["--simulate", "1"]).simulate == 1
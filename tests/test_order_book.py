@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+import Asathot
+
+
+@pytest.fixture
+def book(game):
+    """The game's order book with the NPC order flow held off"""
+    book = game.order_book
+    book.npc_quotes = [0]
+    book.last_npc_update = time.time() + 3600
+    game.player["bitcoin"] = 2.0
+    game.player["ecoin"] = 1000.0
+    return book
+
+
+def test_buy_takes_the_best_asks_first_in_arrival_order(book):
+    second, _ = book.submit("npc", "sell", 100.0, 1.0)
+    cheaper, _ = book.submit("npc", "sell", 99.0, 1.0)
+    first, _ = book.submit("npc", "sell", 100.0, 1.0)
+    # second was placed before first at the same price
+    order, fills = book.submit("npc", "buy", 100.0, 2.5)
+    assert [(maker.id, price, quantity) for maker, _, price, quantity in fills] == [
+        (cheaper.id, 99.0, 1.0), (second.id, 100.0, 1.0), (first.id, 100.0, 0.5)]
+    assert order.remaining == pytest.approx(0)
+    assert book.best("sell") == 100.0
+    assert book.orders[first.id].remaining == pytest.approx(0.5)
+
+
+def test_limit_buy_settles_at_the_makers_prices(game, book):
+    book.submit("npc", "sell", 100.0, 1.0)
+    book.submit("npc", "sell", 101.0, 1.0)
+    Asathot.place_order("buy", "1.5 105")
+    assert game.player["bitcoin"] == pytest.approx(3.5)
+    # 105 per BTC was reserved; the price improvement comes back
+    assert game.player["ecoin"] == pytest.approx(1000 - 100 - 0.5 * 101)
+    assert book.player_orders() == []
+    assert game.trades[-2:] == [("buy", 1.0, 100.0), ("buy", 0.5, 101.0)]
+
+
+def test_resting_sell_settles_when_a_bid_crosses_it(game, book):
+    Asathot.place_order("sell", "1 200")
+    assert game.player["bitcoin"] == pytest.approx(1.0)
+    (order,) = book.player_orders()
+    _, fills = book.submit("npc", "buy", 210.0, 0.4)
+    Asathot.settle_fills(fills)
+    assert game.player["ecoin"] == pytest.approx(1000 + 0.4 * 200)
+    assert order.remaining == pytest.approx(0.6)
+    assert game.player["bitcoin"] == pytest.approx(1.0)
+
+
+def test_cancel_returns_the_reserved_funds(game, book):
+    Asathot.place_order("buy", "2 50")
+    assert game.player["ecoin"] == pytest.approx(900)
+    (order,) = book.player_orders()
+    Asathot.cmd_cancel(str(order.id))
+    assert game.player["ecoin"] == pytest.approx(1000)
+    assert book.player_orders() == []
+    assert book.best("buy") is None
+
+
+def test_market_order_refunds_what_the_book_cannot_fill(game, book):
+    book.submit("npc", "sell", 100.0, 0.5)
+    Asathot.place_order("buy", "1")
+    assert game.player["bitcoin"] == pytest.approx(2.5)
+    # Only the filled half is paid for, at the maker's price
+    assert game.player["ecoin"] == pytest.approx(1000 - 0.5 * 100)
+    assert book.player_orders() == []
+
+
+def test_insufficient_funds_reserve_nothing(game, book):
+    book.submit("npc", "sell", 100.0, 50.0)
+    Asathot.place_order("buy", "20 100")
+    assert game.player["ecoin"] == 1000.0
+    assert game.player["bitcoin"] == 2.0
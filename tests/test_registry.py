@@ -0,0 +1,99 @@
+import pytest
+
+import Asathot
+
+
+def mission(entry_id, **fields):
+    return dict({"id": entry_id, "title": f"Job {entry_id}", "completed": False}, **fields)
+
+
+@pytest.fixture
+def registry(game, monkeypatch):
+    monkeypatch.setattr(Asathot, "REGISTRY_COMPLETED_KEPT", 3)
+    return Asathot.Registry("mission", "m", [mission(f"m{n:03d}") for n in range(1, 9)])
+
+
+def test_entries_move_between_partitions(registry):
+    registry.activate("m001")
+    registry.complete("m002")
+    assert list(registry.active) == ["m001"]
+    assert list(registry.completed) == ["m002"]
+    assert "m001" not in registry.available and "m002" not in registry.available
+    registry.release("m001")
+    assert "m001" in registry.available and not registry.active
+    assert [e["id"] for e in registry.open()] == [f"m{n:03d}" for n in (3, 4, 5, 6, 7, 8, 1)]
+
+
+def test_completed_entries_past_the_cap_go_to_the_archive(registry):
+    for n in range(1, 6):
+        registry.complete(f"m{n:03d}")
+    assert list(registry.completed) == ["m003", "m004", "m005"]
+    assert registry.archived == 2
+    assert registry.get("m001") is None
+    archived = registry.lookup("m001")
+    assert archived["archived"] == "completed"
+    assert archived["completed"] is True
+    assert registry.lookup("m003").get("archived") is None
+
+
+def test_archived_entries_are_found_again_after_a_restart(registry, tmp_path):
+    registry.archive("m004", "expired")
+    registry.archive("m006", "abandoned")
+    Asathot.archive = Asathot.ColdArchive(str(tmp_path / "archive.jsonl"))
+    assert registry.lookup("m004")["archived"] == "expired"
+    assert registry.lookup("m006")["archived"] == "abandoned"
+    assert registry.lookup("m999") is None
+    assert Asathot.archive.fetch("championship", "m004") is None
+
+
+def test_a_torn_archive_line_does_not_hide_the_others(registry, tmp_path):
+    registry.archive("m001", "expired")
+    with open(tmp_path / "archive.jsonl", "ab") as f:
+        f.write(b'{"kind": "mission", "status": "expi')
+    Asathot.archive = Asathot.ColdArchive(str(tmp_path / "archive.jsonl"))
+    assert registry.lookup("m001")["archived"] == "expired"
+    registry.archive("m002", "expired")
+    assert registry.lookup("m002")["archived"] == "expired"
+
+
+def test_ids_are_never_reused(registry):
+    registry.archive("m008", "abandoned")
+    assert registry.new_id() == "m009"
+
+
+def test_snapshot_restores_partitions_counters_and_the_active_entry(registry):
+    registry.activate("m002")
+    for n in range(3, 8):
+        registry.complete(f"m{n:03d}")
+    restored = Asathot.Registry.from_dict("mission", "m", registry.to_dict(), ["m002"])
+    assert restored.available.keys() == registry.available.keys()
+    assert restored.active.keys() == {"m002"}
+    assert restored.completed.keys() == registry.completed.keys()
+    assert restored.archived == registry.archived == 2
+    assert restored.new_id() == registry.new_id()
+    assert restored.lookup("m003")["archived"] == "completed"
+
+
+def test_old_saves_with_a_plain_list_still_load(game):
+    restored = Asathot.Registry.from_dict("mission", "m", [mission("m001"), mission("m007", completed=True)])
+    assert list(restored.available) == ["m001"]
+    assert list(restored.completed) == ["m007"]
+    assert restored.new_id() == "m008"
+
+
+def test_save_and_load_keep_archived_missions_reachable(game, monkeypatch):
+    monkeypatch.setattr(Asathot, "REGISTRY_COMPLETED_KEPT", 1)
+    missions = [Asathot.generate_new_mission() for _ in range(3)]
+    for entry in missions:
+        game.missions.complete(entry["id"])
+    current = Asathot.generate_new_mission()
+    Asathot.set_current_mission(current["id"])
+    Asathot.save_game()
+
+    monkeypatch.setattr(Asathot, "game_state", Asathot.GameState())
+    assert Asathot.load_game()
+    loaded = Asathot.game_state.missions
+    assert loaded.active.keys() == {current["id"]}
+    assert list(loaded.completed) == [missions[-1]["id"]]
+    assert loaded.lookup(missions[0]["id"])["archived"] == "completed"
+    assert loaded.new_id() > current["id"]
@@ -0,0 +1,63 @@
+import io
+
+import Asathot
+
+
+class Terminal(io.StringIO):
+    """Captured output that claims to be a terminal"""
+    def isatty(self):
+        return True
+
+
+def clear_on(stream, color):
+    renderer = Asathot.Renderer(color=color)
+    renderer.stream = stream
+    renderer.write("old output")
+    renderer.clear_screen()
+    return stream.getvalue()
+
+
+def test_clear_writes_the_escape_sequence_to_a_terminal_even_without_colors():
+    assert clear_on(Terminal(), color=False) == Asathot.CLEAR_SCREEN
+    assert clear_on(Terminal(), color=True) == Asathot.CLEAR_SCREEN
+
+
+def test_clear_keeps_pipes_free_of_escape_sequences():
+    assert clear_on(io.StringIO(), color=True) == "old output"
+
+
+class FakeDashboard(Asathot.Dashboard):
+    """A dashboard that records what it writes instead of driving a real terminal"""
+    def __init__(self):
+        super().__init__()
+        self.caps = {name: name.encode() for name in ("csr", "cup", "sc", "rc", "el")}
+        self.written = []
+
+    def _tparm(self, name, *params):
+        return f"<{name} {' '.join(map(str, params))}>"
+
+    def _write(self, data):
+        self.written.append(data)
+
+
+def test_clear_with_the_dashboard_on_redraws_the_pinned_rows(game, monkeypatch):
+    board = FakeDashboard()
+    monkeypatch.setattr(Asathot, "dashboard", board)
+    monkeypatch.setattr(Asathot.shutil, "get_terminal_size", lambda: Asathot.os.terminal_size((80, 24)))
+    board.active = True
+    board._reset_layout()
+    assert board.drawn_rows
+    board.written.clear()
+
+    renderer = Asathot.Renderer(color=False)
+    renderer.stream = Terminal()
+    renderer.clear_screen()
+    output = "".join(board.written)
+    assert output.startswith(Asathot.CLEAR_SCREEN)
+    # Scroll region pinned again, every header row drawn, cursor back under the header
+    assert f"<csr {board.header_rows} 23>" in output
+    for row in range(board.header_rows):
+        assert f"<cup {row} 0>" in output
+    assert Asathot.CLEAR_SCREEN not in output[len(Asathot.CLEAR_SCREEN):]
+    assert output.endswith(f"<cup {board.header_rows} 0>")
+    assert " BTC " in output
@@ -0,0 +1,37 @@
+import json
+
+import Asathot
+
+
+def test_scans_list_unidentified_services(game):
+    target = next(t for t in game.network_targets
+                  if any(service == "unknown" for _, service in Asathot.service_ports(t)))
+    result = Asathot.record_scan(target)
+    assert result["ports"] == [[port, service] for port, service in Asathot.service_ports(target)]
+
+
+def test_cached_scans_survive_a_save_and_load(game, monkeypatch):
+    target = game.network_targets[0]
+    Asathot.record_scan(target)
+    Asathot.save_game()
+    with open(Asathot.SAVE_FILE) as f:
+        assert "version" not in json.load(f)["scan_cache"][target["ip"]]
+
+    monkeypatch.setattr(Asathot, "game_state", Asathot.GameState())
+    assert Asathot.load_game()
+    assert Asathot.get_cached_scan(Asathot.get_target_by_ip(target["ip"])) is not None
+
+
+def test_targets_edited_while_loading_drop_their_cached_scan(game, monkeypatch):
+    target = game.network_targets[0]
+    Asathot.record_scan(target)
+    Asathot.save_game()
+    with open(Asathot.SAVE_FILE) as f:
+        data = json.load(f)
+    del data["network_targets"][0]["credentials"]  # a save from before credentials existed
+    with open(Asathot.SAVE_FILE, "w") as f:
+        json.dump(data, f)
+
+    monkeypatch.setattr(Asathot, "game_state", Asathot.GameState())
+    assert Asathot.load_game()
+    assert Asathot.get_cached_scan(Asathot.get_target_by_ip(target["ip"])) is None
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+import Asathot
+
+
+def world():
+    """Two named subnets with hosts of every security level and a handful of /24 hosts"""
+    rng = random.Random(48)
+    targets = []
+    for subnet, base in (("lab", "172.16.0."), ("dmz", "172.17.0.")):
+        for n in range(40):
+            targets.append({"ip": f"{base}{n}", "name": f"{subnet} {n}", "subnet": subnet,
+                            "security_level": 1 + n % 10 if n else rng.randint(2, 3)})
+    for n in range(10):
+        targets.append({"ip": f"10.9.9.{n}", "name": f"host {n}", "security_level": rng.randint(1, 9)})
+    return targets
+
+
+def fresh_copy(topology):
+    """A topology built from scratch with the same footholds"""
+    targets = [dict(target, compromised=ip in topology.compromised) for ip, target in topology.hosts.items()]
+    return Asathot.Topology(targets)
+
+
+def assert_same_routes(cached, fresh, sources):
+    for source in sources:
+        for ip in cached.hosts:
+            expected = fresh.route(ip, source)
+            actual = cached.route(ip, source)
+            if expected is None:
+                assert actual is None, (source, ip)
+            else:
+                assert [node for node, _ in actual] == [node for node, _ in expected], (source, ip)
+                assert [latency for _, latency in actual] == pytest.approx(
+                    [latency for _, latency in expected]), (source, ip)
+
+
+def test_deep_hosts_need_footholds():
+    topology = Asathot.Topology(world())
+    deep = "172.16.0.9"  # security 10, far from the internet
+    assert not topology.exposed(deep)
+    assert topology.route(deep) is None
+    exposed = [ip for ip in topology.hosts if topology.exposed(ip)]
+    assert exposed and all(topology.route(ip)[-2][0] == Asathot.INTERNET for ip in exposed)
+
+
+def test_pivoting_along_the_pivot_path_opens_a_route():
+    topology = Asathot.Topology(world())
+    deep = "172.16.0.9"
+    path = topology.pivot_path(deep)
+    assert path[-1] == deep and topology.exposed(path[0])
+    for ip in path[:-1]:
+        topology.compromise(ip)
+    hops = [node for node, _ in topology.route(deep)]
+    assert hops[0] == Asathot.INTERNET
+    assert set(hops[1:-1]) <= topology.compromised and len(hops) > 2
+    assert hops[-1] == deep
+
+
+def test_losing_a_foothold_cuts_the_routes_behind_it():
+    topology = Asathot.Topology(world())
+    deep = "172.16.0.9"
+    path = topology.pivot_path(deep)
+    for ip in path[:-1]:
+        topology.compromise(ip)
+    topology.lose(path[0])
+    assert topology.route(deep) is None
+    assert topology.route(path[0]) is not None  # still exposed, just not a foothold
+
+
+def test_cached_routes_match_a_rebuild_after_gaining_and_losing_footholds():
+    rng = random.Random(7)
+    topology = Asathot.Topology(world())
+    ips = list(topology.hosts)
+    pivot = "172.17.0.5"
+    topology.compromise(pivot)
+    sources = [Asathot.LOCALHOST, pivot]
+    for source in sources:
+        topology.table(source)
+    for step in range(60):
+        ip = rng.choice(ips)
+        if ip == pivot:
+            continue
+        if ip in topology.compromised and rng.random() < 0.5:
+            topology.lose(ip)
+        else:
+            topology.compromise(ip)
+        if step % 10 == 9:
+            assert_same_routes(topology, fresh_copy(topology), sources)
+    assert_same_routes(topology, fresh_copy(topology), sources)
+
+
+def test_a_lost_source_forgets_its_routes():
+    topology = Asathot.Topology(world())
+    pivot = "172.17.0.5"
+    topology.compromise(pivot)
+    topology.table(pivot)
+    topology.lose(pivot)
+    assert pivot not in topology.routes
+
+
+def test_game_footholds_keep_the_topology_in_sync(game):
+    game.network_targets = world()
+    game.derived.invalidate("targets")
+    topology = Asathot.get_topology()
+    deep = game.network_targets[9]
+    path = topology.pivot_path(deep["ip"])
+    assert Asathot.next_pivot(deep)["ip"] == path[0]
+    for ip in path[:-1]:
+        Asathot.compromise_host(topology.hosts[ip])
+    assert Asathot.next_pivot(deep) is None
+    assert Asathot.get_topology() is topology
+    Asathot.lose_host(topology.hosts[path[0]])
+    assert Asathot.next_pivot(deep)["ip"] == path[0]
+    assert_same_routes(topology, fresh_copy(topology), [Asathot.LOCALHOST])